@@ -0,0 +1,47 @@
+"""
+Benchmark da compilação depois da análise sintática: o caminho em duas
+passadas (`AnalisadorSemantico` e depois `GeradorDeCodigo`) comparado à
+passada única do `CompiladorDePassadaUnica`, num programa grande.
+
+Uso: python3 benchmarks/bench_compilador.py [estruturas]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parser import gerar_plano
+from src.compilador import CompiladorDePassadaUnica
+from src.gerador import GeradorDeCodigo
+from src.parser import Parser
+from src.semantico import AnalisadorSemantico
+from src.tokenizer import tokenizar_em_buffer
+
+def duas_passadas(arvore):
+    AnalisadorSemantico().visit(arvore)
+    return GeradorDeCodigo().gerar(arvore)
+
+def passada_unica(arvore):
+    return CompiladorDePassadaUnica().gerar(arvore)
+
+def medir(funcao, arvore, rodadas=3):
+    melhor = float('inf')
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        codigo = funcao(arvore)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return codigo, melhor
+
+def main():
+    estruturas = int(sys.argv[1]) if len(sys.argv) > 1 else 65000
+    arvore = Parser(tokenizar_em_buffer(gerar_plano(estruturas))).parse()
+    codigo_referencia, tempo_referencia = medir(duas_passadas, arvore)
+    codigo, tempo = medir(passada_unica, arvore)
+    assert codigo == codigo_referencia
+    print(f"{estruturas} estruturas")
+    print(f"duas passadas:  {tempo_referencia:.3f} s")
+    print(f"passada única:  {tempo:.3f} s ({tempo_referencia / tempo:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark do analisador sintático em programas profundamente aninhados:
+repita/se/enquanto encaixados até a profundidade pedida (10 mil por padrão),
+comparados a um programa plano com a mesma quantidade de comandos.
+
+Uso: python3 benchmarks/bench_parser.py [profundidade]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.parser import Parser
+from src.tokenizer import tokenizar
+
+ESTRUTURAS = [
+    ('repita 2 vezes', 'fim_repita;'),
+    ('se x < 10 entao', 'fim_se;'),
+    ('enquanto x < 10 faca', 'fim_enquanto;'),
+]
+
+def gerar_aninhado(profundidade):
+    """ Programa com `profundidade` estruturas encaixadas umas nas outras. """
+    partes = ['inicio', 'var inteiro: x = 0;']
+    for nivel in range(profundidade):
+        abertura, _ = ESTRUTURAS[nivel % len(ESTRUTURAS)]
+        partes.append(abertura)
+        partes.append('avancar x + 1; girar_direita 90;')
+    for nivel in reversed(range(profundidade)):
+        _, fechamento = ESTRUTURAS[nivel % len(ESTRUTURAS)]
+        partes.append('x = x + 1;')
+        partes.append(fechamento)
+    partes.append('fim')
+    return '\n'.join(partes)
+
+def gerar_plano(quantidade):
+    """ Programa com as mesmas estruturas, mas uma após a outra. """
+    partes = ['inicio', 'var inteiro: x = 0;']
+    for nivel in range(quantidade):
+        abertura, fechamento = ESTRUTURAS[nivel % len(ESTRUTURAS)]
+        partes.append(abertura)
+        partes.append('avancar x + 1; girar_direita 90; x = x + 1;')
+        partes.append(fechamento)
+    partes.append('fim')
+    return '\n'.join(partes)
+
+def medir(codigo, rodadas=3):
+    tokens = tokenizar(codigo)
+    melhor = float('inf')
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        Parser(tokens).parse()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return len(tokens), melhor
+
+def main():
+    profundidade = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"Limite de recursão do Python: {sys.getrecursionlimit()}")
+    for nome, codigo in (('aninhado', gerar_aninhado(profundidade)), ('plano', gerar_plano(profundidade))):
+        total, tempo = medir(codigo)
+        print(f"{nome:<9} {profundidade} estruturas, {total} tokens: {tempo:.3f} s ({total / tempo:,.0f} tokens/s)")
+
+if __name__ == '__main__':
+    main()
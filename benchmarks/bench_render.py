@@ -0,0 +1,85 @@
+"""
+Benchmark da renderização do código gerado: cada exemplo de examples/input
+é executado com o código de sempre (o turtle redesenha a tela a cada
+primitiva) e com a `Renderizacao` em lotes e só do quadro final. Mede os
+quadros desenhados (chamadas ao `update` do canvas Tk) e o tempo até o fim
+do desenho.
+
+Cada execução roda num processo separado, com o turtle de verdade: é
+preciso uma tela (DISPLAY; num servidor, xvfb-run).
+
+Uso: python3 benchmarks/bench_render.py [primitivas por quadro]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.gerador import GeradorDeCodigo, Renderizacao
+from src.parser import Parser
+from src.semantico import AnalisadorSemantico
+from src.tokenizer import tokenizar
+
+DIRETORIO_EXEMPLOS = os.path.join(os.path.dirname(__file__), '..', 'examples', 'input')
+
+# Executa o programa gerado contando os quadros; `turtle.done()` não espera a janela ser fechada
+_EXECUTAR = """
+import sys, time, turtle
+quadros = 0
+_update = turtle.TurtleScreenBase._update
+def _contar(self):
+    global quadros
+    quadros += 1
+    _update(self)
+turtle.TurtleScreenBase._update = _contar
+turtle.done = lambda: None
+with open(sys.argv[1], encoding='utf-8') as arquivo:
+    codigo = compile(arquivo.read(), sys.argv[1], 'exec')
+inicio = time.perf_counter()
+exec(codigo, {'__name__': '__main__'})
+print(quadros, time.perf_counter() - inicio)
+"""
+
+def compilar(fonte, renderizacao):
+    arvore = Parser(tokenizar(fonte)).parse()
+    AnalisadorSemantico().visit(arvore)
+    return GeradorDeCodigo().gerar(arvore, renderizacao=renderizacao)
+
+def executar(caminho):
+    """ (quadros, segundos) de uma execução do programa em `caminho`. """
+    resultado = subprocess.run([sys.executable, '-c', _EXECUTAR, caminho], capture_output=True, text=True)
+    if resultado.returncode != 0:
+        erro = resultado.stderr.strip().split("\n")[-1]
+        sys.exit(f"Erro ao executar o programa gerado (é preciso uma tela: DISPLAY ou xvfb-run): {erro}")
+    quadros, segundos = resultado.stdout.split()
+    return int(quadros), float(segundos)
+
+def medir(caminho, rodadas=3):
+    execucoes = [executar(caminho) for _ in range(rodadas)]
+    return execucoes[0][0], min(segundos for _, segundos in execucoes)
+
+def main():
+    primitivas = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    modos = [
+        ("atual", None),
+        (f"lotes de {primitivas}", Renderizacao(primitivas)),
+        ("quadro final", Renderizacao(so_quadro_final=True)),
+    ]
+    print(f"{'exemplo':<14}{'modo':<16}{'quadros':>9}{'tempo':>11}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in sorted(os.listdir(DIRETORIO_EXEMPLOS)):
+            with open(os.path.join(DIRETORIO_EXEMPLOS, nome), encoding='utf-8') as arquivo:
+                fonte = arquivo.read()
+            referencia = None
+            for modo, renderizacao in modos:
+                caminho = os.path.join(diretorio, 'programa.py')
+                with open(caminho, 'w', encoding='utf-8') as arquivo:
+                    arquivo.write(compilar(fonte, renderizacao))
+                quadros, segundos = medir(caminho)
+                referencia = referencia or segundos
+                print(f"{nome:<14}{modo:<16}{quadros:>9}{segundos:>9.3f} s ({referencia / segundos:.1f}x)")
+
+if __name__ == '__main__':
+    main()
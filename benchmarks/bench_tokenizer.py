@@ -0,0 +1,102 @@
+"""
+Benchmark do analisador léxico: compara o scanner por tabela de despacho
+(`src.tokenizer.tokenizar`) com a implementação original baseada em uma
+alternação de expressões regulares, recompilada a cada chamada.
+
+Uso: python3 benchmarks/bench_tokenizer.py [repeticoes]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tokenizer import Token, tokenizar, tokenizar_em_buffer
+
+DIRETORIO_EXEMPLOS = os.path.join(os.path.dirname(__file__), '..', 'examples', 'input')
+
+def tokenizar_regex(codigo_fonte):
+    """ Implementação de referência: a versão original do tokenizador. """
+    especificacao_tokens = [
+        ('COMENTARIO',      r'//.*'),
+        ('NUMERO_REAL',     r'[+-]?\d+\.\d+'),
+        ('NUMERO_INTEIRO',  r'[+-]?\d+'),
+        ('TEXTO',           r'"[^"]*"'),
+        ('ID',              r'[a-zA-Z_]\w*'),
+        ('OP_ARITMETICO',   r'[+\-*/%]'),
+        ('OP_RELACIONAL',   r'==|!=|<|>|<=|>='),
+        ('ATRIBUICAO',      r'='),
+        ('PONTO_VIRGULA',   r';'),
+        ('DOIS_PONTOS',     r':'),
+        ('VIRGULA',         r','),
+        ('PARENTESES',      r'[()]'),
+        ('NOVA_LINHA',      r'\n'),
+        ('ESPACO',          r'[ \t\r]+'),
+        ('ERRO',            r'.'),
+    ]
+    palavras_chave = {
+        'inicio', 'fim', 'var', 'inteiro', 'real', 'texto', 'logico', 'verdadeiro', 'falso',
+        'repita', 'vezes', 'fim_repita', 'enquanto', 'faca', 'fim_enquanto', 'se', 'entao',
+        'senao', 'fim_se', 'avancar', 'recuar', 'girar_direita', 'girar_esquerda',
+        'ir_para', 'levantar_caneta', 'abaixar_caneta', 'definir_cor', 'definir_espessura',
+        'cor_de_fundo', 'limpar_tela', 'circulo', 'empurrar_posicao', 'restaurar_posicao'
+    }
+    regex_tokens = '|'.join(f'(?P<{par[0]}>{par[1]})' for par in especificacao_tokens)
+    padrao = re.compile(regex_tokens)
+
+    tokens = []
+    numero_linha = 1
+    for match in padrao.finditer(codigo_fonte):
+        tipo_token = match.lastgroup
+        valor = match.group()
+        if tipo_token == 'ID' and valor in palavras_chave:
+            tipo_token = valor.upper()
+        elif tipo_token in ['NOVA_LINHA', 'ESPACO', 'COMENTARIO']:
+            if tipo_token == 'NOVA_LINHA':
+                numero_linha += 1
+            continue
+        elif tipo_token == 'ERRO':
+            raise SyntaxError(f"Erro Léxico na linha {numero_linha}: Caractere inválido '{valor}' não reconhecido.")
+        tokens.append(Token(tipo_token, valor, numero_linha))
+    tokens.append(Token('EOF', '', numero_linha))
+    return tokens
+
+def gerar_entrada(repeticoes):
+    """ Concatena os exemplos de entrada até formar um código-fonte grande. """
+    trechos = []
+    for nome in sorted(os.listdir(DIRETORIO_EXEMPLOS)):
+        with open(os.path.join(DIRETORIO_EXEMPLOS, nome), encoding='utf-8') as arquivo:
+            trechos.append(arquivo.read())
+    return '\n'.join(trechos) * repeticoes
+
+def medir(funcao, codigo, rodadas=3):
+    melhor = float('inf')
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        tokens = funcao(codigo)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return tokens, melhor
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    codigo = gerar_entrada(repeticoes)
+    print(f"Entrada: {len(codigo) / 1e6:.1f} MB")
+
+    tokens_ref, tempo_ref = medir(tokenizar_regex, codigo)
+    tokens_novo, tempo_novo = medir(tokenizar, codigo)
+    tokens_bytes, tempo_bytes = medir(tokenizar, memoryview(codigo.encode('utf-8')))
+    buffer, tempo_buffer = medir(tokenizar_em_buffer, codigo)
+    assert tokens_novo == tokens_ref, "os dois tokenizadores divergem"
+    assert list(buffer) == tokens_ref, "o TokenBuffer diverge"
+    assert tokens_bytes == tokens_ref, "a varredura em bytes diverge"
+
+    total = len(tokens_novo)
+    print(f"{'regex (original)':<22} {total / tempo_ref:>12,.0f} tokens/s  ({tempo_ref:.3f} s)")
+    print(f"{'tabela de despacho':<22} {total / tempo_novo:>12,.0f} tokens/s  ({tempo_novo:.3f} s)")
+    print(f"{'tabela (bytes UTF-8)':<22} {total / tempo_bytes:>12,.0f} tokens/s  ({tempo_bytes:.3f} s)")
+    print(f"{'TokenBuffer':<22} {total / tempo_buffer:>12,.0f} tokens/s  ({tempo_buffer:.3f} s)")
+    print(f"Aceleração: {tempo_ref / tempo_novo:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark do despacho dos visitors: percorre uma AST de cerca de um milhão
+de nós com o analisador semântico e o gerador de código, comparando a tabela
+de despacho por classe (`src.visitor.Visitor`) com o despacho original, que
+montava o nome `visit_<Classe>` e chamava `getattr` a cada nó.
+
+Uso: python3 benchmarks/bench_visitor.py [estruturas]
+"""
+import os
+import sys
+import time
+from types import GeneratorType
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parser import gerar_plano
+from src.ast_nodes import ASTNode
+from src.gerador import GeradorDeCodigo
+from src.parser import Parser
+from src.semantico import AnalisadorSemantico
+from src.tokenizer import tokenizar_em_buffer
+
+class DespachoPorNome:
+    """
+    Implementação de referência: o `visit` original, recursivo, executando
+    os métodos geradores com uma chamada de `visit` para cada filho.
+    """
+    def visit(self, node):
+        method_name = f'visit_{node.__class__.__name__}'
+        visitor = getattr(self, method_name, self.generic_visit)
+        resultado = visitor(node)
+        if not isinstance(resultado, GeneratorType):
+            return resultado
+        try:
+            filho = resultado.send(None)
+            while True:
+                filho = resultado.send(self.visit(filho))
+        except StopIteration as fim:
+            return fim.value
+
+class AnalisadorPorNome(DespachoPorNome, AnalisadorSemantico):
+    pass
+
+class GeradorPorNome(DespachoPorNome, GeradorDeCodigo):
+    pass
+
+def contar_nos(arvore):
+    total = 0
+    pendentes = [arvore]
+    while pendentes:
+        node = pendentes.pop()
+        if isinstance(node, list):
+            pendentes.extend(node)
+        elif isinstance(node, ASTNode):
+            total += 1
+            pendentes.extend(getattr(node, campo) for campo in node._campos)
+    return total
+
+def medir(funcao, rodadas=3):
+    melhor = float('inf')
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    estruturas = int(sys.argv[1]) if len(sys.argv) > 1 else 65000
+    arvore = Parser(tokenizar_em_buffer(gerar_plano(estruturas))).parse()
+    total = contar_nos(arvore)
+    print(f"AST com {total:,} nós")
+    fases = (
+        ('semântico', AnalisadorPorNome, AnalisadorSemantico, lambda v: v.visit(arvore)),
+        ('gerador', GeradorPorNome, GeradorDeCodigo, lambda v: v.gerar(arvore)),
+    )
+    for nome, antes, depois, percorrer in fases:
+        tempo_antes = medir(lambda: percorrer(antes()))
+        tempo_depois = medir(lambda: percorrer(depois()))
+        print(f"{nome:<10} getattr: {tempo_antes:.3f} s ({total / tempo_antes:,.0f} nós/s)   "
+              f"tabela: {tempo_depois:.3f} s ({total / tempo_depois:,.0f} nós/s)   "
+              f"{tempo_antes / tempo_depois:.2f}x")
+
+if __name__ == '__main__':
+    main()
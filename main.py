@@ -1,40 +1,105 @@
+import argparse
 import sys
 import os
 
 diretorio_src = os.path.join(os.path.dirname(__file__), 'src')
 sys.path.append(diretorio_src)
 
-from tokenizer import tokenizar
+from tokenizer import abrir_codigo_fonte, gerar_tokens
 from parser import Parser
 from semantico import AnalisadorSemantico
-from gerador import GeradorDeCodigo
+from gerador import GeradorDeCodigo, EmissorPython, Renderizacao
+from compilador import CompiladorDePassadaUnica
+from otimizador import otimizar
+from ir import GeradorDeIR, GerenciadorDePassos
 
 def main():
-    if len(sys.argv) != 2:
-        print("Uso: python3 main.py <caminho_para_o_arquivo.txt>")
-        sys.exit(1)
+    argumentos = argparse.ArgumentParser(description="Compilador TurtleScript para Python (Turtle Graphics).")
+    argumentos.add_argument('arquivo', help="caminho para o arquivo .txt com o programa")
+    argumentos.add_argument('--duas-passadas', action='store_true',
+                            help="faz a análise semântica e a geração de código em percursos separados "
+                                 "(caminho de referência; o padrão é uma única passada)")
+    argumentos.add_argument('-O', '--otimizar', action='store_true',
+                            help="otimiza a AST entre a análise semântica e a geração de código "
+                                 "(implica duas passadas)")
+    argumentos.add_argument('-P', '--pre-calcular', action='store_true',
+                            help="executa o programa na compilação e gera só o desenho resultante "
+                                 "(se o programa não termina a tempo, gera o código normal)")
+    argumentos.add_argument('--ir', action='store_true',
+                            help="gera o código passando pela representação intermediária linear "
+                                 "(implica duas passadas)")
+    argumentos.add_argument('--tempos', action='store_true',
+                            help="com --ir, mostra o tempo e o tamanho da IR de cada passe")
+    argumentos.add_argument('-R', '--render', action='store_true',
+                            help="desliga a animação do turtle e atualiza a tela em lotes de primitivas")
+    argumentos.add_argument('--primitivas-por-quadro', type=int, metavar='N',
+                            help="com --render, atualiza a tela a cada N primitivas (0 desliga; padrão: 100)")
+    argumentos.add_argument('--ms-por-quadro', type=float, metavar='M',
+                            help="com --render, atualiza a tela a cada M milissegundos (0 desliga; padrão)")
+    argumentos.add_argument('--so-quadro-final', action='store_true',
+                            help="com --render, desenha a tela só uma vez, no fim")
+    opcoes = argumentos.parse_args()
+    if opcoes.ir and opcoes.pre_calcular:
+        argumentos.error("--ir não pode ser usado com --pre-calcular")
+    if opcoes.tempos and not opcoes.ir:
+        argumentos.error("--tempos só vale com --ir")
+    intervalos = {nome: valor for nome, valor in (('primitivas', opcoes.primitivas_por_quadro),
+                                                  ('milissegundos', opcoes.ms_por_quadro)) if valor is not None}
+    renderizacao = None
+    if opcoes.render:
+        try:
+            renderizacao = Renderizacao(**intervalos, so_quadro_final=opcoes.so_quadro_final)
+        except ValueError as erro:
+            argumentos.error(str(erro))
+    elif intervalos or opcoes.so_quadro_final:
+        argumentos.error("--primitivas-por-quadro, --ms-por-quadro e --so-quadro-final só valem com --render")
 
-    caminho_arquivo_entrada = sys.argv[1]
+    caminho_arquivo_entrada = opcoes.arquivo
 
     nome_base = os.path.splitext(os.path.basename(caminho_arquivo_entrada))[0]
     caminho_arquivo_saida = os.path.join('examples', 'output', f'saida_{nome_base}.py')
 
     try:
-        with open(caminho_arquivo_entrada, 'r', encoding='utf-8') as arquivo:
-            codigo_fonte = arquivo.read()
-        print(f"--- Compilando o arquivo: {caminho_arquivo_entrada} ---")
-
-        # Fases de Análise
-        tokens = tokenizar(codigo_fonte)
-        parser = Parser(tokens)
-        arvore_sintatica = parser.parse()
-        analisador_semantico = AnalisadorSemantico()
-        analisador_semantico.visit(arvore_sintatica)
-        print("Análise Léxica, Sintática e Semântica concluídas com sucesso!")
-
-        # Geração do Código
-        gerador = GeradorDeCodigo()
-        codigo_python = gerador.gerar(arvore_sintatica, nome_base)
+        # O arquivo é mapeado em memória e varrido como bytes UTF-8
+        with abrir_codigo_fonte(caminho_arquivo_entrada) as codigo_fonte:
+            print(f"--- Compilando o arquivo: {caminho_arquivo_entrada} ---")
+
+            # Fases de Análise
+            tokens = gerar_tokens(codigo_fonte)
+            # Todos os erros de sintaxe do arquivo são informados de uma vez
+            parser = Parser(tokens, recuperar_erros=True)
+            try:
+                arvore_sintatica = parser.parse()
+            except SyntaxError as erro:
+                # Um erro léxico encerra a análise, depois dos erros de sintaxe já encontrados
+                parser.erros.append(erro)
+            if parser.erros:
+                for erro in parser.erros:
+                    print(f"\nERRO: {erro}")
+                sys.exit(1)
+        if opcoes.duas_passadas or opcoes.otimizar or opcoes.ir:
+            analisador_semantico = AnalisadorSemantico()
+            analisador_semantico.visit(arvore_sintatica)
+            print("Análise Léxica, Sintática e Semântica concluídas com sucesso!")
+
+            if opcoes.otimizar:
+                arvore_sintatica = otimizar(arvore_sintatica)
+
+            # Geração do Código
+            if opcoes.ir:
+                gerenciador = GerenciadorDePassos()
+                programa = gerenciador.executar(GeradorDeIR().gerar(arvore_sintatica))
+                if opcoes.tempos:
+                    print(gerenciador.formatar_relatorio())
+                codigo_python = EmissorPython().gerar(programa, nome_base, renderizacao)
+            else:
+                gerador = GeradorDeCodigo()
+                codigo_python = gerador.gerar(arvore_sintatica, nome_base, opcoes.pre_calcular, renderizacao)
+        else:
+            # Verificação de tipos e geração do código no mesmo percurso
+            codigo_python = CompiladorDePassadaUnica().gerar(arvore_sintatica, nome_base, opcoes.pre_calcular,
+                                                             renderizacao)
+            print("Análise Léxica, Sintática e Semântica concluídas com sucesso!")
 
         os.makedirs(os.path.dirname(caminho_arquivo_saida), exist_ok=True)
         with open(caminho_arquivo_saida, 'w', encoding='utf-8') as arquivo_saida:
@@ -1,83 +1,234 @@
 class ASTNode:
-    """ Nó base para a AST. """
+    """
+    Nó base para a AST. Os nós usam `__slots__`: não têm `__dict__`, e os
+    campos derivados do token (`valor`, `nome`) são propriedades, não cópias.
+    """
+    __slots__ = ()
+
+    # Campos que definem o nó, na ordem do construtor; usados na comparação e
+    # na representação. Calculado a partir dos `__slots__` de cada classe.
+    _campos = ()
+
+    # Intervalo [inicio, fim) dos índices de tokens que o nó cobre, registrado
+    # pelo parser em Bloco, Repita, Se e Enquanto. É metadado de posição: não
+    # entra na comparação nem na representação do nó.
+    intervalo = None
+
+    # Anotações da análise semântica, também metadados: o tipo inferido de
+    # cada expressão (e de cada variável declarada) e, em Variavel, o
+    # `Simbolo` da tabela de símbolos a que o nome se refere.
+    tipo_inferido = None
+    simbolo = None
+
+    _METADADOS = ('intervalo', 'tipo_inferido', 'simbolo')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._campos = tuple(nome for nome in cls.__slots__
+                            if nome not in ASTNode._METADADOS and nome[0] != '_')
+
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, self.__class__):
             return False
-        return self.__dict__ == other.__dict__
+        return all(getattr(self, nome) == getattr(other, nome) for nome in self._campos)
 
     def __repr__(self):
-        attrs = ", ".join(f"{k}={v!r}" for k, v in self.__dict__.items())
+        attrs = ", ".join(f"{nome}={getattr(self, nome)!r}" for nome in self._campos)
         return f"{self.__class__.__name__}({attrs})"
 
+class NoImutavel(ASTNode):
+    """
+    Nó que não muda depois de criado (tipos e expressões), a não ser pelas
+    anotações da análise semântica, que não fazem parte dele. Tem um hash
+    estrutural calculado na construção a partir dos hashes dos filhos, então
+    pode ser chave de dicionário, e a comparação só desce na estrutura
+    quando os hashes coincidem. O hash usa só o lexema dos tokens (nem o tipo
+    nem a linha); nós diferentes com o mesmo hash apenas comparam mais fundo.
+    """
+    __slots__ = ('_hash',)
+
+    def __hash__(self):
+        return self._hash
+
+    def __deepcopy__(self, memo):
+        # Imutável: uma cópia de um comando pode compartilhar as expressões
+        return self
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, self.__class__) or self._hash != other._hash:
+            return False
+        return ASTNode.__eq__(self, other)
+
 class Programa(ASTNode):
+    __slots__ = ('bloco',)
+
     def __init__(self, bloco):
         self.bloco = bloco
 
 class Bloco(ASTNode):
+    __slots__ = ('declaracoes', 'comandos', 'intervalo')
+
     def __init__(self, declaracoes, comandos):
         self.declaracoes = declaracoes
         self.comandos = comandos
+        self.intervalo = None
 
 class VarDecl(ASTNode):
+    __slots__ = ('tipo_no', 'var_nos')
+
     def __init__(self, tipo_no, var_nos):
         self.tipo_no = tipo_no
         self.var_nos = var_nos
 
-class Tipo(ASTNode):
+class Tipo(NoImutavel):
+    __slots__ = ('token',)
+
     def __init__(self, token):
         self.token = token
-        self.valor = token.valor
+        self._hash = hash((Tipo, token.valor))
+
+    @property
+    def valor(self):
+        return self.token.valor
+
+class Variavel(NoImutavel):
+    __slots__ = ('token', 'tipo_inferido', 'simbolo')
 
-class Variavel(ASTNode):
     def __init__(self, token):
         self.token = token
-        self.nome = token.valor
+        self.tipo_inferido = None
+        self.simbolo = None
+        self._hash = hash((Variavel, token.valor))
+
+    @property
+    def nome(self):
+        return self.token.valor
 
 class Atribuicao(ASTNode):
+    __slots__ = ('var_no', 'expressao')
+
     def __init__(self, var_no, expressao):
         self.var_no = var_no
         self.expressao = expressao
 
 class ComandoSimples(ASTNode):
+    __slots__ = ('token', 'expressao')
+
     def __init__(self, token, expressao=None):
         self.token = token
         self.expressao = expressao
 
 class ComandoIrPara(ASTNode):
+    __slots__ = ('token', 'expr_x', 'expr_y')
+
     def __init__(self, token, expr_x, expr_y):
         self.token = token
         self.expr_x = expr_x
         self.expr_y = expr_y
 
 class Repita(ASTNode):
+    __slots__ = ('vezes', 'bloco', 'intervalo')
+
     def __init__(self, vezes, bloco):
         self.vezes = vezes
         self.bloco = bloco
+        self.intervalo = None
 
 class Se(ASTNode):
+    __slots__ = ('condicao', 'bloco_se', 'bloco_senao', 'intervalo')
+
     def __init__(self, condicao, bloco_se, bloco_senao=None):
         self.condicao = condicao
         self.bloco_se = bloco_se
         self.bloco_senao = bloco_senao
+        self.intervalo = None
 
 class Enquanto(ASTNode):
+    __slots__ = ('condicao', 'bloco', 'intervalo')
+
     def __init__(self, condicao, bloco):
         self.condicao = condicao
         self.bloco = bloco
+        self.intervalo = None
+
+class Literal(NoImutavel):
+    __slots__ = ('token', 'tipo_inferido')
 
-class Literal(ASTNode):
     def __init__(self, token):
         self.token = token
-        self.valor = token.valor
+        self.tipo_inferido = None
+        self._hash = hash((Literal, token.valor))
+
+    @property
+    def valor(self):
+        return self.token.valor
+
+class UnaryOp(NoImutavel):
+    __slots__ = ('op', 'expr', 'tipo_inferido')
 
-class UnaryOp(ASTNode):
     def __init__(self, op, expr):
         self.op = op
-        self.token = op
         self.expr = expr
+        self.tipo_inferido = None
+        self._hash = hash((UnaryOp, op.valor, expr._hash))
+
+    @property
+    def token(self):
+        return self.op
+
+class BinOp(NoImutavel):
+    __slots__ = ('esq', 'op', 'dir', 'tipo_inferido')
 
-class BinOp(ASTNode):
     def __init__(self, esq, op, dir):
         self.esq = esq
         self.op = op
         self.dir = dir
+        self.tipo_inferido = None
+        self._hash = hash((BinOp, esq._hash, op.valor, dir._hash))
+
+class FabricaDeNos:
+    """
+    Fábrica de nós imutáveis com hash-consing: subárvores estruturalmente
+    iguais são criadas uma única vez e compartilhadas, de modo que, entre nós
+    da mesma fábrica, igualdade é identidade. Como os filhos já são únicos,
+    cada nó é procurado pela identidade deles, em tempo constante.
+
+    Por padrão a linha do token faz parte da identidade do nó. Com
+    `ignorar_linhas=True`, ocorrências em linhas diferentes também são
+    compartilhadas (mais economia, útil para otimizações e caches), e o nó
+    guarda o token da primeira ocorrência.
+    """
+    def __init__(self, ignorar_linhas: bool = False):
+        self.ignorar_linhas = ignorar_linhas
+        self._nos = {}
+
+    def __len__(self) -> int:
+        return len(self._nos)
+
+    def _chave_token(self, token):
+        return (token.tipo, token.valor) if self.ignorar_linhas else token
+
+    def _internar(self, chave, classe, *args):
+        node = self._nos.get(chave)
+        if node is None:
+            node = self._nos[chave] = classe(*args)
+        return node
+
+    def tipo(self, token) -> Tipo:
+        return self._internar((Tipo, self._chave_token(token)), Tipo, token)
+
+    def literal(self, token) -> Literal:
+        return self._internar((Literal, self._chave_token(token)), Literal, token)
+
+    def variavel(self, token) -> Variavel:
+        return self._internar((Variavel, self._chave_token(token)), Variavel, token)
+
+    def unario(self, op, expr) -> UnaryOp:
+        return self._internar((UnaryOp, self._chave_token(op), id(expr)), UnaryOp, op, expr)
+
+    def binario(self, esq, op, dir) -> BinOp:
+        return self._internar((BinOp, id(esq), self._chave_token(op), id(dir)), BinOp, esq, op, dir)
@@ -0,0 +1,271 @@
+"""
+Avaliação estática: como um programa TurtleScript não tem entrada, tudo o
+que ele desenha já está decidido na compilação. O `AvaliadorEstatico`
+executa a AST verificada (com um limite de passos) e registra o desenho
+como uma lista de chamadas aos métodos da tartaruga, que o gerador de
+código pode emitir como dados no lugar do programa.
+"""
+import math
+from ast import literal_eval
+
+from src.ast_nodes import *
+from src.visitor import Visitor
+
+# Passos (comandos executados, voltas de laços e testes de condição) da avaliação
+PASSOS_PADRAO = 20000
+
+# Maior inteiro (em bits) calculado na compilação; acima disso o programa
+# é deixado para a execução
+MAXIMO_BITS = 4096
+
+# Maior texto (em caracteres) montado na compilação: `s = s + s` num laço
+# dobra o texto a cada volta, muito antes de esgotar os passos
+MAXIMO_CARACTERES = 65536
+
+_VALORES_PADRAO = {'inteiro': 0, 'real': 0.0, 'texto': '', 'logico': False}
+
+_OPERACOES = {
+    '+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b, '%': lambda a, b: a % b,
+    '==': lambda a, b: a == b, '!=': lambda a, b: a != b, '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b, '<=': lambda a, b: a <= b, '>=': lambda a, b: a >= b,
+}
+
+# Comandos de estilo: a operação registrada é o próprio método da tartaruga
+_ESTILOS = {'DEFINIR_COR': 'pencolor', 'DEFINIR_ESPESSURA': 'pensize',
+            'COR_DE_FUNDO': 'bgcolor', 'LIMPAR_TELA': 'clear'}
+
+class OrcamentoEsgotado(Exception):
+    """ O programa não terminou dentro do limite de passos da avaliação. """
+
+def _girar(vetor, angulo):
+    """ `Vec2D.rotate` do módulo turtle, com as mesmas contas. """
+    x, y = vetor
+    angulo = math.radians(angulo)
+    c, s = math.cos(angulo), math.sin(angulo)
+    return (x * c + -y * s, y * c + x * s)
+
+def _rumo(vetor):
+    """ `heading()` do módulo turtle para a orientação `vetor`. """
+    x, y = vetor
+    return round(math.degrees(math.atan2(y, x)), 10) % 360.0
+
+def _apontar(vetor, rumo):
+    """ A orientação depois de `setheading(rumo)`. """
+    angulo = (rumo - _rumo(vetor) + 180.0) % 360.0 - 180.0
+    return _girar(vetor, angulo * 1.0)
+
+class Tartaruga:
+    """
+    Simula a tartaruga do módulo turtle (modo padrão, em graus) com as mesmas
+    operações de ponto flutuante, então as posições calculadas são as que o
+    programa gerado teria. Registra em `operacoes` as chamadas que reproduzem
+    o desenho: deslocamentos viram `goto` absolutos e giros só mudam o estado.
+    A orientação só é emitida (`setheading`) quando importa: antes de um
+    `circle` e no fim.
+    """
+    def __init__(self):
+        self.posicao = (0.0, 0.0)
+        self.orientacao = (1.0, 0.0)
+        self.caneta = True
+        self.operacoes = []
+        # Orientação da tartaruga que reproduz as operações
+        self._orientacao_emitida = (1.0, 0.0)
+
+    def girar(self, angulo):
+        self.orientacao = _girar(self.orientacao, angulo * 1.0)
+
+    def andar(self, distancia):
+        x, y = self.posicao
+        dx, dy = self.orientacao
+        self.ir(x + dx * distancia, y + dy * distancia)
+
+    def ir(self, x, y):
+        self.posicao = (x, y)
+        # Com a caneta levantada, só a posição final de uma sequência importa
+        if not self.caneta and self.operacoes and self.operacoes[-1][0] == 'goto':
+            self.operacoes[-1] = ('goto', x, y)
+        else:
+            self.operacoes.append(('goto', x, y))
+
+    def rumo(self):
+        return _rumo(self.orientacao)
+
+    def apontar(self, rumo):
+        self.orientacao = _apontar(self.orientacao, rumo)
+
+    def definir_caneta(self, abaixada: bool):
+        if abaixada != self.caneta:
+            self.caneta = abaixada
+            self.operacoes.append(('pendown',) if abaixada else ('penup',))
+
+    def circulo(self, raio):
+        self._emitir_rumo()
+        self.operacoes.append(('circle', raio))
+        # Mesmo polígono de `circle` do módulo turtle
+        passos = 1 + int(min(11 + abs(raio) / 6.0, 59.0) * 1.0)
+        w = 1.0 * 360.0 / passos
+        w2 = 0.5 * w
+        lado = 2.0 * raio * math.sin(math.radians(w2) * 1.0)
+        if raio < 0:
+            lado, w, w2 = -lado, -w, -w2
+        self.girar(w2)
+        for _ in range(passos):
+            x, y = self.posicao
+            dx, dy = self.orientacao
+            self.posicao = (x + dx * lado, y + dy * lado)
+            self.girar(w)
+        self.girar(-w2)
+        self._orientacao_emitida = self.orientacao
+
+    def estilo(self, metodo, *argumentos):
+        self.operacoes.append((metodo, *argumentos))
+
+    def _emitir_rumo(self):
+        rumo = self.rumo()
+        if _rumo(self._orientacao_emitida) != rumo:
+            self.operacoes.append(('setheading', rumo))
+            self._orientacao_emitida = _apontar(self._orientacao_emitida, rumo)
+
+    def finalizar(self) -> list:
+        self._emitir_rumo()
+        return self.operacoes
+
+class AvaliadorEstatico(Visitor):
+    """
+    Executa um programa já verificado pela análise semântica, com a mesma
+    semântica do código gerado ('/' sempre real, variáveis do bloco
+    principal começando com o valor padrão), e devolve as operações
+    de desenho da `Tartaruga`. Levanta `OrcamentoEsgotado` se o programa
+    passa de `passos`, e o erro de execução do programa, se houver um.
+    """
+    def __init__(self, passos: int = PASSOS_PADRAO):
+        self.passos = passos
+        self.variaveis = {}
+        self.tartaruga = Tartaruga()
+        self.pilha_posicao = []
+
+    def executar(self, arvore: Programa) -> list:
+        self.visit(arvore)
+        return self.tartaruga.finalizar()
+
+    def _passo(self):
+        self.passos -= 1
+        if self.passos < 0:
+            raise OrcamentoEsgotado("O programa não terminou dentro do limite de passos.")
+
+    def visit_Programa(self, node: Programa):
+        # Só as variáveis do bloco principal são inicializadas pelo gerador
+        for declaracao in node.bloco.declaracoes:
+            for var in declaracao.var_nos:
+                self.variaveis[var.nome] = _VALORES_PADRAO[declaracao.tipo_no.valor]
+        yield node.bloco
+
+    def visit_Bloco(self, node: Bloco):
+        for comando in node.comandos:
+            self._passo()
+            yield comando
+
+    def visit_Atribuicao(self, node: Atribuicao):
+        self.variaveis[node.var_no.nome] = yield node.expressao
+
+    def visit_ComandoSimples(self, node: ComandoSimples):
+        argumento = (yield node.expressao) if node.expressao else None
+        comando = node.token.tipo
+        tartaruga = self.tartaruga
+        if comando == 'AVANCAR':
+            tartaruga.andar(argumento)
+        elif comando == 'RECUAR':
+            tartaruga.andar(-argumento)
+        elif comando == 'GIRAR_DIREITA':
+            tartaruga.girar(-argumento)
+        elif comando == 'GIRAR_ESQUERDA':
+            tartaruga.girar(argumento)
+        elif comando == 'CIRCULO':
+            tartaruga.circulo(argumento)
+        elif comando in ('LEVANTAR_CANETA', 'ABAIXAR_CANETA'):
+            tartaruga.definir_caneta(comando == 'ABAIXAR_CANETA')
+        elif comando == 'EMPURRAR_POSICAO':
+            self.pilha_posicao.append((tartaruga.posicao, tartaruga.rumo()))
+        elif comando == 'RESTAURAR_POSICAO':
+            # Como no código gerado: levanta a caneta, volta e a abaixa de novo
+            if self.pilha_posicao:
+                posicao, rumo = self.pilha_posicao.pop()
+                tartaruga.definir_caneta(False)
+                tartaruga.ir(*posicao)
+                tartaruga.apontar(rumo)
+                tartaruga.definir_caneta(True)
+        elif node.expressao:
+            tartaruga.estilo(_ESTILOS[comando], argumento)
+        else:
+            tartaruga.estilo(_ESTILOS[comando])
+
+    def visit_ComandoIrPara(self, node: ComandoIrPara):
+        x = yield node.expr_x
+        y = yield node.expr_y
+        self.tartaruga.ir(x, y)
+
+    def visit_Repita(self, node: Repita):
+        vezes = yield node.vezes
+        for _ in range(vezes):
+            self._passo()
+            yield node.bloco
+
+    def visit_Se(self, node: Se):
+        if (yield node.condicao):
+            yield node.bloco_se
+        elif node.bloco_senao:
+            yield node.bloco_senao
+
+    def visit_Enquanto(self, node: Enquanto):
+        while True:
+            self._passo()
+            if not (yield node.condicao):
+                break
+            yield node.bloco
+
+    def visit_Literal(self, node: Literal):
+        tipo = node.token.tipo
+        if tipo == 'NUMERO_INTEIRO':
+            return int(node.valor)
+        if tipo == 'NUMERO_REAL':
+            return float(node.valor)
+        if tipo == 'TEXTO':
+            return literal_eval(node.valor)
+        return tipo == 'VERDADEIRO'
+
+    def visit_Variavel(self, node: Variavel):
+        if node.nome not in self.variaveis:
+            raise NameError(f"name '{node.nome}' is not defined")
+        return self.variaveis[node.nome]
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        valor = yield node.expr
+        if node.op.valor == '-':
+            return -valor
+        # O gerador omite o '+' quando a expressão foi anotada
+        return valor if node.tipo_inferido is not None else +valor
+
+    def visit_BinOp(self, node: BinOp):
+        esq = yield node.esq
+        dir = yield node.dir
+        valor = _OPERACOES[node.op.valor](esq, dir)
+        if (isinstance(valor, int) and valor.bit_length() > MAXIMO_BITS
+                or isinstance(valor, str) and len(valor) > MAXIMO_CARACTERES):
+            raise OrcamentoEsgotado("Valor grande demais para ser calculado na compilação.")
+        return valor
+
+def avaliar(arvore: Programa, passos: int = PASSOS_PADRAO):
+    """
+    As operações de desenho do programa, ou None se elas não podem ser
+    calculadas na compilação: o programa passa do limite de passos, tem um
+    erro de execução ou produz um valor sem representação literal (nan, inf).
+    """
+    try:
+        operacoes = AvaliadorEstatico(passos).executar(arvore)
+    except (OrcamentoEsgotado, ArithmeticError, NameError, TypeError, ValueError, SyntaxError):
+        return None
+    for operacao in operacoes:
+        if any(isinstance(valor, float) and not math.isfinite(valor) for valor in operacao[1:]):
+            return None
+    return operacoes
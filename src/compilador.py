@@ -0,0 +1,97 @@
+from src.ast_nodes import *
+from src.gerador import GeradorDeCodigo
+from src.semantico import AnalisadorSemantico
+
+class CompiladorDePassadaUnica(AnalisadorSemantico, GeradorDeCodigo):
+    """
+    Verifica os tipos e gera o código Python num único percurso da AST, em
+    vez de uma passada do `AnalisadorSemantico` seguida de outra do
+    `GeradorDeCodigo`. Cada expressão devolve o par (tipo, código).
+
+    As verificações e os trechos de código são os mesmos das duas classes;
+    só o percurso é compartilhado. Os nós são visitados na ordem da análise
+    semântica, então o primeiro erro é o mesmo do caminho em duas passadas,
+    e o código produzido (`gerar`) é idêntico.
+    """
+    def __init__(self):
+        AnalisadorSemantico.__init__(self)
+        GeradorDeCodigo.__init__(self)
+
+    def visit_Programa(self, node: Programa):
+        yield node.bloco
+
+    def visit_Bloco(self, node: Bloco):
+        # Como no gerador, só as declarações do bloco principal são emitidas;
+        # as demais são apenas registradas na tabela de símbolos
+        if self.nivel_indentacao == 0:
+            self.codigo_python.append("# Inicialização de variáveis")
+            for declaracao in node.declaracoes:
+                AnalisadorSemantico.visit_VarDecl(self, declaracao)
+                GeradorDeCodigo.visit_VarDecl(self, declaracao)
+            self.codigo_python.append("")
+        else:
+            for declaracao in node.declaracoes:
+                AnalisadorSemantico.visit_VarDecl(self, declaracao)
+        inicio = len(self.codigo_python)
+        for comando in node.comandos:
+            self._emitir_comando(comando, (yield comando))
+        self._completar_bloco(inicio)
+
+    def visit_Atribuicao(self, node: Atribuicao):
+        tipo_declarado = self._tipo_declarado(node)
+        tipo_expressao, expressao = yield node.expressao
+        self._verificar_atribuicao(node, tipo_declarado, tipo_expressao)
+        return f"{node.var_no.nome} = {expressao}"
+
+    def visit_Variavel(self, node: Variavel):
+        return self._tipo_variavel(node), node.nome
+
+    def visit_Literal(self, node: Literal):
+        return AnalisadorSemantico.visit_Literal(self, node), GeradorDeCodigo.visit_Literal(self, node)
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        tipo_expr, expr = yield node.expr
+        return self._tipo_unario(node, tipo_expr), self._codigo_unario(node, expr)
+
+    def visit_BinOp(self, node: BinOp):
+        tipo_esq, esq = yield node.esq
+        tipo_dir, dir = yield node.dir
+        return self._tipo_binario(node, tipo_esq, tipo_dir), self._codigo_binario(node, esq, dir)
+
+    def visit_ComandoSimples(self, node: ComandoSimples):
+        argumento = None
+        if node.expressao:
+            tipo_argumento, argumento = yield node.expressao
+            self._verificar_argumento(node, tipo_argumento)
+        return self._codigo_comando(node, argumento)
+
+    def visit_ComandoIrPara(self, node: ComandoIrPara):
+        tipo_x, x = yield node.expr_x
+        tipo_y, y = yield node.expr_y
+        self._verificar_ir_para(node, tipo_x, tipo_y)
+        return f"t.goto({x}, {y})"
+
+    def visit_Repita(self, node: Repita):
+        self._verificar_repita(node)
+        _, vezes = yield node.vezes
+        self._abrir(f"for _ in range({vezes}):")
+        yield node.bloco
+        self.nivel_indentacao -= 1
+
+    def visit_Se(self, node: Se):
+        tipo_condicao, condicao = yield node.condicao
+        self._verificar_condicao('se', tipo_condicao)
+        self._abrir(f"if {condicao}:")
+        yield node.bloco_se
+        self.nivel_indentacao -= 1
+        if node.bloco_senao:
+            self._abrir("else:")
+            yield node.bloco_senao
+            self.nivel_indentacao -= 1
+
+    def visit_Enquanto(self, node: Enquanto):
+        tipo_condicao, condicao = yield node.condicao
+        self._verificar_condicao('enquanto', tipo_condicao)
+        self._abrir(f"while {condicao}:")
+        yield node.bloco
+        self.nivel_indentacao -= 1
@@ -1,143 +1,364 @@
 import src.ast_nodes as ast
+from src.avaliador import avaliar
+from src.ir import BINARIAS, Operacao, ProgramaIR
+from src.visitor import Visitor
 
-class Visitor:
-    def visit(self, node):
-        method_name = f'visit_{node.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+# Método da tartaruga (ou da tela, para 'cor_de_fundo') de cada comando simples
+METODOS = {
+    'AVANCAR': 'forward', 'RECUAR': 'backward', 'GIRAR_DIREITA': 'right', 'GIRAR_ESQUERDA': 'left',
+    'LEVANTAR_CANETA': 'penup', 'ABAIXAR_CANETA': 'pendown', 'LIMPAR_TELA': 'clear',
+    'DEFINIR_COR': 'pencolor', 'COR_DE_FUNDO': 'bgcolor', 'DEFINIR_ESPESSURA': 'pensize',
+    'CIRCULO': 'circle'
+}
 
-    def generic_visit(self, node):
-        raise NotImplementedError(f"O método visit_{node.__class__.__name__} não foi implementado.")
+VALORES_PADRAO = {'inteiro': 0, 'real': 0.0, 'texto': '""', 'logico': 'False'}
+
+# Comandos que desenham ou apagam: cada um conta como uma primitiva na renderização em lotes
+PRIMITIVAS = frozenset(('AVANCAR', 'RECUAR', 'IR_PARA', 'CIRCULO', 'LIMPAR_TELA', 'RESTAURAR_POSICAO'))
+
+class Renderizacao:
+    """
+    Como o programa gerado atualiza a tela. Sem uma Renderizacao o turtle
+    redesenha a tela (e espera o `delay` dela) a cada primitiva. Com ela, a
+    animação é desligada (`screen.tracer(0, 0)`) e a tela só é desenhada por
+    `screen.update()`: depois de `primitivas` primitivas ou de `milissegundos`
+    desde o último quadro, o que vier primeiro (0 desliga o critério), e
+    sempre no fim. Com `so_quadro_final`, ou com os dois critérios
+    desligados, só o quadro final é desenhado.
+    """
+    def __init__(self, primitivas: int = 100, milissegundos: float = 0, so_quadro_final: bool = False):
+        if primitivas < 0 or milissegundos < 0:
+            raise ValueError("Os intervalos entre quadros não podem ser negativos.")
+        self.primitivas = primitivas
+        self.milissegundos = milissegundos
+        self.so_quadro_final = so_quadro_final or not (primitivas or milissegundos)
+
+    def importacoes(self) -> list:
+        return [] if self.so_quadro_final or not self.milissegundos else ["import time"]
+
+    def configuracao(self) -> list:
+        """ As linhas que desligam a animação e definem `_quadro()`, chamada a cada primitiva. """
+        linhas = ["# --- Renderização ---", "screen.tracer(0, 0)"]
+        if self.so_quadro_final:
+            return linhas + [""]
+        globais, condicoes, reinicio = [], [], []
+        if self.primitivas:
+            linhas.append("_primitivas = 0")
+            globais.append("_primitivas")
+            condicoes.append(f"_primitivas >= {self.primitivas}")
+            reinicio.append("        _primitivas = 0")
+        if self.milissegundos:
+            linhas.append("_ultimo_quadro = time.perf_counter()")
+            globais.append("_ultimo_quadro")
+            condicoes.append(f"time.perf_counter() - _ultimo_quadro >= {self.milissegundos / 1000!r}")
+            reinicio.append("        _ultimo_quadro = time.perf_counter()")
+        linhas.extend(["", "def _quadro():", f"    global {', '.join(globais)}"])
+        if self.primitivas:
+            linhas.append("    _primitivas += 1")
+        linhas.append(f"    if {' or '.join(condicoes)}:")
+        linhas.append("        screen.update()")
+        linhas.extend(reinicio)
+        return linhas + [""]
+
+def cabecalho(nome_arquivo_base, renderizacao: Renderizacao = None) -> list:
+    """ As linhas iniciais de todo programa gerado: importações e configuração. """
+    return [
+        "import turtle", "import math", *(renderizacao.importacoes() if renderizacao else ()), "",
+        "# --- Configuração da Tela e Tartaruga ---",
+        "screen = turtle.Screen()", f'screen.title("{nome_arquivo_base}")',
+        "t = turtle.Turtle()", "t.speed(0)", "pilha_posicao = []", "",
+        *(renderizacao.configuracao() if renderizacao else ()),
+        "# --- Código Gerado pelo Compilador ---",
+    ]
+
+def rodape(renderizacao: Renderizacao = None) -> list:
+    """ As linhas finais: o último quadro, se a tela é atualizada pelo programa, e `turtle.done()`. """
+    return ["", "# --- Finalização ---", *(["screen.update()"] if renderizacao else ()), "turtle.done()"]
+
+def codigo_comando(comando, argumento) -> list:
+    """ As linhas (sem indentação) de um comando simples; `argumento` é None se não há. """
+    if comando == 'EMPURRAR_POSICAO':
+        return ["pilha_posicao.append({'pos': t.pos(), 'heading': t.heading()})"]
+    if comando == 'RESTAURAR_POSICAO':
+        return [
+            "if pilha_posicao:", "    estado = pilha_posicao.pop()", "    t.penup()",
+            "    t.setpos(estado['pos'])", "    t.setheading(estado['heading'])", "    t.pendown()"
+        ]
+    comando_python = METODOS.get(comando)
+    if argumento is not None:
+        if comando == 'COR_DE_FUNDO':
+            return [f"screen.{comando_python}({argumento})"]
+        return [f"t.{comando_python}({argumento})"]
+    return [f"t.{comando_python}()"]
 
 class GeradorDeCodigo(Visitor):
     def __init__(self):
         self.codigo_python = []
         self.nivel_indentacao = 0
         self.pilha_posicao = []
+        self.renderizacao = None
 
     def _indentar(self, codigo):
         return "    " * self.nivel_indentacao + codigo
 
-    def gerar(self, node, nome_arquivo_base="Resultado"):
-        self.codigo_python.append("import turtle")
-        self.codigo_python.append("import math")
-        self.codigo_python.append("")
-        self.codigo_python.append("# --- Configuração da Tela e Tartaruga ---")
-        self.codigo_python.append("screen = turtle.Screen()")
-        self.codigo_python.append(f'screen.title("{nome_arquivo_base}")')
-        self.codigo_python.append("t = turtle.Turtle()")
-        self.codigo_python.append("t.speed(0)")
-        self.codigo_python.append("pilha_posicao = []")
-        self.codigo_python.append("")
-        self.codigo_python.append("# --- Código Gerado pelo Compilador ---")
+    def _abrir(self, cabecalho):
+        """ Emite o cabeçalho de uma estrutura e indenta o seu corpo. """
+        self.codigo_python.append(self._indentar(cabecalho))
+        self.nivel_indentacao += 1
+
+    def gerar(self, node, nome_arquivo_base="Resultado", pre_calcular=False, renderizacao: Renderizacao = None):
+        """
+        O programa Python completo. Com `pre_calcular`, o programa é executado
+        na compilação (`avaliar`) e o código gerado só reproduz o desenho
+        resultante; se isso não é possível, o código é o de sempre. Com uma
+        `renderizacao`, a tela é atualizada em lotes (ver `Renderizacao`).
+        """
+        self.renderizacao = renderizacao
+        self.codigo_python.extend(cabecalho(nome_arquivo_base, renderizacao))
+        inicio = len(self.codigo_python)
+        # O percurso é feito mesmo com `pre_calcular`: no compilador de
+        # passada única, é ele que verifica os tipos
         self.visit(node)
-        self.codigo_python.append("")
-        self.codigo_python.append("# --- Finalização ---")
-        self.codigo_python.append("turtle.done()")
+        if pre_calcular:
+            operacoes = avaliar(node)
+            if operacoes is not None:
+                self.codigo_python[inicio:] = self._codigo_pre_calculado(operacoes)
+        self.codigo_python.extend(rodape(renderizacao))
         return "\n".join(self.codigo_python)
 
+    def _codigo_pre_calculado(self, operacoes):
+        """ A lista de operações de desenho como dados e o laço que a reproduz. """
+        codigo = ["# Desenho calculado na compilação: (método, argumentos...)", "operacoes = ["]
+        codigo.extend(f"    {operacao!r}," for operacao in operacoes)
+        codigo.append("]")
+        codigo.append("for metodo, *argumentos in operacoes:")
+        codigo.append("    getattr(screen if metodo == 'bgcolor' else t, metodo)(*argumentos)")
+        if self._em_lotes():
+            codigo.append("    if metodo in ('goto', 'circle', 'clear'):")
+            codigo.append("        _quadro()")
+        return codigo
+
+    def _em_lotes(self) -> bool:
+        return self.renderizacao is not None and not self.renderizacao.so_quadro_final
+
+    def _emitir_comando(self, comando, linha_codigo):
+        """ Emite a linha de um comando do bloco e, se ele é uma primitiva, a contagem do quadro. """
+        if linha_codigo is not None:
+            self.codigo_python.append(self._indentar(linha_codigo))
+        if (self._em_lotes() and isinstance(comando, (ast.ComandoSimples, ast.ComandoIrPara))
+                and comando.token.tipo in PRIMITIVAS):
+            self.codigo_python.append(self._indentar("_quadro()"))
+
     def visit_Programa(self, node: ast.Programa):
-        self.visit(node.bloco)
+        yield node.bloco
 
     def visit_Bloco(self, node: ast.Bloco):
         if self.nivel_indentacao == 0:
             self.codigo_python.append("# Inicialização de variáveis")
             for declaracao in node.declaracoes:
-                self.visit(declaracao)
+                yield declaracao
             self.codigo_python.append("")
+        inicio = len(self.codigo_python)
         for comando in node.comandos:
-            linha_codigo = self.visit(comando)
-            if linha_codigo is not None:
-                self.codigo_python.append(self._indentar(linha_codigo))
+            self._emitir_comando(comando, (yield comando))
+        self._completar_bloco(inicio)
+
+    def _completar_bloco(self, inicio):
+        """ Um bloco aninhado sem comandos precisa de um 'pass' em Python. """
+        if self.nivel_indentacao > 0 and len(self.codigo_python) == inicio:
+            self.codigo_python.append(self._indentar("pass"))
 
     def visit_ComandoSimples(self, node: ast.ComandoSimples):
-        comando = node.token.tipo
-        if comando == 'EMPURRAR_POSICAO':
-            return "pilha_posicao.append({'pos': t.pos(), 'heading': t.heading()})"
-        if comando == 'RESTAURAR_POSICAO':
-            bloco_restaurar = [
-                "if pilha_posicao:", "    estado = pilha_posicao.pop()", "    t.penup()",
-                "    t.setpos(estado['pos'])", "    t.setheading(estado['heading'])", "    t.pendown()"
-            ]
-            for linha in bloco_restaurar:
-                self.codigo_python.append(self._indentar(linha))
-            return None
-        mapa_comandos = {
-            'AVANCAR': 'forward', 'RECUAR': 'backward', 'GIRAR_DIREITA': 'right', 'GIRAR_ESQUERDA': 'left',
-            'LEVANTAR_CANETA': 'penup', 'ABAIXAR_CANETA': 'pendown', 'LIMPAR_TELA': 'clear',
-            'DEFINIR_COR': 'pencolor', 'COR_DE_FUNDO': 'bgcolor', 'DEFINIR_ESPESSURA': 'pensize',
-            'CIRCULO': 'circle'
-        }
-        comando_python = mapa_comandos.get(comando)
-        if node.expressao:
-            argumento = self.visit(node.expressao)
-            if comando == 'COR_DE_FUNDO':
-                return f"screen.{comando_python}({argumento})"
-            return f"t.{comando_python}({argumento})"
-        else:
-            return f"t.{comando_python}()"
+        argumento = (yield node.expressao) if node.expressao else None
+        return self._codigo_comando(node, argumento)
+
+    def _codigo_comando(self, node: ast.ComandoSimples, argumento):
+        linhas = codigo_comando(node.token.tipo, argumento if node.expressao else None)
+        if len(linhas) == 1:
+            return linhas[0]
+        for linha in linhas:
+            self.codigo_python.append(self._indentar(linha))
+        return None
 
     def visit_ComandoIrPara(self, node: ast.ComandoIrPara):
-        x = self.visit(node.expr_x)
-        y = self.visit(node.expr_y)
+        x = yield node.expr_x
+        y = yield node.expr_y
         return f"t.goto({x}, {y})"
 
     def visit_Literal(self, node: ast.Literal):
         valor = node.valor
         if node.token.tipo == 'TEXTO':
             return f'{valor}'
+        if node.token.tipo == 'VERDADEIRO':
+            return 'True'
+        if node.token.tipo == 'FALSO':
+            return 'False'
         return valor
 
     def visit_Variavel(self, node: ast.Variavel):
         return node.nome
 
     def visit_VarDecl(self, node: ast.VarDecl):
-        valor_padrao = {'inteiro': 0, 'real': 0.0, 'texto': '""', 'logico': 'False'}.get(node.tipo_no.valor)
+        valor_padrao = VALORES_PADRAO.get(node.tipo_no.valor)
         for var in node.var_nos:
             self.codigo_python.append(f"{var.nome} = {valor_padrao}")
 
     def visit_Atribuicao(self, node: ast.Atribuicao):
-        var_nome = self.visit(node.var_no)
-        expressao = self.visit(node.expressao)
+        var_nome = yield node.var_no
+        expressao = yield node.expressao
         return f"{var_nome} = {expressao}"
 
     def visit_UnaryOp(self, node: ast.UnaryOp):
+        expr = yield node.expr
+        return self._codigo_unario(node, expr)
+
+    def _codigo_unario(self, node: ast.UnaryOp, expr):
         op = node.op.valor
-        expr = self.visit(node.expr)
+        # Com o tipo anotado pela análise semântica, o operando é numérico e
+        # o '+' unário não o altera
+        if op == '+' and node.tipo_inferido is not None:
+            return expr
         # Usa parênteses para garantir a precedência correta no código Python
         return f"({op}{expr})"
 
     def visit_BinOp(self, node: ast.BinOp):
-        esq = self.visit(node.esq)
-        op = node.op.valor
-        dir = self.visit(node.dir)
-        return f"({esq} {op} {dir})"
+        esq = yield node.esq
+        dir = yield node.dir
+        return self._codigo_binario(node, esq, dir)
+
+    def _codigo_binario(self, node: ast.BinOp, esq, dir):
+        return f"({esq} {node.op.valor} {dir})"
 
     def visit_Repita(self, node: ast.Repita):
-        vezes = self.visit(node.vezes)
-        self.codigo_python.append(self._indentar(f"for _ in range({vezes}):"))
-        self.nivel_indentacao += 1
-        self.visit(node.bloco)
+        vezes = yield node.vezes
+        self._abrir(f"for _ in range({vezes}):")
+        yield node.bloco
         self.nivel_indentacao -= 1
         return None
 
     def visit_Se(self, node: ast.Se):
-        condicao = self.visit(node.condicao)
-        self.codigo_python.append(self._indentar(f"if {condicao}:"))
-        self.nivel_indentacao += 1
-        self.visit(node.bloco_se)
+        condicao = yield node.condicao
+        self._abrir(f"if {condicao}:")
+        yield node.bloco_se
         self.nivel_indentacao -= 1
         if node.bloco_senao:
-            self.codigo_python.append(self._indentar("else:"))
-            self.nivel_indentacao += 1
-            self.visit(node.bloco_senao)
+            self._abrir("else:")
+            yield node.bloco_senao
             self.nivel_indentacao -= 1
         return None
 
     def visit_Enquanto(self, node: ast.Enquanto):
-        condicao = self.visit(node.condicao)
-        self.codigo_python.append(self._indentar(f"while {condicao}:"))
-        self.nivel_indentacao += 1
-        self.visit(node.bloco)
+        condicao = yield node.condicao
+        self._abrir(f"while {condicao}:")
+        yield node.bloco
         self.nivel_indentacao -= 1
         return None
+
+class EmissorPython:
+    """
+    Gera o programa Python a partir da IR (`src.ir`), com o mesmo código do
+    GeradorDeCodigo. Um temporário usado uma única vez vira a expressão que
+    o calcula, no lugar do uso; os demais são atribuídos ao nome do
+    temporário (`_rN`), para a expressão ser calculada uma vez só. Se a
+    condição de um `enquanto` precisa de uma atribuição dessas, ela não
+    pode ficar antes do laço: o laço vira `while True:`, com as atribuições
+    e um `break` no começo, para a condição ser recalculada a cada volta.
+    """
+    def __init__(self):
+        self.codigo_python = []
+        self.nivel_indentacao = 0
+        self._abertos = []
+        self._expressoes = {}
+        self._condicao = None  # onde começa a condição do `enquanto` aberto
+
+    def gerar(self, programa: ProgramaIR, nome_arquivo_base="Resultado", renderizacao: Renderizacao = None):
+        self.codigo_python.extend(cabecalho(nome_arquivo_base, renderizacao))
+        em_lotes = renderizacao is not None and not renderizacao.so_quadro_final
+        self.codigo_python.append("# Inicialização de variáveis")
+        usos = [0] * len(programa.nomes)
+        for operacao, _, a, b in programa:
+            if operacao != Operacao.CONST:
+                for operando in (a, b):
+                    if operando >= 0:
+                        usos[operando] += 1
+
+        declaracoes = True
+        for operacao, destino, a, b in programa:
+            if declaracoes and operacao != Operacao.DECLARA:
+                self.codigo_python.append("")
+                declaracoes = False
+            if operacao == Operacao.DECLARA:
+                self.codigo_python.append(f"{programa.nomes[destino]} = {VALORES_PADRAO[programa.tipos[destino]]}")
+            elif operacao == Operacao.CONST:
+                self._definir(programa, usos, destino, programa.constantes[a][1])
+            elif operacao == Operacao.NEG:
+                self._definir(programa, usos, destino, f"(-{self._valor(programa, a)})")
+            elif operacao in BINARIAS:
+                esq, dir = self._valor(programa, a), self._valor(programa, b)
+                self._definir(programa, usos, destino, f"({esq} {BINARIAS[operacao]} {dir})")
+            elif operacao == Operacao.COPIA:
+                self._linha(f"{programa.nomes[destino]} = {self._valor(programa, a)}")
+            elif operacao == Operacao.IR_PARA:
+                self._linha(f"t.goto({self._valor(programa, a)}, {self._valor(programa, b)})")
+                if em_lotes:
+                    self._linha("_quadro()")
+            elif operacao == Operacao.REPITA:
+                self._abrir(f"for _ in range({self._valor(programa, a)}):")
+            elif operacao == Operacao.SE:
+                self._abrir(f"if {self._valor(programa, a)}:")
+            elif operacao == Operacao.SENAO:
+                self._fechar()
+                self._abrir("else:")
+            elif operacao == Operacao.ENQUANTO:
+                self._condicao = len(self.codigo_python)
+            elif operacao == Operacao.TESTE:
+                self._testar(self._valor(programa, a))
+            elif operacao == Operacao.FIM:
+                self._fechar()
+            else:
+                argumento = self._valor(programa, a) if a >= 0 else None
+                for linha in codigo_comando(operacao.name, argumento):
+                    self._linha(linha)
+                if em_lotes and operacao.name in PRIMITIVAS:
+                    self._linha("_quadro()")
+        if declaracoes:
+            self.codigo_python.append("")
+        self.codigo_python.extend(rodape(renderizacao))
+        return "\n".join(self.codigo_python)
+
+    def _linha(self, codigo):
+        self.codigo_python.append("    " * self.nivel_indentacao + codigo)
+
+    def _definir(self, programa, usos, destino, codigo):
+        if usos[destino] == 1:
+            self._expressoes[destino] = codigo
+        else:
+            self._linha(f"{programa.nomes[destino]} = {codigo}")
+
+    def _valor(self, programa, indice):
+        if indice in self._expressoes:
+            return self._expressoes.pop(indice)
+        return programa.nomes[indice]
+
+    def _abrir(self, cabecalho):
+        self._linha(cabecalho)
+        self.nivel_indentacao += 1
+        self._abertos.append(len(self.codigo_python))
+
+    def _testar(self, condicao):
+        """ Abre o laço do `enquanto` cuja condição é `condicao`. """
+        atribuicoes = self.codigo_python[self._condicao:]
+        del self.codigo_python[self._condicao:]
+        if not atribuicoes:
+            self._abrir(f"while {condicao}:")
+            return
+        self._abrir("while True:")
+        self.codigo_python.extend("    " + linha for linha in atribuicoes)
+        self._linha(f"if not {condicao}:")
+        self._linha("    break")
+
+    def _fechar(self):
+        # Um bloco sem comandos precisa de um 'pass' em Python
+        if len(self.codigo_python) == self._abertos.pop():
+            self._linha("pass")
+        self.nivel_indentacao -= 1
@@ -0,0 +1,211 @@
+"""
+Gramática da TurtleScript em forma declarativa.
+
+Cada não terminal (minúsculo) tem uma lista de produções; cada produção é
+uma tupla de símbolos:
+
+- `TIPO`      terminal (tipo de token), consumido e descartado;
+- `@TIPO`     terminal cujo token é empilhado na pilha de valores;
+- `nome`      não terminal;
+- `#acao`     ação semântica, executada quando o símbolo sai da pilha
+              (`#posicao` empilha o índice do token atual).
+
+`expressao` é um não terminal externo: é analisado pelo analisador de
+precedência de operadores do `Parser`, e aqui só se declara o seu FIRST.
+
+Os conjuntos FIRST/FOLLOW e a tabela LL(1) são calculados na importação do
+módulo; uma gramática que não seja LL(1) é rejeitada nesse momento. Um novo
+comando da tartaruga é só mais um nome em `COMANDOS_COM_EXPRESSAO` ou
+`COMANDOS_SEM_EXPRESSAO` (e a palavra-chave no tokenizador).
+"""
+
+COMANDOS_COM_EXPRESSAO = (
+    'AVANCAR', 'RECUAR', 'GIRAR_DIREITA', 'GIRAR_ESQUERDA',
+    'DEFINIR_COR', 'DEFINIR_ESPESSURA', 'COR_DE_FUNDO', 'CIRCULO',
+)
+COMANDOS_SEM_EXPRESSAO = (
+    'LEVANTAR_CANETA', 'ABAIXAR_CANETA', 'LIMPAR_TELA',
+    'EMPURRAR_POSICAO', 'RESTAURAR_POSICAO',
+)
+TIPOS_DE_VARIAVEL = ('INTEIRO', 'REAL', 'TEXTO', 'LOGICO')
+
+SIMBOLO_INICIAL = 'programa'
+FIM_DA_ENTRADA = 'EOF'
+
+PRODUCOES = {
+    'programa': [
+        ('INICIO', 'bloco', 'FIM', '#programa'),
+    ],
+    'bloco': [
+        ('#posicao', '#marca', 'itens', '#bloco'),
+    ],
+    'itens': [
+        ('item', 'itens'),
+        (),
+    ],
+    'item': [
+        ('declaracao',),
+        ('comando',),
+    ],
+    'declaracao': [
+        ('VAR', '#marca', 'tipo', 'DOIS_PONTOS', 'lista_variaveis', 'PONTO_VIRGULA', '#declaracao'),
+    ],
+    'tipo': [(f'@{tipo}', '#tipo') for tipo in TIPOS_DE_VARIAVEL],
+    'lista_variaveis': [
+        ('@ID', '#variavel', 'inicializacao', 'mais_variaveis'),
+    ],
+    'mais_variaveis': [
+        ('VIRGULA', '@ID', '#variavel', 'inicializacao', 'mais_variaveis'),
+        (),
+    ],
+    'inicializacao': [
+        ('ATRIBUICAO', 'expressao', '#inicializacao'),
+        (),
+    ],
+    'comando': [
+        ('@ID', '#variavel', 'ATRIBUICAO', 'expressao', 'PONTO_VIRGULA', '#atribuicao'),
+        *[(f'@{cmd}', 'expressao', 'PONTO_VIRGULA', '#comando_com_expressao') for cmd in COMANDOS_COM_EXPRESSAO],
+        *[(f'@{cmd}', 'PONTO_VIRGULA', '#comando_simples') for cmd in COMANDOS_SEM_EXPRESSAO],
+        ('@IR_PARA', 'expressao', 'expressao', 'PONTO_VIRGULA', '#ir_para'),
+        ('#posicao', 'REPITA', 'expressao', 'VEZES', 'bloco', 'FIM_REPITA', 'PONTO_VIRGULA', '#repita'),
+        ('#posicao', 'SE', 'expressao', 'ENTAO', 'bloco', 'senao', 'FIM_SE', 'PONTO_VIRGULA', '#se'),
+        ('#posicao', 'ENQUANTO', 'expressao', 'FACA', 'bloco', 'FIM_ENQUANTO', 'PONTO_VIRGULA', '#enquanto'),
+    ],
+    'senao': [
+        ('SENAO', 'bloco'),
+        ('#vazio',),
+    ],
+}
+
+# Não terminais analisados fora da tabela, com o seu conjunto FIRST
+EXTERNOS = {
+    'expressao': frozenset((
+        'NUMERO_INTEIRO', 'NUMERO_REAL', 'TEXTO', 'VERDADEIRO', 'FALSO',
+        'ID', 'OP_ARITMETICO', 'PARENTESES',
+    )),
+}
+
+# Mensagem para o token que não inicia nenhuma produção do não terminal.
+# Um não terminal anulável sem mensagem deriva ε nesse caso (e também no fim
+# da entrada), deixando o erro para o próximo terminal esperado.
+MENSAGENS_DE_ERRO = {
+    'itens': "Comando inesperado '{valor}' na linha {linha}",
+    'item': "Comando inesperado '{valor}' na linha {linha}",
+    'comando': "Comando inesperado '{valor}' na linha {linha}",
+    'tipo': "Tipo de variável inválido '{valor}' na linha {linha}",
+}
+
+# Recuperação de erros em modo pânico: após um erro, os tokens são descartados
+# até um ';' (consumido) ou até um destes, que encerram blocos
+TERMINADORES_DE_BLOCO = frozenset(('FIM', 'FIM_REPITA', 'FIM_SE', 'FIM_ENQUANTO'))
+SINCRONIZACAO = TERMINADORES_DE_BLOCO | {'SENAO', FIM_DA_ENTRADA}
+
+def eh_terminal(simbolo: str) -> bool:
+    return simbolo[0] == '@' or simbolo.isupper()
+
+def eh_acao(simbolo: str) -> bool:
+    return simbolo[0] == '#'
+
+def nome_terminal(simbolo: str) -> str:
+    return simbolo.lstrip('@')
+
+def _first_da_sequencia(simbolos, first, anulaveis) -> tuple[set, bool]:
+    """ FIRST de uma sequência de símbolos e se ela deriva ε. """
+    resultado = set()
+    for simbolo in simbolos:
+        if eh_acao(simbolo):
+            continue
+        if eh_terminal(simbolo):
+            resultado.add(nome_terminal(simbolo))
+            return resultado, False
+        resultado |= first[simbolo]
+        if simbolo not in anulaveis:
+            return resultado, False
+    return resultado, True
+
+def calcular_first(producoes=PRODUCOES, externos=EXTERNOS) -> tuple[dict, set]:
+    """ Conjuntos FIRST de cada não terminal e o conjunto dos anuláveis. """
+    first = {nt: set() for nt in producoes}
+    first.update((nt, set(conjunto)) for nt, conjunto in externos.items())
+    anulaveis = set()
+    mudou = True
+    while mudou:
+        mudou = False
+        for nt, alternativas in producoes.items():
+            for producao in alternativas:
+                conjunto, anulavel = _first_da_sequencia(producao, first, anulaveis)
+                if not conjunto <= first[nt]:
+                    first[nt] |= conjunto
+                    mudou = True
+                if anulavel and nt not in anulaveis:
+                    anulaveis.add(nt)
+                    mudou = True
+    return first, anulaveis
+
+def calcular_follow(producoes=PRODUCOES, first=None, anulaveis=None,
+                    inicial=SIMBOLO_INICIAL) -> dict:
+    """ Conjuntos FOLLOW de cada não terminal (incluindo os externos). """
+    if first is None:
+        first, anulaveis = calcular_first(producoes)
+    follow = {nt: set() for nt in first}
+    follow[inicial].add(FIM_DA_ENTRADA)
+    mudou = True
+    while mudou:
+        mudou = False
+        for nt, alternativas in producoes.items():
+            for producao in alternativas:
+                for i, simbolo in enumerate(producao):
+                    if eh_acao(simbolo) or eh_terminal(simbolo):
+                        continue
+                    conjunto, anulavel = _first_da_sequencia(producao[i + 1:], first, anulaveis)
+                    if anulavel:
+                        conjunto |= follow[nt]
+                    if not conjunto <= follow[simbolo]:
+                        follow[simbolo] |= conjunto
+                        mudou = True
+    return follow
+
+def construir_tabela(producoes=PRODUCOES, externos=EXTERNOS,
+                     inicial=SIMBOLO_INICIAL) -> dict:
+    """
+    Tabela LL(1): não terminal -> {terminal: produção}. Levanta ValueError
+    se duas produções disputam a mesma célula ou se algum símbolo usado não
+    está definido.
+    """
+    for nt, alternativas in producoes.items():
+        for producao in alternativas:
+            for simbolo in producao:
+                if not (eh_acao(simbolo) or eh_terminal(simbolo)
+                        or simbolo in producoes or simbolo in externos):
+                    raise ValueError(f"Não terminal '{simbolo}' usado em '{nt}' não foi definido")
+
+    first, anulaveis = calcular_first(producoes, externos)
+    follow = calcular_follow(producoes, first, anulaveis, inicial)
+    tabela = {}
+    conflitos = []
+    for nt, alternativas in producoes.items():
+        linha = tabela[nt] = {}
+        for producao in alternativas:
+            conjunto, anulavel = _first_da_sequencia(producao, first, anulaveis)
+            if anulavel:
+                conjunto |= follow[nt]
+            for terminal in sorted(conjunto):
+                if terminal in linha:
+                    conflitos.append(f"{nt} com '{terminal}': {linha[terminal]} x {producao}")
+                else:
+                    linha[terminal] = producao
+    if conflitos:
+        raise ValueError("A gramática não é LL(1):\n  " + "\n  ".join(conflitos))
+    return tabela
+
+FIRST, ANULAVEIS = calcular_first()
+FOLLOW = calcular_follow(first=FIRST, anulaveis=ANULAVEIS)
+TABELA = construir_tabela()
+
+# Produção que deriva ε, para cada não terminal anulável
+PRODUCOES_VAZIAS = {
+    nt: producao
+    for nt, alternativas in PRODUCOES.items()
+    for producao in alternativas
+    if _first_da_sequencia(producao, FIRST, ANULAVEIS)[1]
+}
@@ -0,0 +1,353 @@
+"""
+Representação intermediária (IR) entre a AST verificada e os geradores de
+código: uma sequência linear de instruções de três endereços, tipadas, com
+os comandos da tartaruga como instruções e o controle de fluxo estruturado
+(marcadores de início e fim de cada laço e condicional).
+
+A IR é um caminho opcional (`--ir`), ao lado do GeradorDeCodigo, e não a
+base da geração de código: os passes de `otimizador`, o pré-cálculo do
+desenho (`avaliador`) e o compilador de passada única trabalham sobre a
+AST, e passá-los para a IR seria reescrevê-los. Por isso o EmissorPython
+gera exatamente o código do GeradorDeCodigo, com os mesmos auxiliares de
+`gerador` (cabeçalho, rodapé e comandos), e os testes comparam as duas
+saídas em todos os exemplos. Com o pré-cálculo não há IR a usar: o
+programa inteiro vira o desenho calculado sobre a AST.
+"""
+import time
+from array import array
+from ast import literal_eval
+from enum import IntEnum
+
+from src.ast_nodes import *
+from src.otimizador import calcular, percorrer
+from src.visitor import Visitor
+
+class Operacao(IntEnum):
+    # Escalares: destino e operandos são índices de valores
+    CONST = 0             # destino = constantes[a]
+    COPIA = 1             # destino (uma variável) = a
+    NEG = 2               # destino = -a
+    SOMA = 3              # destino = a + b, e assim por diante
+    SUBTRACAO = 4
+    MULTIPLICACAO = 5
+    DIVISAO = 6
+    RESTO = 7
+    IGUAL = 8
+    DIFERENTE = 9
+    MENOR = 10
+    MAIOR = 11
+    MENOR_IGUAL = 12
+    MAIOR_IGUAL = 13
+    DECLARA = 14          # inicializa a variável destino com o valor padrão do tipo
+    # Tartaruga: o argumento, quando há, é o operando a (IR_PARA usa a e b)
+    AVANCAR = 15
+    RECUAR = 16
+    GIRAR_DIREITA = 17
+    GIRAR_ESQUERDA = 18
+    IR_PARA = 19
+    CIRCULO = 20
+    LEVANTAR_CANETA = 21
+    ABAIXAR_CANETA = 22
+    DEFINIR_COR = 23
+    COR_DE_FUNDO = 24
+    DEFINIR_ESPESSURA = 25
+    LIMPAR_TELA = 26
+    EMPURRAR_POSICAO = 27
+    RESTAURAR_POSICAO = 28
+    # Controle estruturado; cada REPITA, SE e ENQUANTO termina num FIM
+    REPITA = 29           # repete até FIM `a` vezes
+    SE = 30               # executa até SENAO/FIM se `a` é verdadeiro
+    SENAO = 31
+    ENQUANTO = 32         # início do laço: a condição é calculada até TESTE
+    TESTE = 33            # sai do laço se `a` é falso
+    FIM = 34
+
+# Operador da linguagem de cada operação binária
+BINARIAS = {
+    Operacao.SOMA: '+', Operacao.SUBTRACAO: '-', Operacao.MULTIPLICACAO: '*',
+    Operacao.DIVISAO: '/', Operacao.RESTO: '%',
+    Operacao.IGUAL: '==', Operacao.DIFERENTE: '!=', Operacao.MENOR: '<',
+    Operacao.MAIOR: '>', Operacao.MENOR_IGUAL: '<=', Operacao.MAIOR_IGUAL: '>=',
+}
+_POR_OPERADOR = {op: operacao for operacao, op in BINARIAS.items()}
+
+# Operações que só calculam um temporário, sem outro efeito
+PURAS = frozenset(BINARIAS) | {Operacao.CONST, Operacao.NEG}
+
+class ProgramaIR:
+    """
+    Um programa em IR. Cada instrução é (operação, destino, a, b), guardada
+    em quatro arrays paralelos; os campos não usados valem -1. Destinos e
+    operandos são índices de valores: as variáveis do programa e os
+    temporários, com nome e tipo em `nomes` e `tipos`. Cada temporário é
+    definido por uma única instrução. As constantes ficam em `constantes`,
+    como pares (valor, código Python). Os temporários se chamam `_rN`,
+    evitando os nomes em `reservados`.
+    """
+    def __init__(self, reservados=()):
+        self.operacoes = array('B')
+        self.destinos = array('i')
+        self.operandos_a = array('i')
+        self.operandos_b = array('i')
+        self.nomes: list[str] = []
+        self.tipos: list[str] = []
+        self.temporario = array('B')
+        self.constantes: list[tuple] = []
+        self._variaveis: dict[str, int] = {}
+        self._indice_constantes: dict[tuple, int] = {}
+        self._reservados = set(reservados)
+        self._contador = 0
+
+    def __len__(self):
+        return len(self.operacoes)
+
+    def __iter__(self):
+        """ As instruções, como tuplas (operação, destino, a, b). """
+        return zip(map(Operacao, self.operacoes), self.destinos, self.operandos_a, self.operandos_b)
+
+    def emitir(self, operacao: Operacao, destino=-1, a=-1, b=-1):
+        self.operacoes.append(operacao)
+        self.destinos.append(destino)
+        self.operandos_a.append(a)
+        self.operandos_b.append(b)
+
+    def substituir(self, instrucoes):
+        """ Troca todas as instruções pelas tuplas (operação, destino, a, b) dadas. """
+        self.operacoes, self.destinos, self.operandos_a, self.operandos_b = \
+            array('B'), array('i'), array('i'), array('i')
+        for instrucao in instrucoes:
+            self.emitir(*instrucao)
+
+    def _novo_valor(self, nome, tipo, temporario) -> int:
+        self.nomes.append(nome)
+        self.tipos.append(tipo)
+        self.temporario.append(temporario)
+        return len(self.nomes) - 1
+
+    def variavel(self, nome: str, tipo: str) -> int:
+        """ O índice da variável, registrada no primeiro uso. """
+        if nome not in self._variaveis:
+            self._variaveis[nome] = self._novo_valor(nome, tipo, False)
+        return self._variaveis[nome]
+
+    def novo_temporario(self, tipo: str) -> int:
+        while f"_r{self._contador}" in self._reservados:
+            self._contador += 1
+        self._contador += 1
+        return self._novo_valor(f"_r{self._contador - 1}", tipo, True)
+
+    def constante(self, valor, codigo: str) -> int:
+        """ O índice da constante com esse código Python, registrada uma vez. """
+        chave = (type(valor), codigo)
+        if chave not in self._indice_constantes:
+            self._indice_constantes[chave] = len(self.constantes)
+            self.constantes.append((valor, codigo))
+        return self._indice_constantes[chave]
+
+    def listar(self) -> str:
+        """ As instruções em texto, uma por linha, para depuração. """
+        linhas = []
+        for indice, (operacao, destino, a, b) in enumerate(self):
+            partes = [f"{self.nomes[destino]}:{self.tipos[destino]} =" if destino >= 0 else "", operacao.name]
+            if operacao == Operacao.CONST:
+                partes.append(self.constantes[a][1])
+            else:
+                partes.extend(self.nomes[operando] for operando in (a, b) if operando >= 0)
+            linhas.append(f"{indice:4} " + " ".join(parte for parte in partes if parte))
+        return "\n".join(linhas)
+
+def codigo_constante(valor, tipo: str) -> str:
+    """ O código Python de uma constante calculada (não lida do programa). """
+    if tipo == 'logico':
+        return 'True' if valor else 'False'
+    if tipo == 'real':
+        return repr(float(valor))
+    return str(valor)
+
+class GeradorDeIR(Visitor):
+    """
+    Traduz a AST verificada pela análise semântica para a IR. As expressões
+    devolvem o índice do valor que guarda o resultado; uma variável é o
+    próprio valor, sem instrução. Como no gerador de código, só as variáveis
+    do bloco principal são inicializadas e o '+' unário é omitido.
+    """
+    def __init__(self):
+        self.programa = ProgramaIR()
+        self._principal = None
+
+    def gerar(self, arvore: Programa) -> ProgramaIR:
+        self.programa = ProgramaIR(no.nome for no in percorrer(arvore) if isinstance(no, Variavel))
+        self.visit(arvore)
+        return self.programa
+
+    def visit_Programa(self, node: Programa):
+        self._principal = node.bloco
+        yield node.bloco
+
+    def visit_Bloco(self, node: Bloco):
+        for declaracao in node.declaracoes:
+            for var in declaracao.var_nos:
+                indice = self.programa.variavel(var.nome, declaracao.tipo_no.valor)
+                if node is self._principal:
+                    self.programa.emitir(Operacao.DECLARA, indice)
+        for comando in node.comandos:
+            yield comando
+
+    def visit_Atribuicao(self, node: Atribuicao):
+        valor = yield node.expressao
+        destino = self.programa.variavel(node.var_no.nome, node.var_no.tipo_inferido)
+        self.programa.emitir(Operacao.COPIA, destino, valor)
+
+    def visit_ComandoSimples(self, node: ComandoSimples):
+        argumento = (yield node.expressao) if node.expressao else -1
+        self.programa.emitir(Operacao[node.token.tipo], -1, argumento)
+
+    def visit_ComandoIrPara(self, node: ComandoIrPara):
+        x = yield node.expr_x
+        y = yield node.expr_y
+        self.programa.emitir(Operacao.IR_PARA, -1, x, y)
+
+    def visit_Repita(self, node: Repita):
+        vezes = yield node.vezes
+        self.programa.emitir(Operacao.REPITA, -1, vezes)
+        yield node.bloco
+        self.programa.emitir(Operacao.FIM)
+
+    def visit_Se(self, node: Se):
+        condicao = yield node.condicao
+        self.programa.emitir(Operacao.SE, -1, condicao)
+        yield node.bloco_se
+        if node.bloco_senao:
+            self.programa.emitir(Operacao.SENAO)
+            yield node.bloco_senao
+        self.programa.emitir(Operacao.FIM)
+
+    def visit_Enquanto(self, node: Enquanto):
+        self.programa.emitir(Operacao.ENQUANTO)
+        condicao = yield node.condicao
+        self.programa.emitir(Operacao.TESTE, -1, condicao)
+        yield node.bloco
+        self.programa.emitir(Operacao.FIM)
+
+    def visit_Literal(self, node: Literal):
+        tipo = node.token.tipo
+        if tipo == 'NUMERO_INTEIRO':
+            valor, codigo, tipo_valor = int(node.valor), node.valor, 'inteiro'
+        elif tipo == 'NUMERO_REAL':
+            valor, codigo, tipo_valor = float(node.valor), node.valor, 'real'
+        elif tipo == 'TEXTO':
+            valor, codigo, tipo_valor = literal_eval(node.valor), node.valor, 'texto'
+        else:
+            valor = tipo == 'VERDADEIRO'
+            codigo, tipo_valor = codigo_constante(valor, 'logico'), 'logico'
+        destino = self.programa.novo_temporario(tipo_valor)
+        self.programa.emitir(Operacao.CONST, destino, self.programa.constante(valor, codigo))
+        return destino
+
+    def visit_Variavel(self, node: Variavel):
+        return self.programa.variavel(node.nome, node.tipo_inferido)
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        valor = yield node.expr
+        if node.op.valor == '+':
+            return valor
+        destino = self.programa.novo_temporario(node.tipo_inferido)
+        self.programa.emitir(Operacao.NEG, destino, valor)
+        return destino
+
+    def visit_BinOp(self, node: BinOp):
+        esq = yield node.esq
+        dir = yield node.dir
+        operacao = _POR_OPERADOR[node.op.valor]
+        destino = self.programa.novo_temporario(node.tipo_inferido)
+        self.programa.emitir(operacao, destino, esq, dir)
+        return destino
+
+def dobrar_constantes(programa: ProgramaIR) -> ProgramaIR:
+    """
+    Troca as operações cujos operandos são constantes pela constante do
+    resultado, calculado como em `otimizador.calcular`. Como cada
+    temporário tem uma única definição, o valor de um temporário constante
+    vale no programa inteiro.
+    """
+    constante = {}
+    instrucoes = []
+    for operacao, destino, a, b in programa:
+        if operacao == Operacao.CONST:
+            constante[destino] = programa.constantes[a][0]
+        elif operacao == Operacao.NEG and a in constante:
+            valor = -constante[a]
+            operacao, a = Operacao.CONST, programa.constante(valor, codigo_constante(valor, programa.tipos[destino]))
+            constante[destino] = valor
+        elif operacao in BINARIAS and a in constante and b in constante:
+            tipo = programa.tipos[destino]
+            valor = calcular(BINARIAS[operacao], constante[a], constante[b], tipo)
+            if valor is not None:
+                operacao, a, b = Operacao.CONST, programa.constante(valor, codigo_constante(valor, tipo)), -1
+                constante[destino] = valor
+        instrucoes.append((operacao, destino, a, b))
+    programa.substituir(instrucoes)
+    return programa
+
+def remover_temporarios_mortos(programa: ProgramaIR) -> ProgramaIR:
+    """
+    Remove as instruções puras cujo temporário nunca é usado (por exemplo,
+    os operandos de uma operação dobrada). Divisões por um valor que pode
+    ser zero ficam, para o erro continuar acontecendo na execução.
+    """
+    usos = [0] * len(programa.nomes)
+    instrucoes = list(programa)
+    for operacao, _, a, b in instrucoes:
+        if operacao == Operacao.CONST:
+            continue  # `a` é o índice da constante, não de um valor
+        for operando in (a, b):
+            if operando >= 0:
+                usos[operando] += 1
+    # Os usos vêm sempre depois da definição: de trás para a frente, uma
+    # remoção já diminui os usos das instruções anteriores
+    constante = {destino: programa.constantes[a][0] for operacao, destino, a, _ in instrucoes
+                 if operacao == Operacao.CONST}
+    mantidas = []
+    for operacao, destino, a, b in reversed(instrucoes):
+        if operacao in PURAS and programa.temporario[destino] and usos[destino] == 0:
+            divisao = operacao in (Operacao.DIVISAO, Operacao.RESTO)
+            if not divisao or constante.get(b, 0) != 0:
+                if operacao != Operacao.CONST:
+                    for operando in (a, b):
+                        if operando >= 0:
+                            usos[operando] -= 1
+                continue
+        mantidas.append((operacao, destino, a, b))
+    programa.substituir(reversed(mantidas))
+    return programa
+
+# Passes executados por padrão pelo GerenciadorDePassos
+PASSES_PADRAO = (
+    ('dobramento de constantes', dobrar_constantes),
+    ('remoção de temporários mortos', remover_temporarios_mortos),
+)
+
+class GerenciadorDePassos:
+    """
+    Executa uma sequência de passes sobre a IR, na ordem, e registra para
+    cada um o tempo gasto e o número de instruções antes e depois. Um passe
+    é uma função que recebe e devolve um ProgramaIR.
+    """
+    def __init__(self, passes=PASSES_PADRAO):
+        self.passes = list(passes)
+        self.relatorio: list[tuple] = []
+
+    def adicionar(self, nome: str, passe):
+        self.passes.append((nome, passe))
+
+    def executar(self, programa: ProgramaIR) -> ProgramaIR:
+        for nome, passe in self.passes:
+            antes = len(programa)
+            inicio = time.perf_counter()
+            programa = passe(programa)
+            self.relatorio.append((nome, time.perf_counter() - inicio, antes, len(programa)))
+        return programa
+
+    def formatar_relatorio(self) -> str:
+        return "\n".join(f"{nome}: {segundos * 1000:.3f} ms, {antes} -> {depois} instruções"
+                         for nome, segundos, antes, depois in self.relatorio)
@@ -0,0 +1,1157 @@
+"""
+Otimizações sobre a AST, executadas entre a análise semântica e a geração
+de código. Os passes dependem das anotações da análise semântica
+(`tipo_inferido` e `simbolo`) e preservam o comportamento do código gerado.
+
+Os nós de comando (Bloco, Atribuicao, Se, ...) são alterados no lugar; os
+nós de expressão nunca são alterados, porque podem estar compartilhados
+(hash-consing): uma expressão otimizada é sempre um nó novo.
+"""
+import copy
+import math
+from ast import literal_eval
+
+from src.ast_nodes import *
+from src.avaliador import MAXIMO_BITS
+from src.semantico import Simbolo
+from src.tokenizer import Token
+from src.visitor import Visitor
+
+_RELACIONAIS = ('==', '!=', '<', '>', '<=', '>=')
+
+def percorrer(node):
+    """ Todos os nós da árvore, em pré-ordem, sem recursão. """
+    pendentes = [node]
+    while pendentes:
+        node = pendentes.pop()
+        if isinstance(node, list):
+            pendentes.extend(reversed(node))
+        elif isinstance(node, ASTNode):
+            yield node
+            pendentes.extend(getattr(node, campo) for campo in reversed(node._campos))
+
+def _blocos(comando) -> list:
+    """ Os blocos aninhados diretamente num comando. """
+    if isinstance(comando, (Repita, Enquanto)):
+        return [comando.bloco]
+    if isinstance(comando, Se):
+        return [comando.bloco_se] + ([comando.bloco_senao] if comando.bloco_senao else [])
+    return []
+
+class Atribuidas:
+    """
+    As variáveis atribuídas dentro de cada Bloco de uma árvore, calculadas
+    de baixo para cima num único percurso, para os passes não percorrerem
+    de novo os blocos aninhados a cada estrutura que os contém.
+    """
+    def __init__(self, arvore):
+        # id(bloco) -> (bloco, nomes); o bloco é mantido vivo para o id não ser reaproveitado
+        self._por_bloco = {}
+        blocos = [node for node in percorrer(arvore) if isinstance(node, Bloco)]
+        for bloco in reversed(blocos):  # na pré-ordem, os blocos internos vêm depois
+            nomes = set()
+            for comando in bloco.comandos:
+                nomes |= self.em(comando)
+            self._por_bloco[id(bloco)] = (bloco, frozenset(nomes))
+
+    def em(self, node) -> frozenset:
+        """ Os nomes atribuídos em um comando ou Bloco da árvore. """
+        if isinstance(node, Bloco):
+            return self._por_bloco[id(node)][1]
+        if isinstance(node, Atribuicao):
+            return frozenset((node.var_no.nome,))
+        return frozenset().union(*(self.em(bloco) for bloco in _blocos(node)))
+
+def valor_constante(node):
+    """ O valor Python de um literal numérico ou lógico; None nos demais casos. """
+    if not isinstance(node, Literal):
+        return None
+    tipo = node.token.tipo
+    if tipo == 'NUMERO_INTEIRO':
+        try:
+            return int(node.valor)
+        except ValueError:
+            return None  # literal com mais dígitos do que o Python converte
+    if tipo == 'NUMERO_REAL':
+        return float(node.valor)
+    if tipo in ('VERDADEIRO', 'FALSO'):
+        return tipo == 'VERDADEIRO'
+    return None
+
+def criar_literal(valor, tipo, linha) -> Literal:
+    """ Literal (já anotado com o tipo) para um valor calculado em compilação. """
+    if tipo == 'logico':
+        token = Token('VERDADEIRO', 'verdadeiro', linha) if valor else Token('FALSO', 'falso', linha)
+    elif tipo == 'real' or isinstance(valor, float):
+        # A divisão entre inteiros também dá um real na execução
+        token = Token('NUMERO_REAL', repr(float(valor)), linha)
+    else:
+        token = Token('NUMERO_INTEIRO', str(valor), linha)
+    node = Literal(token)
+    node.tipo_inferido = tipo
+    return node
+
+def calcular(op, esq, dir, tipo):
+    """
+    Aplica o operador como o código gerado o faria em tempo de execução, ou
+    devolve None se o resultado não deve ser calculado em compilação: uma
+    divisão por zero, um real não finito ou um inteiro com mais de
+    MAXIMO_BITS bits (que a propagação de constantes faria crescer a cada
+    linha e cujo literal o Python pode se recusar a escrever). Como no
+    Python, '/' é sempre a divisão real, mesmo entre inteiros.
+    """
+    if op in _RELACIONAIS:
+        return {'==': esq == dir, '!=': esq != dir, '<': esq < dir,
+                '>': esq > dir, '<=': esq <= dir, '>=': esq >= dir}[op]
+    if tipo not in ('inteiro', 'real'):
+        return None
+    if op in ('/', '%') and dir == 0:
+        return None  # o erro fica para a execução, como sem a otimização
+    try:
+        if op == '+':
+            resultado = esq + dir
+        elif op == '-':
+            resultado = esq - dir
+        elif op == '*':
+            resultado = esq * dir
+        elif op == '%':
+            resultado = esq % dir
+        else:
+            resultado = esq / dir
+    except OverflowError:
+        return None  # inteiro grande demais para virar real
+    if isinstance(resultado, float) and not math.isfinite(resultado):
+        return None
+    if isinstance(resultado, int) and resultado.bit_length() > MAXIMO_BITS:
+        return None
+    return resultado
+
+def _reconstruir_unario(node: UnaryOp, expr) -> UnaryOp:
+    """ O próprio nó se o operando não mudou; senão um nó novo, já anotado. """
+    if expr is node.expr:
+        return node
+    novo = UnaryOp(node.op, expr)
+    novo.tipo_inferido = node.tipo_inferido
+    return novo
+
+def _reconstruir_binario(node: BinOp, esq, dir) -> BinOp:
+    if esq is node.esq and dir is node.dir:
+        return node
+    novo = BinOp(esq, node.op, dir)
+    novo.tipo_inferido = node.tipo_inferido
+    return novo
+
+def _linha(expr) -> int:
+    return expr.op.linha if isinstance(expr, (UnaryOp, BinOp)) else expr.token.linha
+
+class Temporarios:
+    """ Cria as variáveis temporárias dos passes, com nomes livres no programa. """
+    def __init__(self, reservados):
+        self._reservados = set(reservados)
+        self._contador = 0
+        # Nomes criados; cada temporária é atribuída uma única vez
+        self.criadas: set[str] = set()
+
+    @classmethod
+    def do_programa(cls, arvore) -> 'Temporarios':
+        """ Temporárias que evitam os nomes das variáveis usadas em `arvore`. """
+        return cls(no.nome for no in percorrer(arvore) if isinstance(no, Variavel))
+
+    def criar(self, expressao) -> tuple[Variavel, Atribuicao]:
+        """ Uma nova temporária e a atribuição de `expressao` a ela. """
+        while f"_t{self._contador}" in self._reservados:
+            self._contador += 1
+        nome = f"_t{self._contador}"
+        self._contador += 1
+        self.criadas.add(nome)
+        linha = _linha(expressao)
+        variavel = Variavel(Token('ID', nome, linha))
+        variavel.tipo_inferido = expressao.tipo_inferido
+        variavel.simbolo = Simbolo(nome, expressao.tipo_inferido, linha)
+        return variavel, Atribuicao(variavel, expressao)
+
+class Canonizador(Visitor):
+    """
+    Associa cada expressão ao seu representante canônico, criado por uma
+    FabricaDeNos que ignora as linhas: expressões estruturalmente iguais
+    têm o mesmo representante, e `id(representante)` serve de chave. Guarda
+    também as variáveis lidas e o tamanho de cada representante.
+    """
+    def __init__(self):
+        self.fabrica = FabricaDeNos(ignorar_linhas=True)
+        # id(nó) -> (nó, representante); o nó é mantido vivo para o id não ser reaproveitado
+        self._representantes = {}
+        self.leituras: dict[int, frozenset] = {}
+        self.tamanho: dict[int, int] = {}
+
+    def chave(self, node) -> int:
+        return id(self._representantes[id(node)][1])
+
+    def _registrar(self, node, representante, leituras, tamanho):
+        self._representantes[id(node)] = (node, representante)
+        self.leituras.setdefault(id(representante), leituras)
+        self.tamanho.setdefault(id(representante), tamanho)
+        return representante
+
+    def visit_Literal(self, node: Literal):
+        return self._registrar(node, self.fabrica.literal(node.token), frozenset(), 1)
+
+    def visit_Variavel(self, node: Variavel):
+        return self._registrar(node, self.fabrica.variavel(node.token), frozenset((node.nome,)), 1)
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        expr = yield node.expr
+        return self._registrar(node, self.fabrica.unario(node.op, expr),
+                               self.leituras[id(expr)], self.tamanho[id(expr)] + 1)
+
+    def visit_BinOp(self, node: BinOp):
+        esq = yield node.esq
+        dir = yield node.dir
+        return self._registrar(node, self.fabrica.binario(esq, node.op, dir),
+                               self.leituras[id(esq)] | self.leituras[id(dir)],
+                               self.tamanho[id(esq)] + self.tamanho[id(dir)] + 1)
+
+class TransformadorDeComandos(Visitor):
+    """
+    Base dos passes que reescrevem a árvore. Cada método devolve o nó que
+    substitui o visitado: None remove um comando, e uma lista de comandos ou
+    um Bloco são incorporados ao bloco pai (as declarações do Bloco vão para
+    as do pai). Por padrão os comandos são mantidos, as suas expressões são
+    visitadas e passam por `_expressao`, e uma expressão só é reconstruída
+    quando algum filho muda.
+    """
+    def visit_Programa(self, node: Programa):
+        node.bloco = yield node.bloco
+        return node
+
+    def visit_Bloco(self, node: Bloco):
+        comandos = []
+        for comando in node.comandos:
+            resultado = yield comando
+            if resultado is None:
+                continue
+            if isinstance(resultado, Bloco):
+                node.declaracoes.extend(resultado.declaracoes)
+                resultado = resultado.comandos
+            elif not isinstance(resultado, list):
+                resultado = [resultado]
+            for novo in resultado:
+                self._incorporado(node, novo)
+            comandos.extend(resultado)
+        node.comandos = comandos
+        return node
+
+    def _incorporado(self, bloco: Bloco, comando):
+        """ Chamado para cada comando que passa a fazer parte de `bloco`. """
+
+    def _expressao(self, resultado):
+        """ Converte o resultado da visita de uma expressão no nó a guardar. """
+        return resultado
+
+    def visit_Atribuicao(self, node: Atribuicao):
+        node.expressao = self._expressao((yield node.expressao))
+        return node
+
+    def visit_ComandoSimples(self, node: ComandoSimples):
+        if node.expressao:
+            node.expressao = self._expressao((yield node.expressao))
+        return node
+
+    def visit_ComandoIrPara(self, node: ComandoIrPara):
+        node.expr_x = self._expressao((yield node.expr_x))
+        node.expr_y = self._expressao((yield node.expr_y))
+        return node
+
+    def visit_Repita(self, node: Repita):
+        node.bloco = yield node.bloco
+        return node
+
+    def visit_Se(self, node: Se):
+        node.condicao = self._expressao((yield node.condicao))
+        node.bloco_se = yield node.bloco_se
+        if node.bloco_senao:
+            node.bloco_senao = yield node.bloco_senao
+        return node
+
+    def visit_Enquanto(self, node: Enquanto):
+        node.condicao = self._expressao((yield node.condicao))
+        node.bloco = yield node.bloco
+        return node
+
+    def visit_Literal(self, node: Literal):
+        return node
+
+    def visit_Variavel(self, node: Variavel):
+        return node
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        return _reconstruir_unario(node, (yield node.expr))
+
+    def visit_BinOp(self, node: BinOp):
+        esq = yield node.esq
+        dir = yield node.dir
+        return _reconstruir_binario(node, esq, dir)
+
+class DobramentoDeConstantes(TransformadorDeComandos):
+    """
+    Dobramento de constantes, propagação de constantes e eliminação de
+    desvios mortos.
+
+    - `BinOp`/`UnaryOp` cujos operandos são literais numéricos ou lógicos
+      viram um literal, calculado como na execução do código gerado (a
+      divisão é real mesmo entre inteiros).
+    - Uma variável atribuída uma única vez no programa, num comando do bloco
+      principal e com um valor constante, é substituída por esse valor nos
+      comandos seguintes (antes da atribuição ela ainda vale o padrão).
+    - `se` com condição constante vira o bloco escolhido, e `enquanto` com
+      condição falsa é removido.
+    """
+    def __init__(self):
+        self.constantes: dict[str, Literal] = {}
+        self._candidatas: set[str] = set()
+        self._bloco_principal = None
+
+    def visit_Programa(self, node: Programa):
+        atribuicoes: dict[str, int] = {}
+        for filho in percorrer(node):
+            if isinstance(filho, Atribuicao):
+                atribuicoes[filho.var_no.nome] = atribuicoes.get(filho.var_no.nome, 0) + 1
+        self._candidatas = {nome for nome, quantidade in atribuicoes.items() if quantidade == 1}
+        self._bloco_principal = node.bloco
+        return (yield from super().visit_Programa(node))
+
+    def _incorporado(self, bloco: Bloco, comando):
+        if bloco is not self._bloco_principal or not isinstance(comando, Atribuicao):
+            return
+        nome = comando.var_no.nome
+        valor = valor_constante(comando.expressao)
+        if nome in self._candidatas and valor is not None:
+            # O valor assume o tipo declarado da variável (inteiro -> real)
+            self.constantes[nome] = criar_literal(valor, comando.var_no.tipo_inferido,
+                                                  comando.expressao.token.linha)
+
+    def visit_Se(self, node: Se):
+        condicao = yield node.condicao
+        valor = valor_constante(condicao)
+        if valor is not None:
+            escolhido = node.bloco_se if valor else node.bloco_senao
+            if escolhido is None:
+                return None
+            return (yield escolhido)
+        node.condicao = condicao
+        node.bloco_se = yield node.bloco_se
+        if node.bloco_senao:
+            node.bloco_senao = yield node.bloco_senao
+        return node
+
+    def visit_Enquanto(self, node: Enquanto):
+        condicao = yield node.condicao
+        if valor_constante(condicao) is False:
+            return None
+        node.condicao = condicao
+        node.bloco = yield node.bloco
+        return node
+
+    def visit_Variavel(self, node: Variavel):
+        constante = self.constantes.get(node.nome)
+        if constante is None:
+            return node
+        return criar_literal(valor_constante(constante), constante.tipo_inferido, node.token.linha)
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        expr = yield node.expr
+        valor = valor_constante(expr)
+        if valor is not None:
+            return criar_literal(-valor if node.op.valor == '-' else valor, node.tipo_inferido, node.op.linha)
+        return _reconstruir_unario(node, expr)
+
+    def visit_BinOp(self, node: BinOp):
+        esq = yield node.esq
+        dir = yield node.dir
+        valor_esq, valor_dir = valor_constante(esq), valor_constante(dir)
+        if valor_esq is not None and valor_dir is not None:
+            valor = calcular(node.op.valor, valor_esq, valor_dir, node.tipo_inferido)
+            if valor is not None:
+                return criar_literal(valor, node.tipo_inferido, node.op.linha)
+        return _reconstruir_binario(node, esq, dir)
+
+def tamanho(node) -> int:
+    """ Número de nós da árvore, a medida de tamanho de código dos passes. """
+    return sum(1 for _ in percorrer(node))
+
+# Comandos em que repetir n vezes com o argumento c é o mesmo que uma vez com n * c
+_COMANDOS_ESCALAVEIS = ('AVANCAR', 'RECUAR', 'GIRAR_DIREITA', 'GIRAR_ESQUERDA')
+
+class DesenrolamentoDeLacos(TransformadorDeComandos):
+    """
+    Desenrolamento de `repita`, cujo número de voltas é sempre um literal.
+
+    - Com 0 voltas ou menos o laço é removido, e com 1 vira o próprio corpo.
+    - Um corpo que é um único `avancar`, `recuar` ou `girar_*` com argumento
+      constante vira um comando só, com o argumento multiplicado.
+    - Se o laço desenrolado cabe em `limite` nós, ele é desenrolado por
+      inteiro; senão o corpo é repetido o maior número de vezes (até
+      `maximo_copias`) que cabe em `limite`, e as voltas que sobram da
+      divisão vêm depois, também desenroladas.
+
+    O crescimento total do programa é limitado por `orcamento` nós (por
+    padrão, o tamanho do próprio programa). Os laços internos são tratados
+    antes dos externos.
+    """
+    def __init__(self, limite: int = 64, maximo_copias: int = 8, orcamento: int = None):
+        self.limite = limite
+        self.maximo_copias = maximo_copias
+        self.orcamento = orcamento
+        # id(bloco) -> (bloco, tamanho) dos corpos já medidos; o bloco é
+        # mantido vivo para o id não ser reaproveitado
+        self._tamanhos = {}
+
+    def visit_Programa(self, node: Programa):
+        if self.orcamento is None:
+            self.orcamento = tamanho(node)
+        return (yield from super().visit_Programa(node))
+
+    def visit_Repita(self, node: Repita):
+        node.bloco = yield node.bloco
+        vezes = valor_constante(node.vezes)
+        if vezes <= 0:
+            return None  # range(vezes) vazio: o corpo nunca executa
+        if vezes == 1:
+            return node.bloco
+        if len(node.bloco.comandos) == 1:
+            escalado = self._escalar(node.bloco.comandos[0], vezes)
+            if escalado is not None:
+                return escalado
+        corpo = self._tamanho(node.bloco)
+        if vezes * corpo <= self.limite and self._gastar((vezes - 1) * corpo):
+            return self._copias(node.bloco, vezes)
+        for copias in range(min(self.maximo_copias, vezes // 2), 1, -1):
+            resto = vezes % copias
+            if copias * corpo <= self.limite and self._gastar((copias - 1 + resto) * corpo):
+                restantes = [copy.deepcopy(node.bloco.comandos) for _ in range(resto)]
+                node.bloco = self._copias(node.bloco, copias)
+                node.vezes = criar_literal(vezes // copias, 'inteiro', node.vezes.token.linha)
+                return [node] + [comando for comandos in restantes for comando in comandos]
+        return node
+
+    def _tamanho(self, bloco: Bloco) -> int:
+        """
+        O tamanho dos comandos de `bloco`. O tamanho de cada corpo medido é
+        guardado e reaproveitado pelos laços externos: os internos são
+        tratados antes e não mudam depois.
+        """
+        corpo = 0
+        pendentes = list(bloco.comandos)
+        while pendentes:
+            node = pendentes.pop()
+            if isinstance(node, list):
+                pendentes.extend(node)
+            elif id(node) in self._tamanhos:
+                corpo += self._tamanhos[id(node)][1]
+            elif isinstance(node, ASTNode):
+                corpo += 1
+                pendentes.extend(getattr(node, campo) for campo in node._campos)
+        self._tamanhos[id(bloco)] = (bloco, 1 + tamanho(bloco.declaracoes) + corpo)
+        return corpo
+
+    def _gastar(self, crescimento: int) -> bool:
+        """ Desconta o crescimento do orçamento, se ele couber. """
+        if crescimento > self.orcamento:
+            return False
+        self.orcamento -= crescimento
+        return True
+
+    def _escalar(self, comando, vezes: int):
+        if not isinstance(comando, ComandoSimples) or comando.token.tipo not in _COMANDOS_ESCALAVEIS:
+            return None
+        valor = valor_constante(comando.expressao)
+        if valor is None:
+            return None
+        expressao = comando.expressao
+        comando.expressao = criar_literal(valor * vezes, expressao.tipo_inferido, expressao.token.linha)
+        return comando
+
+    def _copias(self, bloco: Bloco, vezes: int) -> Bloco:
+        """ Um Bloco com os comandos de `bloco` repetidos; a primeira cópia é o original. """
+        comandos = list(bloco.comandos)
+        for _ in range(vezes - 1):
+            comandos.extend(copy.deepcopy(bloco.comandos))
+        return Bloco(bloco.declaracoes, comandos)
+
+def _pode_falhar(node: BinOp, dir) -> bool:
+    """ Se a operação pode levantar um erro (divisão por um valor não constante ou zero). """
+    return node.op.valor in ('/', '%') and not valor_constante(dir)
+
+class _Laco:
+    """ Um laço em que o MovimentoDeInvariantes pode elevar expressões. """
+    __slots__ = ('definicoes', 'elevadas')
+
+    def __init__(self):
+        self.definicoes: list[Atribuicao] = []
+        self.elevadas: dict[int, Variavel] = {}
+
+class MovimentoDeInvariantes(TransformadorDeComandos):
+    """
+    Movimento de código invariante em laços: uma subexpressão do corpo (ou
+    da condição do `enquanto`) que só lê variáveis não atribuídas no laço é
+    calculada uma única vez, numa temporária, antes dele.
+
+    Só são movidas expressões que não podem falhar (sem divisão por valor
+    não constante), já que passam a ser avaliadas mesmo se o laço não
+    executar ou se estiverem num `se` do corpo, e que só leem variáveis
+    declaradas no bloco principal (as únicas inicializadas pelo gerador).
+    Uma expressão sai de todos os laços em relação aos quais é invariante.
+
+    A árvore é percorrida uma única vez. As expressões visitadas devolvem
+    (nó, nível): o nível é a posição, na pilha de laços abertos, do laço
+    mais externo em relação ao qual o nó é invariante (1 é o mais externo;
+    acima da pilha, o nó não é invariante em nenhum deles).
+    """
+    def __init__(self, temporarios: Temporarios = None):
+        self.temporarios = temporarios
+        self.canonizador = Canonizador()
+        self._inicializadas: set[str] = set()
+        self._atribuidas: Atribuidas = None
+        self._lacos: list[_Laco] = []
+        # Nome -> posição do laço aberto mais interno que atribui a variável
+        self._escrita: dict[str, int] = {}
+
+    def visit_Programa(self, node: Programa):
+        if self.temporarios is None:
+            self.temporarios = Temporarios.do_programa(node)
+        self._inicializadas = {var.nome for declaracao in node.bloco.declaracoes for var in declaracao.var_nos}
+        self._atribuidas = Atribuidas(node)
+        return (yield from super().visit_Programa(node))
+
+    def _abrir(self, laco) -> dict:
+        """ Empilha o laço; devolve as posições de escrita que ele encobre. """
+        self._lacos.append(_Laco())
+        anteriores = {}
+        for nome in self._atribuidas.em(laco.bloco):
+            anteriores[nome] = self._escrita.get(nome)
+            self._escrita[nome] = len(self._lacos)
+        return anteriores
+
+    def _fechar(self, anteriores: dict) -> list:
+        """ Desempilha o laço; devolve as definições a pôr antes dele. """
+        for nome, posicao in anteriores.items():
+            if posicao is None:
+                del self._escrita[nome]
+            else:
+                self._escrita[nome] = posicao
+        return self._lacos.pop().definicoes
+
+    def visit_Repita(self, node: Repita):
+        if valor_constante(node.vezes) <= 1:
+            node.bloco = yield node.bloco
+            return node
+        anteriores = self._abrir(node)
+        node.bloco = yield node.bloco
+        return self._fechar(anteriores) + [node]
+
+    def visit_Enquanto(self, node: Enquanto):
+        anteriores = self._abrir(node)
+        node.condicao = self._expressao((yield node.condicao))
+        node.bloco = yield node.bloco
+        return self._fechar(anteriores) + [node]
+
+    def _elevar(self, resultado, nivel_do_pai):
+        """ Troca por uma temporária o nó invariante em mais laços do que o pai. """
+        node, nivel = resultado
+        if nivel >= nivel_do_pai or nivel > len(self._lacos) or not isinstance(node, (UnaryOp, BinOp)):
+            return node
+        laco = self._lacos[nivel - 1]
+        self.canonizador.visit(node)
+        chave = self.canonizador.chave(node)
+        if chave not in laco.elevadas:
+            variavel, definicao = self.temporarios.criar(node)
+            laco.elevadas[chave] = variavel
+            laco.definicoes.append(definicao)
+            self._inicializadas.add(variavel.nome)
+        return laco.elevadas[chave]
+
+    def _expressao(self, resultado):
+        return self._elevar(resultado, math.inf)
+
+    def visit_Literal(self, node: Literal):
+        return node, 1
+
+    def visit_Variavel(self, node: Variavel):
+        if node.nome not in self._inicializadas:
+            return node, math.inf
+        return node, self._escrita.get(node.nome, 0) + 1
+
+    def visit_UnaryOp(self, node: UnaryOp):
+        expr, nivel = yield node.expr
+        return _reconstruir_unario(node, expr), nivel
+
+    def visit_BinOp(self, node: BinOp):
+        esq = yield node.esq
+        dir = yield node.dir
+        nivel = math.inf if _pode_falhar(node, dir[0]) else max(esq[1], dir[1])
+        return _reconstruir_binario(node, self._elevar(esq, nivel), self._elevar(dir, nivel)), nivel
+
+# Campos de cada comando cujas expressões são avaliadas uma vez, no início dele
+_RAIZES = {
+    Atribuicao: ('expressao',),
+    ComandoSimples: ('expressao',),
+    ComandoIrPara: ('expr_x', 'expr_y'),
+    Se: ('condicao',),
+}
+
+class _Ocorrencia:
+    __slots__ = ('janela', 'comando', 'node', 'pai', 'filhos')
+
+    def __init__(self, janela, comando, node, pai):
+        self.janela = janela
+        self.comando = comando
+        self.node = node
+        self.pai = pai
+        self.filhos = [None, None]
+
+class EliminacaoDeSubexpressoes(TransformadorDeComandos):
+    """
+    Eliminação de subexpressões comuns dentro de cada bloco: uma expressão
+    que aparece mais de uma vez nas expressões dos comandos do bloco, sem
+    que nenhuma variável que ela lê seja atribuída entre as ocorrências, é
+    calculada uma vez numa temporária, logo antes do comando da primeira.
+
+    Cada expressão tem "janelas" de disponibilidade, encerradas pelas
+    atribuições (e pelas estruturas que atribuem) às variáveis que ela lê.
+    As repetidas são escolhidas da maior para a menor, e uma ocorrência
+    dentro de outra já substituída não conta, para não criar temporárias
+    usadas uma vez só. Os blocos aninhados são tratados à parte.
+    """
+    def __init__(self, temporarios: Temporarios = None):
+        self.temporarios = temporarios
+        self.canonizador = Canonizador()
+        self._atribuidas: Atribuidas = None
+
+    def visit_Programa(self, node: Programa):
+        if self.temporarios is None:
+            self.temporarios = Temporarios.do_programa(node)
+        # As temporárias criadas depois num bloco aninhado só são lidas nele
+        self._atribuidas = Atribuidas(node)
+        return (yield from super().visit_Programa(node))
+
+    def visit_Bloco(self, node: Bloco):
+        node = yield from super().visit_Bloco(node)
+        self._eliminar(node)
+        return node
+
+    def _ocorrencias(self, bloco: Bloco) -> list:
+        """ As operações das expressões do bloco, em ordem, com a sua janela. """
+        ocorrencias = []
+        geracao: dict[int, int] = {}
+        chaves_por_variavel: dict[str, set] = {}
+        for indice, comando in enumerate(bloco.comandos):
+            for campo in _RAIZES.get(type(comando), ()):
+                raiz = getattr(comando, campo)
+                if raiz is None:
+                    continue
+                self.canonizador.visit(raiz)
+                pendentes = [(raiz, None, 0)]
+                while pendentes:
+                    expr, pai, posicao = pendentes.pop()
+                    if not isinstance(expr, (UnaryOp, BinOp)):
+                        continue
+                    chave = self.canonizador.chave(expr)
+                    if pai is not None:
+                        ocorrencias[pai].filhos[posicao] = len(ocorrencias)
+                    ocorrencias.append(_Ocorrencia((chave, geracao.get(chave, 0)), indice, expr, pai))
+                    for nome in self.canonizador.leituras[chave]:
+                        chaves_por_variavel.setdefault(nome, set()).add(chave)
+                    atual = len(ocorrencias) - 1
+                    if isinstance(expr, UnaryOp):
+                        pendentes.append((expr.expr, atual, 0))
+                    else:
+                        pendentes.append((expr.dir, atual, 1))
+                        pendentes.append((expr.esq, atual, 0))
+            for nome in self._atribuidas.em(comando):
+                for chave in chaves_por_variavel.pop(nome, ()):
+                    geracao[chave] = geracao.get(chave, 0) + 1
+        return ocorrencias
+
+    def _eliminar(self, bloco: Bloco):
+        ocorrencias = self._ocorrencias(bloco)
+        janelas: dict[tuple, list] = {}
+        for indice, ocorrencia in enumerate(ocorrencias):
+            janelas.setdefault(ocorrencia.janela, []).append(indice)
+
+        # Da maior expressão para a menor: as ocorrências ainda vivas (fora
+        # de uma ocorrência já trocada pela temporária) decidem a escolha
+        substituidas = set()
+        def viva(indice):
+            indice = ocorrencias[indice].pai
+            while indice is not None:
+                if indice in substituidas:
+                    return False
+                indice = ocorrencias[indice].pai
+            return True
+        escolhidas = {}
+        repetidas = [janela for janela, indices in janelas.items() if len(indices) > 1]
+        repetidas.sort(key=lambda janela: -self.canonizador.tamanho[janela[0]])
+        for janela in repetidas:
+            vivas = [indice for indice in janelas[janela] if viva(indice)]
+            if len(vivas) > 1:
+                escolhidas[janela] = vivas
+                substituidas.update(vivas)
+        if not escolhidas:
+            return
+
+        # Cria as temporárias e reconstrói as expressões de baixo para cima
+        # (na pré-ordem, os filhos vêm depois dos pais)
+        temporaria = {}
+        definicoes: dict[int, list] = {}
+        for vivas in sorted(escolhidas.values()):
+            primeira = ocorrencias[vivas[0]]
+            comando = bloco.comandos[primeira.comando]
+            if primeira.pai is None and isinstance(comando, Atribuicao) and \
+                    comando.var_no.nome in self.temporarios.criadas:
+                # A expressão já é a definição de uma temporária: reaproveita
+                temporaria.update((indice, (comando.var_no, None)) for indice in vivas[1:])
+                continue
+            variavel, definicao = self.temporarios.criar(primeira.node)
+            definicoes.setdefault(primeira.comando, []).append(definicao)
+            for indice in vivas:
+                temporaria[indice] = (variavel, definicao if indice == vivas[0] else None)
+        valores = [None] * len(ocorrencias)
+        for indice in reversed(range(len(ocorrencias))):
+            ocorrencia = ocorrencias[indice]
+            expr = ocorrencia.node
+            filho_esq, filho_dir = (valores[filho] if filho is not None else None for filho in ocorrencia.filhos)
+            if isinstance(expr, UnaryOp):
+                reconstruido = _reconstruir_unario(expr, filho_esq or expr.expr)
+            else:
+                reconstruido = _reconstruir_binario(expr, filho_esq or expr.esq, filho_dir or expr.dir)
+            if indice not in temporaria:
+                valores[indice] = reconstruido
+                continue
+            variavel, definicao = temporaria[indice]
+            if definicao is not None:
+                definicao.expressao = reconstruido
+            valores[indice] = variavel
+
+        comandos = []
+        raizes = iter([indice for indice, ocorrencia in enumerate(ocorrencias) if ocorrencia.pai is None])
+        for indice_comando, comando in enumerate(bloco.comandos):
+            comandos.extend(definicoes.get(indice_comando, ()))
+            for campo in _RAIZES.get(type(comando), ()):
+                if isinstance(getattr(comando, campo), (UnaryOp, BinOp)):
+                    setattr(comando, campo, valores[next(raizes)])
+            comandos.append(comando)
+        bloco.comandos = comandos
+
+def lidas(expressao) -> frozenset:
+    """ Nomes das variáveis lidas por uma expressão. """
+    return frozenset(no.nome for no in percorrer(expressao) if isinstance(no, Variavel))
+
+def pode_falhar(expressao) -> bool:
+    """ Se avaliar a expressão pode levantar um erro em tempo de execução. """
+    return any(isinstance(no, BinOp) and _pode_falhar(no, no.dir) for no in percorrer(expressao))
+
+class _Desconhecido:
+    def __repr__(self):
+        return 'DESCONHECIDO'
+
+# Valor do estado de desenho que pode variar conforme o caminho
+DESCONHECIDO = _Desconhecido()
+
+# O estado da tartaruga no início: caneta abaixada, espessura 1 e fundo
+# branco; a cor inicial pode vir da configuração do turtle e fica desconhecida
+ESTADO_INICIAL = (True, DESCONHECIDO, 1, 'white')
+
+# Posição no estado de desenho de cada comando de estilo com argumento
+_ESTILOS = {'DEFINIR_COR': 1, 'DEFINIR_ESPESSURA': 2, 'COR_DE_FUNDO': 3}
+
+def _valor_de_estilo(expressao):
+    """ O valor de um literal de texto ou número; DESCONHECIDO nos demais casos. """
+    if isinstance(expressao, Literal):
+        if expressao.token.tipo == 'TEXTO':
+            return literal_eval(expressao.valor)
+        valor = valor_constante(expressao)
+        if valor is not None:
+            return valor
+    return DESCONHECIDO
+
+def _efeito_no_estado(comando, estado: tuple) -> tuple:
+    """ O estado de desenho depois do comando. """
+    if not isinstance(comando, ComandoSimples):
+        return estado
+    tipo = comando.token.tipo
+    if tipo in ('LEVANTAR_CANETA', 'ABAIXAR_CANETA'):
+        return (tipo == 'ABAIXAR_CANETA',) + estado[1:]
+    if tipo == 'RESTAURAR_POSICAO':
+        # Com a pilha vazia nada muda; senão a caneta termina abaixada
+        return (True if estado[0] is True else DESCONHECIDO,) + estado[1:]
+    if tipo in _ESTILOS:
+        indice = _ESTILOS[tipo]
+        return estado[:indice] + (_valor_de_estilo(comando.expressao),) + estado[indice + 1:]
+    return estado
+
+class GrafoDeFluxo(Visitor):
+    """
+    Grafo de fluxo de controle de um programa, com um ponto por comando
+    simples ou atribuição, um pela condição de cada `se`/`enquanto`, um pelo
+    início de cada `repita` e um pelo início de cada bloco. Cada ponto tem as
+    variáveis que usa, a que define (ou None) e os seus sucessores. Cada
+    visita devolve (entrada, saídas): o ponto por onde se entra na estrutura
+    e os pontos de onde se sai dela.
+    """
+    def __init__(self):
+        self.usos: list[frozenset] = []
+        self.definicoes: list = []
+        self.sucessores: list[list[int]] = []
+        self.comandos: list = []
+        self.entrada = None
+
+    def _ponto(self, usos=frozenset(), definicao=None, comando=None) -> int:
+        self.usos.append(usos)
+        self.definicoes.append(definicao)
+        self.sucessores.append([])
+        self.comandos.append(comando)
+        return len(self.usos) - 1
+
+    def _ligar(self, origens, destino: int):
+        for origem in origens:
+            self.sucessores[origem].append(destino)
+
+    def visit_Programa(self, node: Programa):
+        self.entrada, saidas = yield node.bloco
+        return self.entrada, saidas
+
+    def visit_Bloco(self, node: Bloco):
+        entrada = self._ponto()
+        saidas = [entrada]
+        for comando in node.comandos:
+            inicio, fim = yield comando
+            self._ligar(saidas, inicio)
+            saidas = fim
+        return entrada, saidas
+
+    def visit_Atribuicao(self, node: Atribuicao):
+        ponto = self._ponto(lidas(node.expressao), node.var_no.nome, node)
+        return ponto, [ponto]
+
+    def visit_ComandoSimples(self, node: ComandoSimples):
+        ponto = self._ponto(lidas(node.expressao) if node.expressao else frozenset(), comando=node)
+        return ponto, [ponto]
+
+    def visit_ComandoIrPara(self, node: ComandoIrPara):
+        ponto = self._ponto(lidas(node.expr_x) | lidas(node.expr_y), comando=node)
+        return ponto, [ponto]
+
+    def visit_Repita(self, node: Repita):
+        inicio = self._ponto(comando=node)
+        entrada, saidas = yield node.bloco
+        vezes = valor_constante(node.vezes)
+        if vezes is not None and vezes <= 0:
+            # range(vezes) vazio: o corpo nunca executa
+            return inicio, [inicio]
+        # Cada volta pode ser seguida de outra; só um número positivo
+        # conhecido garante que o corpo executa ao menos uma vez
+        self._ligar([inicio], entrada)
+        self._ligar(saidas, entrada)
+        return inicio, saidas if vezes is not None else saidas + [inicio]
+
+    def visit_Se(self, node: Se):
+        condicao = self._ponto(lidas(node.condicao), comando=node)
+        entrada, saidas = yield node.bloco_se
+        self._ligar([condicao], entrada)
+        saidas = list(saidas)
+        if node.bloco_senao:
+            entrada, saidas_senao = yield node.bloco_senao
+            self._ligar([condicao], entrada)
+            saidas.extend(saidas_senao)
+        else:
+            saidas.append(condicao)
+        return condicao, saidas
+
+    def visit_Enquanto(self, node: Enquanto):
+        condicao = self._ponto(lidas(node.condicao), comando=node)
+        entrada, saidas = yield node.bloco
+        self._ligar([condicao], entrada)
+        self._ligar(saidas, condicao)
+        return condicao, [condicao]
+
+    def vivacidade(self) -> tuple[list[set], list[set]]:
+        """
+        Análise de vivacidade: as variáveis vivas na entrada e na saída de
+        cada ponto, isto é, que podem ser lidas antes de receber outro valor.
+        Resolvida com uma lista de trabalho, sem recursão.
+        """
+        total = len(self.usos)
+        predecessores = [[] for _ in range(total)]
+        for ponto, sucessores in enumerate(self.sucessores):
+            for sucessor in sucessores:
+                predecessores[sucessor].append(ponto)
+        vivas_entrada = [set() for _ in range(total)]
+        vivas_saida = [set() for _ in range(total)]
+        # Os últimos pontos primeiro: a informação flui de trás para a frente
+        pendentes = list(range(total))
+        na_lista = [True] * total
+        while pendentes:
+            ponto = pendentes.pop()
+            na_lista[ponto] = False
+            saida = set()
+            for sucessor in self.sucessores[ponto]:
+                saida |= vivas_entrada[sucessor]
+            vivas_saida[ponto] = saida
+            entrada = saida - {self.definicoes[ponto]} if self.definicoes[ponto] else set(saida)
+            entrada |= self.usos[ponto]
+            if entrada != vivas_entrada[ponto]:
+                vivas_entrada[ponto] = entrada
+                for predecessor in predecessores[ponto]:
+                    if not na_lista[predecessor]:
+                        na_lista[predecessor] = True
+                        pendentes.append(predecessor)
+        return vivas_entrada, vivas_saida
+
+    def estados_da_caneta(self) -> list:
+        """
+        Análise para a frente do estado de desenho: para cada ponto, a tupla
+        (caneta abaixada, cor, espessura, cor de fundo) com que se chega a
+        ele, cada item um valor conhecido ou DESCONHECIDO, ou None se o ponto
+        é inalcançável. Nas junções um valor só continua conhecido se é o
+        mesmo em todos os caminhos; os laços são resolvidos com uma lista de
+        trabalho até o ponto fixo.
+        """
+        total = len(self.usos)
+        estados = [None] * total
+        estados[self.entrada] = ESTADO_INICIAL
+        pendentes = [self.entrada]
+        while pendentes:
+            ponto = pendentes.pop()
+            saida = _efeito_no_estado(self.comandos[ponto], estados[ponto])
+            for sucessor in self.sucessores[ponto]:
+                anterior = estados[sucessor]
+                novo = saida if anterior is None else tuple(
+                    a if a == b else DESCONHECIDO for a, b in zip(anterior, saida))
+                if novo != anterior:
+                    estados[sucessor] = novo
+                    pendentes.append(sucessor)
+        return estados
+
+def _valor_definido(comando):
+    """ (posição no estado, valor) que o comando de estilo define, ou None. """
+    tipo = comando.token.tipo
+    if tipo in ('LEVANTAR_CANETA', 'ABAIXAR_CANETA'):
+        return 0, tipo == 'ABAIXAR_CANETA'
+    if tipo in _ESTILOS:
+        return _ESTILOS[tipo], _valor_de_estilo(comando.expressao)
+    return None
+
+class EliminacaoDeEstilosRedundantes(TransformadorDeComandos):
+    """
+    Remove os comandos de caneta e de estilo (`levantar_caneta`,
+    `abaixar_caneta`, `definir_cor`, `definir_espessura`, `cor_de_fundo`)
+    que definem um valor que o estado de desenho já tem em todos os caminhos
+    até eles, segundo `GrafoDeFluxo.estados_da_caneta`. Só argumentos
+    literais são acompanhados. Remover um desses comandos não muda o estado
+    em nenhum ponto, então todos são removidos de uma vez.
+    """
+    def __init__(self):
+        self._redundantes: set[int] = set()
+
+    def visit_Programa(self, node: Programa):
+        grafo = GrafoDeFluxo()
+        grafo.visit(node)
+        for comando, estado in zip(grafo.comandos, grafo.estados_da_caneta()):
+            if estado is None or not isinstance(comando, ComandoSimples):
+                continue
+            definido = _valor_definido(comando)
+            if definido is not None and definido[1] is not DESCONHECIDO and estado[definido[0]] == definido[1]:
+                self._redundantes.add(id(comando))
+        return (yield from super().visit_Programa(node))
+
+    def visit_ComandoSimples(self, node: ComandoSimples):
+        return None if id(node) in self._redundantes else node
+
+class EliminacaoDeCodigoMorto(TransformadorDeComandos):
+    """
+    Eliminação de atribuições mortas e de variáveis não usadas, a partir da
+    análise de vivacidade do `GrafoDeFluxo`.
+
+    - Uma atribuição cujo valor nunca é lido (a variável não está viva
+      depois dela) é removida, se a expressão não pode falhar. Como remover
+      uma atribuição pode matar outras, a análise é refeita até nada mudar.
+    - A inicialização com o valor padrão, que o gerador escreve para cada
+      variável declarada no bloco principal, só é mantida se a variável está
+      viva no início do programa: senão a variável sai da declaração.
+    - Nos blocos aninhados (cujas declarações não geram código) saem as
+      variáveis que nunca são lidas.
+    """
+    def __init__(self):
+        self._mortas: set[int] = set()
+
+    def visit_Programa(self, node: Programa):
+        while True:
+            grafo = GrafoDeFluxo()
+            grafo.visit(node)
+            vivas_entrada, vivas_saida = grafo.vivacidade()
+            self._mortas = {
+                id(comando) for comando, definicao, vivas in zip(grafo.comandos, grafo.definicoes, vivas_saida)
+                if definicao is not None and definicao not in vivas and not pode_falhar(comando.expressao)
+            }
+            if not self._mortas:
+                break
+            node = yield from super().visit_Programa(node)
+
+        usadas = set().union(*grafo.usos)
+        for bloco in percorrer(node):
+            if isinstance(bloco, Bloco):
+                necessarias = vivas_entrada[grafo.entrada] if bloco is node.bloco else usadas
+                for declaracao in bloco.declaracoes:
+                    declaracao.var_nos = [var for var in declaracao.var_nos if var.nome in necessarias]
+                bloco.declaracoes = [declaracao for declaracao in bloco.declaracoes if declaracao.var_nos]
+        return node
+
+    def visit_Atribuicao(self, node: Atribuicao):
+        return None if id(node) in self._mortas else node
+
+# Sentido de cada deslocamento e de cada giro (à esquerda é positivo)
+_SENTIDOS = {'AVANCAR': 1, 'RECUAR': -1, 'GIRAR_ESQUERDA': 1, 'GIRAR_DIREITA': -1}
+_INVERSOS = {'AVANCAR': 'RECUAR', 'RECUAR': 'AVANCAR',
+             'GIRAR_ESQUERDA': 'GIRAR_DIREITA', 'GIRAR_DIREITA': 'GIRAR_ESQUERDA'}
+_CANETA = ('LEVANTAR_CANETA', 'ABAIXAR_CANETA')
+
+class OtimizacaoPeephole(TransformadorDeComandos):
+    """
+    Otimização peephole das sequências de comandos de cada Bloco: cada
+    comando é combinado, se possível, com o anterior já otimizado, e o
+    resultado é combinado de novo com o que vem antes dele.
+
+    - Dois giros com argumento constante viram um só, com a soma, e um giro
+      de um múltiplo de 360 graus é removido. Um giro seguido do giro
+      inverso com a mesma expressão (que não pode falhar) se cancela.
+    - Dois deslocamentos (`avancar`/`recuar`) constantes no mesmo sentido
+      viram um só. Com a caneta levantada nada é desenhado: o sentido não
+      importa, um deslocamento seguido do inverso se cancela, e um
+      deslocamento ou `ir_para` seguido de `ir_para` é descartado.
+    - Deslocamentos e círculos de tamanho zero são removidos, e de dois
+      comandos de caneta seguidos só o segundo fica.
+
+    O estado da caneta é o deixado pelo último comando de caneta do próprio
+    bloco; laços e condicionais que mudam a caneta e `restaurar_posicao` o
+    tornam desconhecido.
+    """
+    def __init__(self):
+        self._canonizador = Canonizador()
+        # id(bloco) -> (bloco, se algum comando dele muda a caneta ou restaura
+        # a posição); o bloco é mantido vivo para o id não ser reaproveitado
+        self._mudam_caneta = {}
+
+    def visit_Bloco(self, node: Bloco):
+        node = yield from super().visit_Bloco(node)
+        comandos = []
+        caneta = None  # True: abaixada, False: levantada, None: desconhecida
+        for comando in node.comandos:
+            pendentes = [] if self._nulo(comando) else [comando]
+            while pendentes:
+                atual = pendentes.pop()
+                combinados = self._combinar(comandos[-1], atual, caneta) if comandos else None
+                if combinados is None:
+                    comandos.append(atual)
+                else:
+                    comandos.pop()
+                    pendentes.extend(combinados)
+            caneta = self._caneta(comando, caneta)
+        node.comandos = comandos
+        self._mudam_caneta[id(node)] = (node, any(self._muda_caneta(comando) for comando in comandos))
+        return node
+
+    def _nulo(self, comando) -> bool:
+        """ Se o comando não tem efeito: deslocamento, giro ou círculo de tamanho zero. """
+        if not isinstance(comando, ComandoSimples) or comando.token.tipo not in (*_SENTIDOS, 'CIRCULO'):
+            return False
+        valor = valor_constante(comando.expressao)
+        if valor is None:
+            return False
+        return valor % 360 == 0 if comando.token.tipo.startswith('GIRAR') else valor == 0
+
+    def _caneta(self, comando, caneta):
+        """ O estado da caneta depois do comando. """
+        if isinstance(comando, ComandoSimples):
+            if comando.token.tipo in _CANETA:
+                return comando.token.tipo == 'ABAIXAR_CANETA'
+            return None if comando.token.tipo == 'RESTAURAR_POSICAO' else caneta
+        return None if self._muda_caneta(comando) else caneta
+
+    def _muda_caneta(self, comando) -> bool:
+        """
+        Se o comando muda a caneta ou restaura a posição. Os blocos aninhados
+        já foram visitados, então o resumo de cada um já está guardado.
+        """
+        if isinstance(comando, ComandoSimples):
+            return comando.token.tipo in (*_CANETA, 'RESTAURAR_POSICAO')
+        return any(self._mudam_caneta[id(bloco)][1] for bloco in _blocos(comando))
+
+    def _combinar(self, anterior, comando, caneta):
+        """ Os comandos que substituem o par, ou None se ele fica como está. """
+        if isinstance(comando, ComandoIrPara):
+            # Com a caneta levantada, só o destino do `ir_para` importa
+            if caneta is False and self._deslocamento(anterior) and not any(map(pode_falhar, self._argumentos(anterior))):
+                return [comando]
+            return None
+        if not isinstance(anterior, ComandoSimples) or not isinstance(comando, ComandoSimples):
+            return None
+        tipo_anterior, tipo = anterior.token.tipo, comando.token.tipo
+        if tipo_anterior in _CANETA and tipo in _CANETA:
+            return [comando]
+        if tipo_anterior not in _SENTIDOS or tipo not in _SENTIDOS:
+            return None
+        giro = tipo.startswith('GIRAR')
+        if giro != tipo_anterior.startswith('GIRAR'):
+            return None
+        # Deslocamentos só se combinam sem desenhar ou no mesmo sentido
+        livre = giro or caneta is False
+        primeiro, segundo = valor_constante(anterior.expressao), valor_constante(comando.expressao)
+        if primeiro is None or segundo is None:
+            if (livre and _INVERSOS[tipo_anterior] == tipo and not pode_falhar(anterior.expressao)
+                    and self._canonico(anterior.expressao) is self._canonico(comando.expressao)):
+                return []
+            return None
+        primeiro *= _SENTIDOS[tipo_anterior]
+        segundo *= _SENTIDOS[tipo]
+        if not livre and primeiro * segundo <= 0:
+            return None
+        total = primeiro + segundo
+        if total % 360 == 0 if giro else total == 0:
+            return []
+        # O comando resultante é o primeiro, ou o inverso dele se o total mudou de sentido
+        resultado = tipo_anterior if total * _SENTIDOS[tipo_anterior] > 0 else _INVERSOS[tipo_anterior]
+        tipo_valor = 'real' if 'real' in (anterior.expressao.tipo_inferido, comando.expressao.tipo_inferido) else 'inteiro'
+        linha = anterior.token.linha
+        return [ComandoSimples(Token(resultado, resultado.lower(), linha), criar_literal(abs(total), tipo_valor, linha))]
+
+    def _deslocamento(self, comando) -> bool:
+        return (isinstance(comando, ComandoIrPara)
+                or isinstance(comando, ComandoSimples) and comando.token.tipo in ('AVANCAR', 'RECUAR'))
+
+    def _argumentos(self, comando) -> list:
+        if isinstance(comando, ComandoIrPara):
+            return [comando.expr_x, comando.expr_y]
+        return [comando.expressao]
+
+    def _canonico(self, expressao):
+        return self._canonizador.visit(expressao)
+
+def otimizar(arvore: Programa) -> Programa:
+    """
+    Aplica os passes à árvore já anotada: dobramento e propagação de
+    constantes, desenrolamento de laços, movimento de invariantes de laços,
+    eliminação de subexpressões comuns e de código morto e, por último, a
+    otimização peephole das sequências de comandos e a eliminação de estilos
+    redundantes. Como cada um desses dois pode abrir oportunidades para o
+    outro, o peephole roda de novo no fim. As temporárias têm nomes
+    distintos entre si e das variáveis do programa.
+    """
+    arvore = DobramentoDeConstantes().visit(arvore)
+    arvore = DesenrolamentoDeLacos().visit(arvore)
+    temporarios = Temporarios.do_programa(arvore)
+    arvore = MovimentoDeInvariantes(temporarios).visit(arvore)
+    arvore = EliminacaoDeSubexpressoes(temporarios).visit(arvore)
+    arvore = EliminacaoDeCodigoMorto().visit(arvore)
+    arvore = OtimizacaoPeephole().visit(arvore)
+    arvore = EliminacaoDeEstilosRedundantes().visit(arvore)
+    return OtimizacaoPeephole().visit(arvore)
@@ -1,214 +1,665 @@
-from src.tokenizer import Token
+from collections import deque
+from typing import Iterable, Optional, Union
+
+from src.tokenizer import TIPOS_TOKEN, Token, TokenBuffer
 from src.ast_nodes import *
+from src import gramatica
+
+_TIPOS_LITERAIS = frozenset(('NUMERO_INTEIRO', 'NUMERO_REAL', 'TEXTO', 'VERDADEIRO', 'FALSO'))
+
+# Poder de ligação dos operadores binários (maior liga mais forte). Todos são
+# associativos à esquerda; o relacional aparece no máximo uma vez por nível
+# de parênteses. Os unários '+'/'-' ligam mais forte que qualquer binário.
+_PODER_BINARIO = {
+    '==': 1, '!=': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '+': 2, '-': 2, '%': 2,
+    '*': 3, '/': 3,
+}
+_PODER_PREFIXO = 4
+
+class _LinhaDaTabela(dict):
+    """ Linha da tabela LL(1) de um não terminal: tipo de token -> produção. """
+    __slots__ = ('nome',)
+
+    def __init__(self, nome: str):
+        super().__init__()
+        self.nome = nome
+
+class _TerminalEmpilhado(str):
+    """ Terminal cujo token vai para a pilha de valores ('@TIPO'). """
+    __slots__ = ()
+
+# Na pilha do analisador preditivo, cada símbolo da gramática é representado
+# pelo objeto que o trata, e o tipo desse objeto decide o que fazer: `str`
+# para terminais, `_TerminalEmpilhado`, `_LinhaDaTabela` para não terminais,
+# `_EXPRESSAO` para a expressão e funções para as ações semânticas.
+_EXPRESSAO = object()
+
+class _PontoDeRecuperacao:
+    """
+    Fica na pilha sob o `itens` de um bloco quando o parser recupera erros,
+    guardando a altura da pilha de valores no início do comando corrente.
+    Ao sair da pilha normalmente, não faz nada.
+    """
+    __slots__ = ('altura',)
+
+    def __init__(self, altura: int):
+        self.altura = altura
+
+    def __call__(self, valores, pos):
+        pass
+
+# Separa, na pilha de valores, os itens de um bloco ou de uma declaração
+_MARCA = object()
+
+def _ate_marca(valores: list) -> list:
+    """ Desempilha e devolve os valores acima da última marca. """
+    i = len(valores) - 1
+    while valores[i] is not _MARCA:
+        i -= 1
+    itens = valores[i + 1:]
+    del valores[i:]
+    return itens
+
+def _acao_bloco(valores, pos):
+    itens = _ate_marca(valores)
+    bloco_node = Bloco(
+        [node for node in itens if isinstance(node, VarDecl)],
+        [node for node in itens if not isinstance(node, VarDecl)],
+    )
+    bloco_node.intervalo = (valores[-1], pos)
+    valores[-1] = bloco_node
+
+def _acao_declaracao(valores, pos):
+    tipo_node, *itens = _ate_marca(valores)
+    valores.append(VarDecl(tipo_node, [node for node in itens if isinstance(node, Variavel)]))
+    valores.extend(node for node in itens if isinstance(node, Atribuicao))
+
+def _acao_inicializacao(valores, pos):
+    expressao_node = valores.pop()
+    valores.append(Atribuicao(var_no=Variavel(valores[-1].token), expressao=expressao_node))
+
+def _acao_atribuicao(valores, pos):
+    expressao_node = valores.pop()
+    valores[-1] = Atribuicao(valores[-1], expressao_node)
+
+def _acao_comando_com_expressao(valores, pos):
+    expressao_node = valores.pop()
+    valores[-1] = ComandoSimples(valores[-1], expressao=expressao_node)
+
+def _acao_ir_para(valores, pos):
+    expr_y = valores.pop()
+    expr_x = valores.pop()
+    valores[-1] = ComandoIrPara(valores[-1], expr_x, expr_y)
+
+def _acao_estrutura(classe):
+    """ Ação de repita/se/enquanto: os valores desde o '#posicao' viram o nó. """
+    def acao(valores, pos):
+        inicio = len(valores) - 1
+        while type(valores[inicio]) is not int:
+            inicio -= 1
+        node = classe(*valores[inicio + 1:])
+        node.intervalo = (valores[inicio], pos)
+        del valores[inicio + 1:]
+        valores[-1] = node
+    return acao
+
+def _acao_envolver(classe):
+    def acao(valores, pos):
+        valores[-1] = classe(valores[-1])
+    return acao
+
+# Ações semânticas referidas na gramática como '#nome'. Cada uma recebe a
+# pilha de valores e o índice do token atual, e substitui os valores do topo
+# pelo nó que eles formam.
+_ACOES = {
+    'programa': _acao_envolver(Programa),
+    'posicao': lambda valores, pos: valores.append(pos),
+    'marca': lambda valores, pos: valores.append(_MARCA),
+    'bloco': _acao_bloco,
+    'declaracao': _acao_declaracao,
+    'tipo': _acao_envolver(Tipo),
+    'variavel': _acao_envolver(Variavel),
+    'inicializacao': _acao_inicializacao,
+    'atribuicao': _acao_atribuicao,
+    'comando_com_expressao': _acao_comando_com_expressao,
+    'comando_simples': _acao_envolver(ComandoSimples),
+    'ir_para': _acao_ir_para,
+    'repita': _acao_estrutura(Repita),
+    'se': _acao_estrutura(Se),
+    'enquanto': _acao_estrutura(Enquanto),
+    'vazio': lambda valores, pos: valores.append(None),
+}
+
+_TABELA = {nt: _LinhaDaTabela(nt) for nt in gramatica.TABELA}
+
+def _compilar(producao: tuple) -> tuple:
+    """ Converte uma produção nos objetos da pilha, na ordem de empilhamento. """
+    itens = []
+    for simbolo in producao:
+        if gramatica.eh_acao(simbolo):
+            nome = simbolo[1:]
+            if nome not in _ACOES:
+                raise ValueError(f"Ação semântica '#{nome}' da gramática não está implementada")
+            itens.append(_ACOES[nome])
+        elif simbolo[0] == '@':
+            itens.append(_TerminalEmpilhado(simbolo[1:]))
+        elif gramatica.eh_terminal(simbolo):
+            itens.append(simbolo)
+        elif simbolo in gramatica.EXTERNOS:
+            itens.append(_EXPRESSAO)
+        else:
+            itens.append(_TABELA[simbolo])
+    return tuple(reversed(itens))
+
+for _nt, _linha in gramatica.TABELA.items():
+    _TABELA[_nt].update((terminal, _compilar(producao)) for terminal, producao in _linha.items())
+
+# Produção ε de cada não terminal anulável, usada quando o token atual não
+# está na linha da tabela (ver `gramatica.MENSAGENS_DE_ERRO`)
+_PRODUCAO_VAZIA = {nt: _compilar(producao) for nt, producao in gramatica.PRODUCOES_VAZIAS.items()}
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
-        self.pos = 0
-        self.token_atual = self.tokens[self.pos]
+    """
+    Parser LL(1) dirigido pela tabela de `src.gramatica`, que consome os
+    tokens sob demanda. Aceita uma lista, um iterador (como o de
+    `gerar_tokens`), caso em que apenas os tokens da janela de lookahead
+    ficam em memória, ou um `TokenBuffer`, lido por índice sem criar um
+    `Token` para cada posição.
+
+    As decisões usam apenas `tipo_atual`; `token_atual` só materializa o
+    token quando ele é de fato guardado na AST ou citado num erro.
+
+    Com `recuperar_erros=True`, um erro de sintaxe não interrompe a análise:
+    ele é guardado em `erros`, o parser se ressincroniza no próximo ';' ou
+    terminador de bloco e `parse` devolve a AST parcial. Um erro léxico vindo
+    do fluxo de tokens continua interrompendo a análise: o fluxo acabou.
+
+    Com uma `fabrica` (FabricaDeNos), os nós das expressões são criados por
+    hash-consing: expressões repetidas no programa viram o mesmo objeto.
+    """
+    def __init__(self, tokens: Union[Iterable[Token], TokenBuffer], recuperar_erros: bool = False,
+                 fabrica: Optional[FabricaDeNos] = None):
+        self.pos = -1
+        self.recuperar_erros = recuperar_erros
+        if fabrica is None:
+            self._construtores = (Literal, Variavel, UnaryOp, BinOp)
+        else:
+            self._construtores = (fabrica.literal, fabrica.variavel, fabrica.unario, fabrica.binario)
+        self.erros: list[SyntaxError] = []
+        # Usado por `reanalisar`: estruturas da árvore anterior, pelo índice do
+        # token onde começam, que podem ser reaproveitadas sem nova análise
+        self._reutilizaveis: dict[int, ASTNode] = {}
+        if isinstance(tokens, TokenBuffer):
+            self._buffer: Optional[TokenBuffer] = tokens
+            self._total = len(tokens)
+        else:
+            self._buffer = None
+            self._fluxo = iter(tokens)
+            self._lookahead: deque[Token] = deque()
+        # Erro levantado pelo próprio fluxo de tokens (um erro léxico): depois
+        # dele o fluxo não produz mais tokens, então não há como se recuperar
+        self._erro_do_fluxo: Optional[SyntaxError] = None
+        self._avancar()
 
     def _avancar(self):
         self.pos += 1
-        self.token_atual = self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        if self._buffer is None:
+            token = self._lookahead.popleft() if self._lookahead else self._proximo_do_fluxo()
+            self._token: Optional[Token] = token
+            self.tipo_atual = token.tipo if token is not None else None
+        else:
+            self._token = None
+            self.tipo_atual = TIPOS_TOKEN[self._buffer.tipos[self.pos]] if self.pos < self._total else None
+
+    def _proximo_do_fluxo(self) -> Optional[Token]:
+        try:
+            return next(self._fluxo, None)
+        except SyntaxError as erro:
+            self._erro_do_fluxo = erro
+            raise
+
+    def _posicionar(self, pos: int):
+        """ Leva a análise ao token `pos` de um `TokenBuffer`. """
+        self.pos = pos - 1
+        self._avancar()
+
+    @property
+    def token_atual(self) -> Optional[Token]:
+        if self._token is None and self.tipo_atual is not None and self._buffer is not None:
+            self._token = self._buffer[self.pos]
+        return self._token
+
+    @property
+    def valor_atual(self) -> Optional[str]:
+        if self._buffer is not None:
+            return self._buffer.valor(self.pos) if self.tipo_atual is not None else None
+        return self._token.valor if self._token else None
+
+    def _espiar(self, k: int = 1) -> Optional[Token]:
+        """ Retorna o token k posições após o atual, sem consumi-lo. """
+        if self._buffer is not None:
+            indice = self.pos + k
+            return self._buffer[indice] if indice < len(self._buffer) else None
+        while len(self._lookahead) < k:
+            token = self._proximo_do_fluxo()
+            if token is None:
+                return None
+            self._lookahead.append(token)
+        return self._lookahead[k - 1]
+
+    def _erro_esperado(self, tipo_esperado: str) -> SyntaxError:
+        linha = self.token_atual.linha if self.token_atual else 'desconhecida'
+        tipo_encontrado = self.tipo_atual if self.tipo_atual else 'EOF'
+        return SyntaxError(
+            f"Erro de Sintaxe na linha {linha}: Esperado '{tipo_esperado}', mas encontrou '{tipo_encontrado}'"
+        )
 
-    def _consumir(self, tipo_esperado: str):
-        if self.token_atual and self.token_atual.tipo == tipo_esperado:
+    def _consumir(self, tipo_esperado: str) -> Token:
+        if self.tipo_atual == tipo_esperado:
             token = self.token_atual
             self._avancar()
             return token
-        else:
-            linha = self.token_atual.linha if self.token_atual else 'desconhecida'
-            tipo_encontrado = self.token_atual.tipo if self.token_atual else 'EOF'
-            raise SyntaxError(
-                f"Erro de Sintaxe na linha {linha}: Esperado '{tipo_esperado}', mas encontrou '{tipo_encontrado}'"
-            )
+        raise self._erro_esperado(tipo_esperado)
+
+    def _esperar(self, tipo_esperado: str):
+        """ Como `_consumir`, para tokens que não são guardados na AST. """
+        if self.tipo_atual != tipo_esperado:
+            raise self._erro_esperado(tipo_esperado)
+        self._avancar()
 
     def parse(self) -> ASTNode:
         return self.programa()
 
-    def programa(self) -> Programa:
-        self._consumir('INICIO')
-        bloco_node = self.bloco()
-        self._consumir('FIM')
-        if self.token_atual and self.token_atual.tipo != 'EOF':
-             raise SyntaxError(f"Código encontrado após o 'fim' do programa na linha {self.token_atual.linha}")
-        return Programa(bloco=bloco_node)
+    def _analisar(self, inicial: str) -> list:
+        """
+        Analisador preditivo dirigido pela tabela LL(1) de `gramatica`: a
+        cada não terminal no topo da pilha, a produção é escolhida com uma
+        consulta pelo tipo do token atual. Estruturas aninhadas só crescem
+        a pilha explícita, não a pilha do Python. Devolve a pilha de valores
+        deixada pelas ações semânticas.
+        """
+        valores = []
+        pilha = [_TABELA[inicial]]
+        avancar = self._avancar
+        itens = _TABELA['itens'] if self.recuperar_erros or self._reutilizaveis else None
 
-    def bloco(self) -> Bloco:
-        declaracoes = []
-        comandos = []
-        tokens_de_parada = {'FIM', 'FIM_REPITA', 'FIM_SE', 'FIM_ENQUANTO', 'SENAO', 'EOF'}
-
-        while self.token_atual and self.token_atual.tipo not in tokens_de_parada:
-            if self.token_atual.tipo == 'VAR':
-                nodes_gerados = self.declaracao_variaveis()
-                for node in nodes_gerados:
-                    if isinstance(node, VarDecl):
-                        declaracoes.append(node)
-                    else: 
-                        comandos.append(node)
-            else:
-                comandos.append(self.comando())
+        while pilha:
+            try:
+                while pilha:
+                    simbolo = pilha.pop()
+                    classe = type(simbolo)
+                    if classe is str:
+                        if self.tipo_atual != simbolo:
+                            raise self._erro_esperado(simbolo)
+                        avancar()
+                    elif classe is _LinhaDaTabela:
+                        if simbolo is itens:
+                            producao = self._entrar_itens(pilha, valores)
+                        else:
+                            producao = simbolo.get(self.tipo_atual)
+                            if producao is None:
+                                producao = self._sem_producao(simbolo.nome)
+                        pilha.extend(producao)
+                    elif classe is _TerminalEmpilhado:
+                        valores.append(self._consumir(simbolo))
+                    elif simbolo is _EXPRESSAO:
+                        valores.append(self.expressao())
+                    else:
+                        simbolo(valores, self.pos)
+            except SyntaxError as erro:
+                if not self.recuperar_erros or erro is self._erro_do_fluxo:
+                    raise
+                self._recuperar(erro, simbolo, pilha, valores)
+        return valores
 
-        return Bloco(declaracoes, comandos)
+    def _entrar_itens(self, pilha: list, valores: list) -> tuple:
+        """
+        Escolhe a produção de `itens` quando o parser recupera erros ou
+        reaproveita estruturas de uma análise anterior.
 
-    def declaracao_variaveis(self) -> list[ASTNode]:
-        nodes_gerados = []
-        self._consumir('VAR')
-        tipo_node = self.tipo()
-        self._consumir('DOIS_PONTOS')
-        
-        variaveis_declaradas = []
-        
-        while True:
-            var_token = self._consumir('ID')
-            variaveis_declaradas.append(Variavel(var_token))
-            
-            if self.token_atual and self.token_atual.tipo == 'ATRIBUICAO':
-                self._consumir('ATRIBUICAO')
-                expressao_node = self.expressao()
-                atribuicao_node = Atribuicao(var_no=Variavel(var_token), expressao=expressao_node)
-                nodes_gerados.append(atribuicao_node)
-            
-            if self.token_atual.tipo != 'VIRGULA':
+        Uma estrutura reaproveitável que começa no token atual é empilhada
+        como valor, e a análise salta para o fim dela. No modo de
+        recuperação, o início do comando é marcado com um
+        `_PontoDeRecuperacao`, e um terminador que não fecha o bloco atual
+        nem nenhum dos que o envolvem é descartado (com o seu ';') e
+        registrado como erro.
+        """
+        itens = _TABELA['itens']
+        if self._reutilizaveis:
+            node = self._reutilizaveis.get(self.pos)
+            if node is not None:
+                valores.append(node)
+                self._posicionar(node.intervalo[1])
+                return (itens,)
+            if not self.recuperar_erros:
+                producao = itens.get(self.tipo_atual)
+                return producao if producao is not None else self._sem_producao('itens')
+
+        if pilha and type(pilha[-1]) is _PontoDeRecuperacao:
+            pilha[-1].altura = len(valores)
+        else:
+            pilha.append(_PontoDeRecuperacao(len(valores)))
+
+        producao = itens.get(self.tipo_atual)
+        if producao is None:
+            return self._sem_producao('itens')
+        if producao:
+            return producao
+
+        esperado = None
+        for simbolo in reversed(pilha):
+            classe = type(simbolo)
+            if classe is str:
+                if simbolo == self.tipo_atual:
+                    return producao
+                esperado = esperado or simbolo
+            elif classe is _LinhaDaTabela and simbolo is not itens and self.tipo_atual in simbolo:
+                return producao
+        self.erros.append(self._erro_esperado(esperado))
+        self._avancar()
+        if self.tipo_atual == 'PONTO_VIRGULA':
+            self._avancar()
+        return (itens,)
+
+    def _recuperar(self, erro: SyntaxError, simbolo, pilha: list, valores: list):
+        """
+        Recuperação em modo pânico. Um terminador de bloco ausente é dado
+        como presente (junto com o seu ';'); qualquer outro erro descarta o
+        comando em análise, da pilha e dos valores, e os tokens até o
+        próximo ';' ou terminador de bloco.
+        """
+        self.erros.append(erro)
+        if type(simbolo) is str and simbolo in gramatica.TERMINADORES_DE_BLOCO:
+            if pilha and pilha[-1] == 'PONTO_VIRGULA':
+                pilha.pop()
+            return
+
+        for indice in range(len(pilha) - 1, -1, -1):
+            if type(pilha[indice]) is _PontoDeRecuperacao:
                 break
-            self._consumir('VIRGULA')
-        self._consumir('PONTO_VIRGULA')
+        else:
+            # Fora de qualquer bloco (cabeçalho do programa): supõe o
+            # terminal ausente ou segue a única produção do não terminal
+            if type(simbolo) is str:
+                return
+            if type(simbolo) is _LinhaDaTabela and len(gramatica.PRODUCOES[simbolo.nome]) == 1:
+                pilha.extend(_compilar(gramatica.PRODUCOES[simbolo.nome][0]))
+                if type(pilha[-1]) is str:
+                    pilha.pop()
+                return
+            raise erro
 
-        declaracao_node = VarDecl(tipo_node, variaveis_declaradas)
-        nodes_gerados.insert(0, declaracao_node)
+        del pilha[indice + 1:]
+        pilha.append(_TABELA['itens'])
+        del valores[pilha[indice].altura:]
+        while self.tipo_atual is not None and self.tipo_atual not in gramatica.SINCRONIZACAO:
+            tipo = self.tipo_atual
+            self._avancar()
+            if tipo == 'PONTO_VIRGULA':
+                break
 
-        return nodes_gerados
+    def _sem_producao(self, nt: str) -> tuple:
+        """ Trata o token atual fora da linha de `nt` na tabela. """
+        vazia = _PRODUCAO_VAZIA.get(nt)
+        fim_da_entrada = self.tipo_atual in (None, gramatica.FIM_DA_ENTRADA)
+        if vazia is not None and (fim_da_entrada or nt not in gramatica.MENSAGENS_DE_ERRO):
+            return vazia
+        token = self.token_atual
+        if nt in gramatica.MENSAGENS_DE_ERRO and token is not None:
+            raise SyntaxError(gramatica.MENSAGENS_DE_ERRO[nt].format(valor=token.valor, linha=token.linha))
+        raise self._erro_esperado("' ou '".join(sorted(_TABELA[nt])))
+
+    def programa(self) -> Programa:
+        programa_node, = self._analisar('programa')
+        if self.tipo_atual not in ('EOF', None):
+            erro = SyntaxError(f"Código encontrado após o 'fim' do programa na linha {self.token_atual.linha}")
+            if not self.recuperar_erros:
+                raise erro
+            self.erros.append(erro)
+        return programa_node
+
+    def bloco(self) -> Bloco:
+        return self._analisar('bloco')[0]
+
+    def declaracao_variaveis(self) -> list[ASTNode]:
+        return self._analisar('declaracao')
 
     def tipo(self) -> Tipo:
-        token = self.token_atual
-        if token.tipo in ('INTEIRO', 'REAL', 'TEXTO', 'LOGICO'):
-            self._avancar()
-            return Tipo(token)
-        raise SyntaxError(f"Tipo de variável inválido '{token.valor}' na linha {token.linha}")
+        return self._analisar('tipo')[0]
 
     def comando(self) -> ASTNode:
-        token = self.token_atual
-        comandos_com_expressao = {
-            'AVANCAR', 'RECUAR', 'GIRAR_DIREITA', 'GIRAR_ESQUERDA',
-            'DEFINIR_COR', 'DEFINIR_ESPESSURA', 'COR_DE_FUNDO', 'CIRCULO'
-        }
-        comandos_sem_expressao = {
-            'LEVANTAR_CANETA', 'ABAIXAR_CANETA', 'LIMPAR_TELA',
-            'EMPURRAR_POSICAO', 'RESTAURAR_POSICAO'
-        }
-
-        if token.tipo == 'ID': return self.atribuicao()
-        if token.tipo in comandos_com_expressao:
-            cmd_token = self._consumir(token.tipo)
-            expr = self.expressao()
-            self._consumir('PONTO_VIRGULA')
-            return ComandoSimples(cmd_token, expressao=expr)
-        if token.tipo in comandos_sem_expressao:
-            cmd_token = self._consumir(token.tipo)
-            self._consumir('PONTO_VIRGULA')
-            return ComandoSimples(cmd_token)
-        if token.tipo == 'IR_PARA': return self.comando_ir_para()
-        if token.tipo == 'REPITA': return self.estrutura_repita()
-        if token.tipo == 'SE': return self.estrutura_se()
-        if token.tipo == 'ENQUANTO': return self.estrutura_enquanto()
-
-        raise SyntaxError(f"Comando inesperado '{token.valor}' na linha {token.linha}")
-
-    def comando_ir_para(self) -> ComandoIrPara:
-        token = self._consumir('IR_PARA')
-        expr_x = self.expressao()
-        expr_y = self.expressao()
-        self._consumir('PONTO_VIRGULA')
-        return ComandoIrPara(token, expr_x, expr_y)
-
-    def atribuicao(self) -> Atribuicao:
-        var_no = Variavel(self._consumir('ID'))
-        self._consumir('ATRIBUICAO')
-        expr = self.expressao()
-        self._consumir('PONTO_VIRGULA')
-        return Atribuicao(var_no, expr)
-
-    def estrutura_repita(self) -> Repita:
-        self._consumir('REPITA')
-        vezes_expr = self.expressao()
-        self._consumir('VEZES')
-        bloco_node = self.bloco()
-        self._consumir('FIM_REPITA')
-        self._consumir('PONTO_VIRGULA')
-        return Repita(vezes_expr, bloco_node)
-
-    def estrutura_se(self) -> Se:
-        self._consumir('SE')
-        condicao = self.expressao()
-        self._consumir('ENTAO')
-        bloco_se = self.bloco()
-        bloco_senao = None
-        if self.token_atual.tipo == 'SENAO':
-            self._consumir('SENAO')
-            bloco_senao = self.bloco()
-        self._consumir('FIM_SE')
-        self._consumir('PONTO_VIRGULA')
-        return Se(condicao, bloco_se, bloco_senao)
-
-    def estrutura_enquanto(self) -> Enquanto:
-        self._consumir('ENQUANTO')
-        condicao = self.expressao()
-        self._consumir('FACA')
-        bloco = self.bloco()
-        self._consumir('FIM_ENQUANTO')
-        self._consumir('PONTO_VIRGULA')
-        return Enquanto(condicao, bloco)
+        return self._analisar('comando')[0]
 
     def expressao(self) -> ASTNode:
-        node = self.expressao_soma()
-        if self.token_atual and self.token_atual.tipo == 'OP_RELACIONAL':
-            op = self.token_atual
-            self._avancar()
-            dir = self.expressao_soma()
-            node = BinOp(esq=node, op=op, dir=dir)
-        return node
-
-    def expressao_soma(self) -> ASTNode:
-        node = self.termo()
-        while self.token_atual and self.token_atual.tipo == 'OP_ARITMETICO':
-            op = self.token_atual
-            self._avancar()
-            dir = self.termo()
-            node = BinOp(esq=node, op=op, dir=dir)
-        return node
-
-    def termo(self) -> ASTNode:
-        node = self.fator()
-        while self.token_atual and self.token_atual.valor in ('*', '/'):
-            op = self.token_atual
-            self._avancar()
-            dir = self.fator()
-            node = BinOp(esq=node, op=op, dir=dir)
-        return node
+        """
+        Analisa uma expressão por precedência de operadores (estilo Pratt),
+        com pilhas explícitas de operandos e operadores em vez de um método
+        recursivo por nível de precedência. Equivale à gramática
 
-    def fator(self) -> ASTNode:
-        token = self.token_atual
-        if token.tipo == 'OP_ARITMETICO' and token.valor in ('+', '-'):
-            op_token = self.token_atual
-            self._avancar()
-            node = self.fator()
-            return UnaryOp(op=op_token, expr=node)
+            expressao -> soma (OP_RELACIONAL soma)?
+            soma      -> termo (('+' | '-' | '%') termo)*
+            termo     -> fator (('*' | '/') fator)*
+            fator     -> ('+' | '-') fator | literal | ID | '(' expressao ')'
 
-        if token.tipo in ('NUMERO_INTEIRO', 'NUMERO_REAL', 'TEXTO', 'VERDADEIRO', 'FALSO'):
-            self._avancar()
-            return Literal(token)
-        elif token.tipo == 'ID':
-            self._avancar()
-            return Variavel(token)
-        elif token.tipo == 'PARENTESES' and token.valor == '(':
-            self._avancar()
-            node = self.expressao()
-            if self.token_atual and self.token_atual.tipo == 'PARENTESES' and self.token_atual.valor == ')':
-                self._avancar() 
+        mas usa pilha Python constante, qualquer que seja o aninhamento.
+        """
+        operandos = []
+        # Operadores pendentes: (poder, token, unario), ou None marcando um '('
+        operadores = []
+        # Para cada nível de parênteses, se o operador relacional já foi usado
+        relacional_usado = [False]
+        esperando_operando = True
+        avancar = self._avancar
+        novo_literal, nova_variavel, novo_unario, novo_binario = self._construtores
+
+        while True:
+            tipo = self.tipo_atual
+            if esperando_operando:
+                token = self._token or self.token_atual
+                if tipo in _TIPOS_LITERAIS:
+                    operandos.append(novo_literal(token))
+                    esperando_operando = False
+                elif tipo == 'ID':
+                    operandos.append(nova_variavel(token))
+                    esperando_operando = False
+                elif tipo == 'OP_ARITMETICO' and token.valor in ('+', '-'):
+                    operadores.append((_PODER_PREFIXO, token, True))
+                elif tipo == 'PARENTESES' and token.valor == '(':
+                    operadores.append(None)
+                    relacional_usado.append(False)
+                else:
+                    raise SyntaxError(f"Fator inesperado na expressão: '{token.valor}' na linha {token.linha}")
+                avancar()
+                continue
+
+            if tipo == 'OP_ARITMETICO' or (tipo == 'OP_RELACIONAL' and not relacional_usado[-1]):
+                token = self._token or self.token_atual
+                poder = _PODER_BINARIO[token.valor]
+            elif tipo == 'PARENTESES' and len(relacional_usado) > 1 and self.valor_atual == ')':
+                token = None
+                poder = 0
             else:
-                valor_encontrado = self.token_atual.valor if self.token_atual else 'EOF'
-                raise SyntaxError(f"Erro de Sintaxe na linha {self.token_atual.linha}: Esperado ')' mas encontrou '{valor_encontrado}'")
-            return node
-        else:
-            raise SyntaxError(f"Fator inesperado na expressão: '{token.valor}' na linha {token.linha}")
+                break
+
+            # Reduz os operadores pendentes que ligam pelo menos tão forte
+            # (um ')' reduz tudo até o '(' correspondente)
+            while operadores:
+                topo = operadores[-1]
+                if topo is None or topo[0] < poder:
+                    break
+                operadores.pop()
+                if topo[2]:
+                    operandos[-1] = novo_unario(topo[1], operandos[-1])
+                else:
+                    dir = operandos.pop()
+                    operandos[-1] = novo_binario(operandos[-1], topo[1], dir)
+
+            if token is None:
+                operadores.pop()
+                relacional_usado.pop()
+            else:
+                if tipo == 'OP_RELACIONAL':
+                    relacional_usado[-1] = True
+                operadores.append((poder, token, False))
+                esperando_operando = True
+            avancar()
+
+        if len(relacional_usado) > 1:
+            valor_encontrado = self.valor_atual if self.tipo_atual else 'EOF'
+            raise SyntaxError(f"Erro de Sintaxe na linha {self.token_atual.linha}: Esperado ')' mas encontrou '{valor_encontrado}'")
+        while operadores:
+            _, op, unario = operadores.pop()
+            if unario:
+                operandos[-1] = novo_unario(op, operandos[-1])
+            else:
+                dir = operandos.pop()
+                operandos[-1] = novo_binario(operandos[-1], op, dir)
+        return operandos[0]
+
+
+def _filhos_com_intervalo(node: ASTNode):
+    """ (contêiner, chave, filho) para os filhos de `node` que têm intervalo. """
+    if isinstance(node, Bloco):
+        for indice, comando in enumerate(node.comandos):
+            if comando.intervalo is not None:
+                yield node.comandos, indice, comando
+    elif isinstance(node, Se):
+        yield node, 'bloco_se', node.bloco_se
+        if node.bloco_senao is not None:
+            yield node, 'bloco_senao', node.bloco_senao
+    elif isinstance(node, (Repita, Enquanto)):
+        yield node, 'bloco', node.bloco
+
+def _deslocar(node: ASTNode, deslocamento: int):
+    """ Soma `deslocamento` aos intervalos de `node` e de todos os seus descendentes. """
+    pendentes = [node]
+    while pendentes:
+        node = pendentes.pop()
+        inicio, fim = node.intervalo
+        node.intervalo = (inicio + deslocamento, fim + deslocamento)
+        pendentes.extend(filho for _, _, filho in _filhos_com_intervalo(node))
+
+def _deslocar_linhas(node: ASTNode, linhas: int):
+    """
+    Soma `linhas` à linha de todos os tokens de `node` e de seus descendentes.
+    Os nós mutáveis são alterados no lugar; os imutáveis (tipos e expressões)
+    são recriados, como no otimizador.
+    """
+    novos = {}  # id do nó imutável antigo -> (antigo, novo)
+
+    def deslocado(valor):
+        if isinstance(valor, Token):
+            return valor._replace(linha=valor.linha + linhas)
+        if isinstance(valor, NoImutavel):
+            return novos[id(valor)][1]
+        return valor
+
+    # Pós-ordem com pilha explícita: um nó é refeito depois dos filhos
+    pendentes = [(node, False)]
+    while pendentes:
+        atual, filhos_prontos = pendentes.pop()
+        if isinstance(atual, list):
+            if filhos_prontos:
+                atual[:] = map(deslocado, atual)
+            else:
+                pendentes.append((atual, True))
+                pendentes.extend((item, False) for item in atual)
+        elif isinstance(atual, ASTNode):
+            if not filhos_prontos:
+                if id(atual) not in novos:
+                    pendentes.append((atual, True))
+                    pendentes.extend((getattr(atual, campo), False) for campo in atual._campos)
+            elif isinstance(atual, NoImutavel):
+                novos[id(atual)] = (atual, type(atual)(*map(deslocado, (getattr(atual, c) for c in atual._campos))))
+            else:
+                for campo in atual._campos:
+                    setattr(atual, campo, deslocado(getattr(atual, campo)))
+
+def reanalisar(arvore: Programa, buffer: TokenBuffer) -> Programa:
+    """
+    Atualiza a AST de um programa após uma edição, reanalisando apenas o
+    menor bloco ou estrutura repita/se/enquanto que cobre a alteração.
+
+    `buffer` é o resultado de `relexar` sobre o buffer que gerou `arvore`:
+    `buffer.alteracao` diz quais tokens mudaram. Os intervalos dos nós
+    posteriores à edição são deslocados, o nó que a cobre é reanalisado e
+    substituído, e as estruturas intactas dentro dele são reaproveitadas
+    (mesma identidade) em vez de analisadas de novo. Se a reanálise não
+    fecha no mesmo ponto, tenta-se o nó que envolve o anterior.
+
+    A árvore recebida é atualizada no lugar e devolvida. Quando a edição
+    desloca linhas (`buffer.deslocamento_linhas`), os tokens dos nós
+    posteriores a ela que ficam na árvore recebem a linha nova.
+    """
+    raiz = arvore.bloco
+    if buffer.alteracao is None or raiz.intervalo is None:
+        return Parser(buffer).parse()
+    primeiro, fim_antigo, fim_novo = buffer.alteracao
+    deslocamento = fim_novo - fim_antigo
+    linhas = buffer.deslocamento_linhas
+
+    def contem_alteracao(node: ASTNode) -> bool:
+        inicio, fim = node.intervalo
+        if isinstance(node, Bloco):
+            # Os delimitadores de um bloco ficam fora do seu intervalo
+            return inicio <= primeiro and fim_antigo <= fim
+        return inicio < primeiro and fim_antigo < fim
+
+    if not contem_alteracao(raiz):
+        return Parser(buffer).parse()
+
+    # Percorre os nós que cobrem ou cruzam a alteração: os que a contêm formam
+    # o caminho de candidatos; os anteriores e posteriores são reaproveitáveis.
+    reutilizaveis = {}
+    caminho = [(arvore, 'bloco', raiz)]
+    raiz.intervalo = (raiz.intervalo[0], raiz.intervalo[1] + deslocamento)
+    pendentes = [raiz]
+    while pendentes:
+        for conteiner, chave, filho in _filhos_com_intervalo(pendentes.pop()):
+            inicio, fim = filho.intervalo
+            if contem_alteracao(filho):
+                filho.intervalo = (inicio, fim + deslocamento)
+                caminho.append((conteiner, chave, filho))
+                pendentes.append(filho)
+                continue
+            if inicio >= fim_antigo:
+                if deslocamento:
+                    _deslocar(filho, deslocamento)
+                if linhas:
+                    _deslocar_linhas(filho, linhas)
+            elif fim > primeiro:
+                # Cruza a alteração: será reanalisado, mas partes dele podem
+                # ser reaproveitadas
+                pendentes.append(filho)
+                continue
+            estruturas = filho.comandos if isinstance(filho, Bloco) else [filho]
+            for estrutura in estruturas:
+                if estrutura.intervalo is not None:
+                    reutilizaveis[estrutura.intervalo[0]] = estrutura
+
+    for nivel in range(len(caminho) - 1, -1, -1):
+        conteiner, chave, alvo = caminho[nivel]
+        inicio, fim = alvo.intervalo
+        parser = Parser(buffer)
+        parser._reutilizaveis = reutilizaveis
+        parser._posicionar(inicio)
+        try:
+            valores = parser._analisar('bloco' if isinstance(alvo, Bloco) else 'comando')
+        except SyntaxError:
+            continue
+        if parser.pos == fim and len(valores) == 1:
+            if isinstance(chave, int):
+                conteiner[chave] = valores[0]
+            else:
+                setattr(conteiner, chave, valores[0])
+            if linhas:
+                # Nos blocos que envolvem o nó reanalisado, os comandos simples
+                # depois dele (as estruturas já foram deslocadas acima)
+                for conteiner, chave, _ in caminho[1:nivel + 1]:
+                    if isinstance(chave, int):
+                        for comando in conteiner[chave + 1:]:
+                            if comando.intervalo is None:
+                                _deslocar_linhas(comando, linhas)
+            return arvore
+    return Parser(buffer).parse()
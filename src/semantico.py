@@ -1,31 +1,44 @@
 from src.ast_nodes import *
+from src.visitor import Visitor
+
+class Simbolo:
+    """ Uma variável declarada: nome, tipo e linha da declaração. """
+    __slots__ = ('nome', 'tipo', 'linha')
+
+    def __init__(self, nome, tipo, linha):
+        self.nome = nome
+        self.tipo = tipo
+        self.linha = linha
+
+    def __repr__(self):
+        return f"Simbolo(nome={self.nome!r}, tipo={self.tipo!r}, linha={self.linha!r})"
 
 class TabelaSimbolos:
     """ Armazena informações sobre as variáveis (símbolos), como seu tipo. """
     def __init__(self):
         self._simbolos = {}
 
-    def declarar(self, nome_var, tipo_var, linha):
+    def declarar(self, nome_var, tipo_var, linha) -> Simbolo:
         if nome_var in self._simbolos:
             raise NameError(f"Erro Semântico na linha {linha}: Variável '{nome_var}' já declarada.")
-        self._simbolos[nome_var] = tipo_var
+        simbolo = self._simbolos[nome_var] = Simbolo(nome_var, tipo_var, linha)
+        return simbolo
 
-    def buscar(self, nome_var, linha):
+    def resolver(self, nome_var, linha) -> Simbolo:
         if nome_var not in self._simbolos:
             raise NameError(f"Erro Semântico na linha {linha}: Variável '{nome_var}' não foi declarada.")
         return self._simbolos[nome_var]
 
-class Visitor:
-    """ Classe base para o padrão Visitor. """
-    def visit(self, node):
-        method_name = f'visit_{node.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node):
-        raise NotImplementedError(f"O método visit_{node.__class__.__name__} não foi implementado.")
+    def buscar(self, nome_var, linha):
+        return self.resolver(nome_var, linha).tipo
 
 class AnalisadorSemantico(Visitor):
+    """
+    Verifica declarações e tipos. Além de devolver o tipo de cada expressão
+    visitada, anota-o no nó (`tipo_inferido`), e anota em cada Variavel o
+    `Simbolo` a que ela se refere, para que a geração de código e as
+    otimizações usem essas informações sem refazer a inferência.
+    """
     def __init__(self):
         self.tabela_simbolos = TabelaSimbolos()
         # --- ATUALIZE ESTE DICIONÁRIO ---
@@ -41,26 +54,36 @@ class AnalisadorSemantico(Visitor):
         }
 
     def visit_Programa(self, node: Programa):
-        self.visit(node.bloco)
+        yield node.bloco
 
     def visit_Bloco(self, node: Bloco):
         for declaracao in node.declaracoes:
-            self.visit(declaracao)
+            yield declaracao
         for comando in node.comandos:
-            self.visit(comando)
+            yield comando
+
+    # As verificações ficam em métodos próprios, que recebem os tipos já
+    # calculados dos filhos, para serem reaproveitadas pela compilação em
+    # passada única (compilador.py).
 
     def visit_VarDecl(self, node: VarDecl):
         tipo_var = node.tipo_no.valor
         for var_node in node.var_nos:
             nome_var = var_node.nome
-            self.tabela_simbolos.declarar(nome_var, tipo_var, var_node.token.linha)
+            var_node.simbolo = self.tabela_simbolos.declarar(nome_var, tipo_var, var_node.token.linha)
+            var_node.tipo_inferido = tipo_var
 
     def visit_Atribuicao(self, node: Atribuicao):
+        tipo_declarado = self._tipo_declarado(node)
+        tipo_expressao = yield node.expressao
+        self._verificar_atribuicao(node, tipo_declarado, tipo_expressao)
+
+    def _tipo_declarado(self, node: Atribuicao):
+        return self._tipo_variavel(node.var_no)
+
+    def _verificar_atribuicao(self, node: Atribuicao, tipo_declarado, tipo_expressao):
         nome_var = node.var_no.nome
         linha = node.var_no.token.linha
-        tipo_declarado = self.tabela_simbolos.buscar(nome_var, linha)
-        tipo_expressao = self.visit(node.expressao)
-
         # Regra especial: permite atribuir inteiro a real, mas não o contrário
         if tipo_declarado == 'real' and tipo_expressao == 'inteiro':
             pass # Isso é permitido (promoção de tipo)
@@ -71,11 +94,20 @@ class AnalisadorSemantico(Visitor):
             )
 
     def visit_Variavel(self, node: Variavel):
+        return self._tipo_variavel(node)
+
+    def _tipo_variavel(self, node: Variavel):
         nome_var = node.nome
         linha = node.token.linha
-        return self.tabela_simbolos.buscar(nome_var, linha)
+        simbolo = node.simbolo = self.tabela_simbolos.resolver(nome_var, linha)
+        node.tipo_inferido = simbolo.tipo
+        return simbolo.tipo
 
     def visit_Literal(self, node: Literal):
+        node.tipo_inferido = tipo = self._tipo_literal(node)
+        return tipo
+
+    def _tipo_literal(self, node: Literal):
         if node.token.tipo == 'NUMERO_INTEIRO': return 'inteiro'
         if node.token.tipo == 'NUMERO_REAL': return 'real'
         if node.token.tipo == 'TEXTO': return 'texto'
@@ -83,18 +115,28 @@ class AnalisadorSemantico(Visitor):
         return 'desconhecido'
 
     def visit_UnaryOp(self, node: UnaryOp):
+        tipo_expr = yield node.expr
+        return self._tipo_unario(node, tipo_expr)
+
+    def _tipo_unario(self, node: UnaryOp, tipo_expr):
         linha = node.op.linha
-        tipo_expr = self.visit(node.expr)
         if tipo_expr not in ('inteiro', 'real'):
             raise TypeError(f"Erro Semântico na linha {linha}: O operador unário '{node.op.valor} só pode \
                             ser aplicado a tipos numéricos (inteiro/real), mas foi aplicado a '{tipo_expr}'.")
+        node.tipo_inferido = tipo_expr
         return tipo_expr
 
     def visit_BinOp(self, node: BinOp):
-        linha = node.op.linha
-        tipo_esq = self.visit(node.esq)
-        tipo_dir = self.visit(node.dir)
+        tipo_esq = yield node.esq
+        tipo_dir = yield node.dir
+        return self._tipo_binario(node, tipo_esq, tipo_dir)
 
+    def _tipo_binario(self, node: BinOp, tipo_esq, tipo_dir):
+        node.tipo_inferido = tipo = self._inferir_binario(node, tipo_esq, tipo_dir)
+        return tipo
+
+    def _inferir_binario(self, node: BinOp, tipo_esq, tipo_dir):
+        linha = node.op.linha
         op_logicos = ['==', '!=', '<', '>', '<=', '>=']
         if node.op.valor in op_logicos:
             if tipo_esq != tipo_dir:
@@ -111,22 +153,27 @@ class AnalisadorSemantico(Visitor):
         return tipo_esq
 
     def visit_Repita(self, node: Repita):
+        self._verificar_repita(node)
+        yield node.bloco
+
+    def _verificar_repita(self, node: Repita):
         linha = node.vezes.token.linha if hasattr(node.vezes, 'token') else 'desconhecida'
         if not isinstance(node.vezes, Literal) or node.vezes.token.tipo != 'NUMERO_INTEIRO':
             raise TypeError(f"Erro Semântico na linha {linha}: O comando 'repita' espera um número inteiro \
                             literal como argumento.")
-        self.visit(node.bloco)
 
     def visit_ComandoSimples(self, node: ComandoSimples):
-        linha = node.token.linha
-        comando = node.token.tipo
-
         # Comandos que não têm argumento
         if not node.expressao:
             return
 
         # Comandos que têm argumento
-        tipo_argumento = self.visit(node.expressao)
+        tipo_argumento = yield node.expressao
+        self._verificar_argumento(node, tipo_argumento)
+
+    def _verificar_argumento(self, node: ComandoSimples, tipo_argumento):
+        linha = node.token.linha
+        comando = node.token.tipo
         tipos_esperados = self.regras_comandos.get(comando)
 
         if tipos_esperados and tipo_argumento not in tipos_esperados:
@@ -134,26 +181,30 @@ class AnalisadorSemantico(Visitor):
                             um argumento do tipo '{' ou '.join(tipos_esperados)}', mas recebeu '{tipo_argumento}'.")
 
     def visit_ComandoIrPara(self, node: ComandoIrPara):
+        tipo_x = yield node.expr_x
+        tipo_y = yield node.expr_y
+        self._verificar_ir_para(node, tipo_x, tipo_y)
+
+    def _verificar_ir_para(self, node: ComandoIrPara, tipo_x, tipo_y):
         linha = node.token.linha
-        tipo_x = self.visit(node.expr_x)
-        tipo_y = self.visit(node.expr_y)
         tipos_validos = ['inteiro', 'real']
         if tipo_x not in tipos_validos or tipo_y not in tipos_validos:
             raise TypeError(f"Erro Semântico na linha {linha}: O comando 'ir_para' espera dois \
                             argumentos numéricos (inteiro/real).")
 
     def visit_Se(self, node: Se):
-        tipo_condicao = self.visit(node.condicao)
-        if tipo_condicao != 'logico':
-            raise TypeError(f"Erro Semântico: A condição da estrutura 'se' deve ser do tipo 'logico', \
-                            mas é '{tipo_condicao}'.")
-        self.visit(node.bloco_se)
+        tipo_condicao = yield node.condicao
+        self._verificar_condicao('se', tipo_condicao)
+        yield node.bloco_se
         if node.bloco_senao:
-            self.visit(node.bloco_senao)
+            yield node.bloco_senao
 
     def visit_Enquanto(self, node: Enquanto):
-        tipo_condicao = self.visit(node.condicao)
+        tipo_condicao = yield node.condicao
+        self._verificar_condicao('enquanto', tipo_condicao)
+        yield node.bloco
+
+    def _verificar_condicao(self, estrutura, tipo_condicao):
         if tipo_condicao != 'logico':
-            raise TypeError(f"Erro Semântico: A condição da estrutura 'enquanto' deve ser do tipo 'logico', \
+            raise TypeError(f"Erro Semântico: A condição da estrutura '{estrutura}' deve ser do tipo 'logico', \
                             mas é '{tipo_condicao}'.")
-        self.visit(node.bloco)
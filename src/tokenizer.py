@@ -1,5 +1,11 @@
+import mmap
+import os
 import re
-from typing import List, NamedTuple, Pattern
+import sys
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
 
 class Token(NamedTuple):
     """
@@ -9,65 +15,447 @@ class Token(NamedTuple):
     valor: str
     linha: int
 
-def tokenizar(codigo_fonte: str) -> List[Token]:
+# --- Tabelas do analisador léxico (construídas uma única vez) ---
+
+PALAVRAS_CHAVE: Dict[str, str] = {
+    palavra: palavra.upper() for palavra in (
+        'inicio', 'fim', 'var', 'inteiro', 'real', 'texto', 'logico', 'verdadeiro', 'falso',
+        'repita', 'vezes', 'fim_repita', 'enquanto', 'faca', 'fim_enquanto', 'se', 'entao',
+        'senao', 'fim_se', 'avancar', 'recuar', 'girar_direita', 'girar_esquerda',
+        'ir_para', 'levantar_caneta', 'abaixar_caneta', 'definir_cor', 'definir_espessura',
+        'cor_de_fundo', 'limpar_tela', 'circulo', 'empurrar_posicao', 'restaurar_posicao'
+    )
+}
+
+# Códigos numéricos dos tipos de token, usados pelo armazenamento compacto (TokenBuffer)
+TIPOS_TOKEN: Tuple[str, ...] = (
+    'EOF', 'ID', 'NUMERO_INTEIRO', 'NUMERO_REAL', 'TEXTO', 'OP_ARITMETICO', 'OP_RELACIONAL',
+    'ATRIBUICAO', 'PONTO_VIRGULA', 'DOIS_PONTOS', 'VIRGULA', 'PARENTESES',
+) + tuple(PALAVRAS_CHAVE.values())
+CODIGOS_TIPO: Dict[str, int] = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+
+# Classes de caractere usadas para despachar o primeiro caractere de cada token.
+# As tabelas são indexadas tanto pelo caractere (fonte `str`) quanto pelo valor
+# do byte (fonte `bytes`/`mmap`/`memoryview`, cujos elementos são inteiros).
+_ESPACO, _NOVA_LINHA, _LETRA, _DIGITO, _SINAL, _BARRA, _ASPAS, _SIMBOLO, _RELACIONAL, _INVALIDO = range(10)
+
+_CLASSES: Dict[Union[str, int], int] = {}
+
+def _classificar(caracteres: str, classe: int):
+    for c in caracteres:
+        _CLASSES[c] = classe
+        _CLASSES[ord(c)] = classe
+
+_classificar(' \t\r', _ESPACO)
+_classificar('\n', _NOVA_LINHA)
+_classificar('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_', _LETRA)
+_classificar('0123456789', _DIGITO)
+_classificar('+-', _SINAL)
+_classificar('/', _BARRA)
+_classificar('"', _ASPAS)
+_classificar('<>=!', _RELACIONAL)
+
+# Tokens de um único caractere que não dependem do caractere seguinte
+_SIMBOLOS: Dict[Union[str, int], Tuple[str, str]] = {}
+for _c, _tipo in ((';', 'PONTO_VIRGULA'), (':', 'DOIS_PONTOS'), (',', 'VIRGULA'),
+                  ('(', 'PARENTESES'), (')', 'PARENTESES'),
+                  ('*', 'OP_ARITMETICO'), ('%', 'OP_ARITMETICO')):
+    _SIMBOLOS[_c] = _SIMBOLOS[ord(_c)] = (_tipo, _c)
+_classificar(';:,()*%', _SIMBOLO)
+
+# Lexema dos caracteres cujo valor não precisa ser recortado da fonte
+_LEXEMAS: Dict[Union[str, int], str] = {}
+for _c in '+-/<>=!':
+    _LEXEMAS[_c] = _LEXEMAS[ord(_c)] = _c
+_IGUAL = ('=', ord('='))
+_BARRA_DUPLA = ('/', ord('/'))
+
+# Restante de um identificador e corpo de um número (o sinal é tratado à parte).
+# Na versão em bytes, a expressão só delimita a sequência candidata: se ela tem
+# bytes >= 0x80, o lexema é decodificado e recortado com o `\w` Unicode da versão
+# em `str` (`_identificador_unicode`), para as duas darem os mesmos tokens.
+# Números só têm dígitos ASCII: o `\d` de uma `str` aceitaria outros dígitos
+# Unicode, que a versão em bytes rejeita.
+_RESTO_ID: Pattern[str] = re.compile(r'\w*')
+_NUMERO: Pattern[str] = re.compile(r'[0-9]+(\.[0-9]+)?')
+_RESTO_ID_BYTES: Pattern[bytes] = re.compile(rb'[\w\x80-\xff]*')
+_NUMERO_BYTES: Pattern[bytes] = re.compile(rb'[0-9]+(\.[0-9]+)?')
+_ATE_BYTES: Dict[bytes, Pattern[bytes]] = {b'\n': re.compile(rb'\n'), b'"': re.compile(rb'"')}
+
+Fonte = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+def _localizador(fonte: Fonte) -> Callable:
+    """ Retorna um `find(alvo, inicio)` para a fonte, inclusive para `memoryview`. """
+    if hasattr(fonte, 'find'):
+        return fonte.find
+    def localizar(alvo, inicio):
+        match = _ATE_BYTES[alvo].search(fonte, inicio)
+        return match.start() if match else -1
+    return localizar
+
+def _caractere_em(fonte: Fonte, pos: int) -> str:
+    """ Decodifica o caractere que começa em `pos`, para mensagens de erro. """
+    if isinstance(fonte, str):
+        return fonte[pos]
+    return str(bytes(fonte[pos:pos + 4]), 'utf-8', 'replace')[0]
+
+def _erro_lexico(fonte: Fonte, pos: int, numero_linha: int) -> SyntaxError:
+    return SyntaxError(
+        f"Erro Léxico na linha {numero_linha}: Caractere inválido '{_caractere_em(fonte, pos)}' não reconhecido."
+    )
+
+def _erro_codificacao(numero_linha: int) -> SyntaxError:
+    return SyntaxError(f"Erro Léxico na linha {numero_linha}: Sequência de bytes inválida em UTF-8.")
+
+def _decodificar(lexema: bytes, numero_linha: int) -> str:
+    """ Decodifica um lexema UTF-8; bytes inválidos são um erro léxico. """
+    try:
+        return str(lexema, 'utf-8')
+    except UnicodeDecodeError:
+        raise _erro_codificacao(numero_linha) from None
+
+def _identificador_unicode(lexema: bytes, inicio: int, numero_linha: int) -> Tuple[str, int]:
+    """
+    O identificador (e a posição do seu fim) no começo de uma sequência de
+    bytes com caracteres não ASCII, cortado no primeiro caractere que não é
+    `\\w`, como na versão em `str`; esse caractere é então rejeitado pelo
+    scanner como inválido.
+    """
+    texto = _decodificar(lexema, numero_linha)
+    fim = _RESTO_ID.match(texto, 1).end()
+    if fim < len(texto):
+        texto = texto[:fim]
+        return texto, inicio + len(texto.encode('utf-8'))
+    return texto, inicio + len(lexema)
+
+@contextmanager
+def abrir_codigo_fonte(caminho: str) -> Iterator[Fonte]:
+    """
+    Mapeia um arquivo de código-fonte em memória (somente leitura), para que
+    `gerar_tokens` o percorra byte a byte sem uma cópia decodificada inteira.
+    """
+    with open(caminho, 'rb') as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            # mmap não aceita arquivos vazios
+            yield b''
+            return
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            yield mapa
+
+class TokenBuffer:
+    """
+    Armazena os tokens de uma fonte em arrays paralelos (struct-of-arrays):
+    o tipo como código de um byte e a posição, o tamanho e a linha do lexema
+    como inteiros de 32 bits. Os valores são recortados da fonte sob demanda,
+    então a fonte (inclusive um `mmap`) precisa continuar aberta enquanto o
+    buffer for usado.
+
+    O acesso por índice (`buffer[i]`) produz uma visão `Token` do token i,
+    útil em mensagens de erro e testes; o parser lê `tipo(i)` diretamente.
+    """
+    def __init__(self, codigo_fonte: Fonte):
+        self.fonte = codigo_fonte
+        self.tipos = array('B')
+        self.inicios = array('I')
+        self.tamanhos = array('I')
+        self.linhas = array('I')
+        self._binario = not isinstance(codigo_fonte, str)
+        # Preenchido por `relexar`: (primeiro, fim_antigo, fim_novo) indica que os
+        # tokens [primeiro, fim_antigo) do buffer anterior viraram [primeiro, fim_novo)
+        self.alteracao: Optional[Tuple[int, int, int]] = None
+        # Também preenchido por `relexar`: quantas linhas os tokens posteriores
+        # à alteração se deslocaram
+        self.deslocamento_linhas = 0
+        # Números de linha já usados em `Token`s, para que os tokens de uma
+        # mesma linha compartilhem o mesmo objeto int
+        self._linhas_compartilhadas: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.tipos)
+
+    def tipo(self, indice: int) -> str:
+        return TIPOS_TOKEN[self.tipos[indice]]
+
+    def valor(self, indice: int) -> str:
+        inicio = self.inicios[indice]
+        lexema = self.fonte[inicio:inicio + self.tamanhos[indice]]
+        return str(lexema, 'utf-8') if self._binario else lexema
+
+    def linha(self, indice: int) -> int:
+        return self.linhas[indice]
+
+    def __getitem__(self, indice: int) -> Token:
+        if indice < 0:
+            indice += len(self)
+        linha = self.linhas[indice]
+        linha = self._linhas_compartilhadas.setdefault(linha, linha)
+        return Token(self.tipo(indice), sys.intern(self.valor(indice)), linha)
+
+    def __iter__(self) -> Iterator[Token]:
+        for indice in range(len(self)):
+            yield self[indice]
+
+    def _anexar(self, tokens_brutos: Iterator[Tuple[str, int, int, int, Optional[str]]]):
+        """ Acrescenta ao buffer as tuplas produzidas por `_varrer`. """
+        codigos = CODIGOS_TIPO
+        anexar_tipo = self.tipos.append
+        anexar_inicio = self.inicios.append
+        anexar_tamanho = self.tamanhos.append
+        anexar_linha = self.linhas.append
+        for tipo, inicio, fim, numero_linha, _ in tokens_brutos:
+            anexar_tipo(codigos[tipo])
+            anexar_inicio(inicio)
+            anexar_tamanho(fim - inicio)
+            anexar_linha(numero_linha)
+
+def tokenizar_em_buffer(codigo_fonte: Fonte) -> TokenBuffer:
+    """
+    Variante compacta de `tokenizar`: guarda os tokens em um `TokenBuffer`
+    em vez de uma lista de `Token`, sem criar um objeto por token.
+
+    Args:
+        codigo_fonte: O código em TurtleScript, como `str` ou como bytes UTF-8.
+
+    Returns:
+        Um TokenBuffer, terminado pelo token EOF.
+    """
+    buffer = TokenBuffer(codigo_fonte)
+    buffer._anexar(_varrer(codigo_fonte))
+    return buffer
+
+# Quantos caracteres além do fim de um token o scanner pode ler para decidir
+# onde ele termina (no pior caso, o '.' e o dígito da parte fracionária).
+_ALCANCE_SCANNER = 2
+
+def relexar(buffer: TokenBuffer, inicio: int, removidos: int, inseridos: str) -> TokenBuffer:
+    """
+    Atualiza a tokenização após uma edição sem varrer o arquivo inteiro.
+
+    A varredura recomeça no fim do último token que a edição não pode ter
+    afetado e segue até produzir um token que começa, já deslocado, na mesma
+    posição de um token antigo posterior à edição: dali em diante o scanner
+    veria exatamente o mesmo texto, então os tokens restantes são copiados
+    com posições e linhas deslocadas, sem nova varredura.
+
+    Args:
+        buffer: O TokenBuffer da versão anterior da fonte.
+        inicio: Posição da edição (em caracteres para `str`, em bytes caso contrário).
+        removidos: Quantidade de caracteres (ou bytes) removidos a partir de `inicio`.
+        inseridos: Texto inserido em `inicio`.
+
+    Returns:
+        Um novo TokenBuffer sobre a fonte editada, com `alteracao` preenchido.
+    """
+    fonte = buffer.fonte
+    if isinstance(fonte, str):
+        fonte_nova = fonte[:inicio] + inseridos + fonte[inicio + removidos:]
+    else:
+        inseridos = inseridos.encode('utf-8')
+        fonte_nova = bytes(fonte[:inicio]) + inseridos + bytes(fonte[inicio + removidos:])
+    deslocamento = len(inseridos) - removidos
+    fim_edicao = inicio + len(inseridos)
+
+    tipos, inicios, tamanhos, linhas = buffer.tipos, buffer.inicios, buffer.tamanhos, buffer.linhas
+
+    # Último token que termina longe o bastante da edição para não ter sido afetado
+    seguro = bisect_right(inicios, inicio) - 1
+    while seguro >= 0 and inicios[seguro] + tamanhos[seguro] + _ALCANCE_SCANNER > inicio:
+        seguro -= 1
+    if seguro >= 0:
+        pos, numero_linha = inicios[seguro] + tamanhos[seguro], linhas[seguro]
+    else:
+        pos, numero_linha = 0, 1
+
+    novo = TokenBuffer(fonte_nova)
+    novo.tipos = tipos[:seguro + 1]
+    novo.inicios = inicios[:seguro + 1]
+    novo.tamanhos = tamanhos[:seguro + 1]
+    novo.linhas = linhas[:seguro + 1]
+
+    codigos = CODIGOS_TIPO
+    antigo = seguro + 1
+    total_antigo = len(tipos)
+    for tipo, inicio_token, fim_token, linha_token, _ in _varrer(fonte_nova, pos, numero_linha):
+        if inicio_token >= fim_edicao:
+            # Procura um token antigo que comece no mesmo ponto do texto inalterado
+            inicio_antigo = inicio_token - deslocamento
+            while antigo < total_antigo and inicios[antigo] < inicio_antigo:
+                antigo += 1
+            if antigo < total_antigo and inicios[antigo] == inicio_antigo:
+                break
+        novo.tipos.append(codigos[tipo])
+        novo.inicios.append(inicio_token)
+        novo.tamanhos.append(fim_token - inicio_token)
+        novo.linhas.append(linha_token)
+    else:
+        antigo = total_antigo
+
+    fim_novo = len(novo.tipos)
+    if antigo < total_antigo:
+        # Sincronizado: copia o restante deslocando posições e linhas
+        deslocamento_linhas = linha_token - linhas[antigo]
+        novo.tipos.extend(tipos[antigo:])
+        novo.tamanhos.extend(tamanhos[antigo:])
+        if deslocamento:
+            novo.inicios.extend(array('I', [p + deslocamento for p in inicios[antigo:]]))
+        else:
+            novo.inicios.extend(inicios[antigo:])
+        if deslocamento_linhas:
+            novo.linhas.extend(array('I', [l + deslocamento_linhas for l in linhas[antigo:]]))
+        else:
+            novo.linhas.extend(linhas[antigo:])
+        novo.deslocamento_linhas = deslocamento_linhas
+
+    novo.alteracao = (seguro + 1, antigo, fim_novo)
+    return novo
+
+def tokenizar(codigo_fonte: Fonte) -> List[Token]:
     """
     Função principal que transforma o código-fonte em uma lista de tokens.
 
     Args:
-        codigo_fonte: O código em TurtleScript como uma string.
+        codigo_fonte: O código em TurtleScript, como `str` ou como bytes UTF-8.
 
     Returns:
         Uma lista de Tokens.
     """
+    return list(gerar_tokens(codigo_fonte))
 
-    # A ordem é importante, pois algumas regras podem ter prefixos em comum.
-    especificacao_tokens = [
-        ('COMENTARIO',      r'//.*'),                  
-        ('NUMERO_REAL',     r'[+-]?\d+\.\d+'),         
-        ('NUMERO_INTEIRO',  r'[+-]?\d+'),         
-        ('TEXTO',           r'"[^"]*"'),               
-        ('ID',              r'[a-zA-Z_]\w*'),          
-        ('OP_ARITMETICO',   r'[+\-*/%]'),              
-        ('OP_RELACIONAL',   r'==|!=|<|>|<=|>='),       
-        ('ATRIBUICAO',      r'='),                     
-        ('PONTO_VIRGULA',   r';'),                     
-        ('DOIS_PONTOS',     r':'),                     
-        ('VIRGULA',         r','),                     
-        ('PARENTESES',      r'[()]'),                  
-        ('NOVA_LINHA',      r'\n'),                    
-        ('ESPACO',          r'[ \t\r]+'),              
-        ('ERRO',            r'.'),                 
-    ]
-
-    palavras_chave = {
-        'inicio', 'fim', 'var', 'inteiro', 'real', 'texto', 'logico', 'verdadeiro', 'falso',
-        'repita', 'vezes', 'fim_repita', 'enquanto', 'faca', 'fim_enquanto', 'se', 'entao',
-        'senao', 'fim_se', 'avancar', 'recuar', 'girar_direita', 'girar_esquerda',
-        'ir_para', 'levantar_caneta', 'abaixar_caneta', 'definir_cor', 'definir_espessura',
-        'cor_de_fundo', 'limpar_tela', 'circulo', 'empurrar_posicao', 'restaurar_posicao'
-    }
+def gerar_tokens(codigo_fonte: Fonte) -> Iterator[Token]:
+    """
+    Versão preguiçosa de `tokenizar`: produz os tokens um a um, sob demanda.
+    Erros léxicos só são levantados quando o token inválido é alcançado.
 
-    # Compila as expressões regulares em um único padrão
-    regex_tokens = '|'.join(f'(?P<{par[0]}>{par[1]})' for par in especificacao_tokens)
-    padrao: Pattern[str] = re.compile(regex_tokens)
+    A fonte pode ser uma `str` ou qualquer objeto de bytes UTF-8 (`bytes`,
+    `mmap`, `memoryview`). Nesse caso ela é varrida diretamente e apenas os
+    lexemas de identificadores, números e textos são recortados e decodificados.
 
-    tokens: List[Token] = []
-    numero_linha = 1
+    Args:
+        codigo_fonte: O código em TurtleScript.
+
+    Returns:
+        Um iterador de Tokens, terminado pelo token EOF.
+    """
+    binario = not isinstance(codigo_fonte, str)
+    # Evita o __new__ em Python gerado pelo NamedTuple, caro no laço principal
+    novo_token = tuple.__new__
+    for tipo, inicio, fim, numero_linha, lexema in _varrer(codigo_fonte):
+        if lexema is None:
+            lexema = codigo_fonte[inicio:fim]
+            if binario:
+                lexema = str(lexema, 'utf-8')
+        yield novo_token(Token, (tipo, lexema, numero_linha))
+
+def _varrer(codigo_fonte: Fonte, pos: int = 0, numero_linha: int = 1) -> Iterator[Tuple[str, int, int, int, Optional[str]]]:
+    """
+    Núcleo do analisador léxico, compartilhado por `gerar_tokens` e `TokenBuffer`.
+
+    O scanner é escrito à mão: o primeiro caractere de cada token é
+    classificado pela tabela `_CLASSES`, espaços, quebras de linha e
+    comentários são pulados sem gerar tokens, e só identificadores e
+    números recorrem a expressões regulares (pré-compiladas).
+
+    Produz tuplas (tipo, inicio, fim, linha, lexema) com as posições do
+    lexema na fonte. O lexema só vem pronto quando já é conhecido sem
+    recortar a fonte (símbolos) ou quando foi preciso decodificá-lo para
+    distinguir palavras-chave de identificadores; nos demais casos é None.
+    """
+    binario = not isinstance(codigo_fonte, str)
+    # Recortes de uma memoryview são memoryviews, sem `isascii`
+    vista = isinstance(codigo_fonte, memoryview)
+    if binario:
+        resto_id = _RESTO_ID_BYTES.match
+        numero = _NUMERO_BYTES.match
+        nova_linha, aspas = b'\n', b'"'
+    else:
+        resto_id = _RESTO_ID.match
+        numero = _NUMERO.match
+        nova_linha, aspas = '\n', '"'
+    localizar = _localizador(codigo_fonte)
+    classes = _CLASSES
+    simbolos = _SIMBOLOS
+    lexemas = _LEXEMAS
+    palavras_chave = PALAVRAS_CHAVE
+    # Identificadores e palavras-chave se repetem: uma única string por lexema
+    internar = sys.intern
 
-    for match in padrao.finditer(codigo_fonte):
-        tipo_token = match.lastgroup
-        valor = match.group()
+    tamanho = len(codigo_fonte)
 
-        if tipo_token == 'ID' and valor in palavras_chave:
-            tipo_token = valor.upper() 
-        elif tipo_token in ['NOVA_LINHA', 'ESPACO', 'COMENTARIO']:
-            if tipo_token == 'NOVA_LINHA':
-                numero_linha += 1
-            continue
-        elif tipo_token == 'ERRO':
-            raise SyntaxError(f"Erro Léxico na linha {numero_linha}: Caractere inválido '{valor}' não reconhecido.")
+    while pos < tamanho:
+        c = codigo_fonte[pos]
+        classe = classes.get(c, _INVALIDO)
 
-        tokens.append(Token(tipo_token, valor, numero_linha))
+        if classe == _ESPACO:
+            pos += 1
+            while pos < tamanho and classes.get(codigo_fonte[pos]) == _ESPACO:
+                pos += 1
+        elif classe == _NOVA_LINHA:
+            numero_linha += 1
+            pos += 1
+        elif classe == _LETRA:
+            fim = resto_id(codigo_fonte, pos + 1).end()
+            lexema = codigo_fonte[pos:fim]
+            if binario:
+                if vista:
+                    lexema = bytes(lexema)
+                if lexema.isascii():
+                    lexema = str(lexema, 'ascii')
+                else:
+                    lexema, fim = _identificador_unicode(lexema, pos, numero_linha)
+            lexema = internar(lexema)
+            yield palavras_chave.get(lexema, 'ID'), pos, fim, numero_linha, lexema
+            pos = fim
+        elif classe == _SIMBOLO:
+            tipo_token, lexema = simbolos[c]
+            yield tipo_token, pos, pos + 1, numero_linha, lexema
+            pos += 1
+        elif classe == _DIGITO:
+            match = numero(codigo_fonte, pos)
+            fim = match.end()
+            yield 'NUMERO_REAL' if match.group(1) else 'NUMERO_INTEIRO', pos, fim, numero_linha, None
+            pos = fim
+        elif classe == _SINAL:
+            # Um sinal colado a um dígito faz parte do literal numérico
+            match = numero(codigo_fonte, pos + 1)
+            if match:
+                fim = match.end()
+                yield 'NUMERO_REAL' if match.group(1) else 'NUMERO_INTEIRO', pos, fim, numero_linha, None
+                pos = fim
+            else:
+                yield 'OP_ARITMETICO', pos, pos + 1, numero_linha, lexemas[c]
+                pos += 1
+        elif classe == _RELACIONAL:
+            if pos + 1 < tamanho and codigo_fonte[pos + 1] in _IGUAL:
+                yield 'OP_RELACIONAL', pos, pos + 2, numero_linha, lexemas[c] + '='
+                pos += 2
+            elif c in _IGUAL:
+                yield 'ATRIBUICAO', pos, pos + 1, numero_linha, '='
+                pos += 1
+            elif lexemas[c] != '!':
+                yield 'OP_RELACIONAL', pos, pos + 1, numero_linha, lexemas[c]
+                pos += 1
+            else:
+                raise _erro_lexico(codigo_fonte, pos, numero_linha)
+        elif classe == _BARRA:
+            if pos + 1 < tamanho and codigo_fonte[pos + 1] in _BARRA_DUPLA:
+                # Comentário: pula até o fim da linha, sem consumir a quebra
+                fim = localizar(nova_linha, pos)
+                pos = tamanho if fim == -1 else fim
+            else:
+                yield 'OP_ARITMETICO', pos, pos + 1, numero_linha, '/'
+                pos += 1
+        elif classe == _ASPAS:
+            fim = localizar(aspas, pos + 1)
+            if fim == -1:
+                raise _erro_lexico(codigo_fonte, pos, numero_linha)
+            lexema = None
+            if binario:
+                # Só um texto com bytes não ASCII pode não ser UTF-8 válido
+                lexema = bytes(codigo_fonte[pos:fim + 1]) if vista else codigo_fonte[pos:fim + 1]
+                lexema = str(lexema, 'ascii') if lexema.isascii() else _decodificar(lexema, numero_linha)
+            yield 'TEXTO', pos, fim + 1, numero_linha, lexema
+            pos = fim + 1
+        else:
+            raise _erro_lexico(codigo_fonte, pos, numero_linha)
 
-    tokens.append(Token('EOF', '', numero_linha))
-    return tokens
\ No newline at end of file
+    yield 'EOF', tamanho, tamanho, numero_linha, ''
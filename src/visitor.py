@@ -0,0 +1,71 @@
+from inspect import isgeneratorfunction
+
+class Visitor:
+    """
+    Classe base para o padrão Visitor, compartilhada pelo analisador semântico
+    e pelo gerador de código.
+
+    Cada subclasse tem a sua própria tabela de despacho, da classe do nó para
+    o método `visit_<Classe>`, criada em `__init_subclass__`. A tabela é
+    preenchida na primeira visita a cada classe de nó: se não há um método
+    para a classe, vale o da classe base mais próxima do nó (pela MRO) e, na
+    falta dele, `generic_visit`. Depois disso, `visit` é uma consulta ao
+    dicionário, sem montar nomes nem chamar `getattr`.
+
+    Um método de visita pode ser um gerador: `resultado = yield filho` pede a
+    visita de `filho` e recebe o seu resultado, e o `return` do gerador é o
+    resultado do nó. `visit` executa esses geradores com uma pilha explícita,
+    então a profundidade da árvore não consome a pilha do Python; o código
+    entre dois `yield` roda na ordem de um percurso recursivo (entrada e saída
+    de cada filho), o que mantém estados como a indentação corretos.
+    """
+    _despacho: dict = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._despacho = {}
+
+    @classmethod
+    def _resolver(cls, classe_no: type):
+        """ (método, se é gerador) para a classe do nó, guardado na tabela. """
+        for base in classe_no.__mro__:
+            metodo = getattr(cls, f'visit_{base.__name__}', None)
+            if metodo is not None:
+                break
+        else:
+            metodo = cls.generic_visit
+        entrada = cls._despacho[classe_no] = (metodo, isgeneratorfunction(metodo))
+        return entrada
+
+    def visit(self, node):
+        despacho = self._despacho
+        try:
+            metodo, gerador = despacho[node.__class__]
+        except KeyError:
+            metodo, gerador = self._resolver(node.__class__)
+        if not gerador:
+            return metodo(self, node)
+
+        # Geradores suspensos, um por nó cuja visita ainda não terminou
+        pilha = [metodo(self, node)]
+        resultado = None
+        while pilha:
+            try:
+                node = pilha[-1].send(resultado)
+            except StopIteration as fim:
+                pilha.pop()
+                resultado = fim.value
+                continue
+            try:
+                metodo, gerador = despacho[node.__class__]
+            except KeyError:
+                metodo, gerador = self._resolver(node.__class__)
+            if gerador:
+                pilha.append(metodo(self, node))
+                resultado = None
+            else:
+                resultado = metodo(self, node)
+        return resultado
+
+    def generic_visit(self, node):
+        raise NotImplementedError(f"O método visit_{node.__class__.__name__} não foi implementado.")
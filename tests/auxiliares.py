@@ -0,0 +1,39 @@
+"""
+Auxiliares compartilhados pelos testes: a árvore verificada de um programa
+e a execução do código gerado com uma tartaruga que só registra as chamadas.
+"""
+import sys
+import types
+from src.parser import Parser
+from src.semantico import AnalisadorSemantico
+from src.tokenizer import tokenizar
+
+def analisar(codigo):
+    """ A AST do programa, já anotada pela análise semântica. """
+    arvore = Parser(tokenizar(codigo)).parse()
+    AnalisadorSemantico().visit(arvore)
+    return arvore
+
+def executar(codigo_python):
+    """
+    Executa o código gerado com um módulo `turtle` de mentira e devolve as
+    chamadas feitas à tela e à tartaruga, como tuplas (método, *argumentos).
+    Toda chamada devolve (0, 0), que serve como a posição da tartaruga.
+    """
+    chamadas = []
+    class Registro:
+        def __getattr__(self, metodo):
+            return lambda *argumentos: chamadas.append((metodo, *argumentos)) or (0, 0)
+    modulo = types.ModuleType('turtle')
+    modulo.Screen = modulo.Turtle = Registro
+    modulo.done = lambda: None
+    original = sys.modules.get('turtle')
+    sys.modules['turtle'] = modulo
+    try:
+        exec(compile(codigo_python, '<gerado>', 'exec'), {})
+    finally:
+        if original is None:
+            del sys.modules['turtle']
+        else:
+            sys.modules['turtle'] = original
+    return chamadas
@@ -0,0 +1,90 @@
+import unittest
+from auxiliares import analisar, executar
+from src.avaliador import avaliar
+from src.gerador import EmissorPython, GeradorDeCodigo
+from src.ir import GeradorDeIR, GerenciadorDePassos
+from src.otimizador import otimizar
+
+class TestAvaliador(unittest.TestCase):
+
+    def _comparar(self, operacoes, esperadas):
+        """ Operações iguais, com os números comparados a menos de 1e-9. """
+        self.assertEqual(len(operacoes), len(esperadas), operacoes)
+        for operacao, esperada in zip(operacoes, esperadas):
+            self.assertEqual(operacao[0], esperada[0])
+            for valor, valor_esperado in zip(operacao[1:], esperada[1:]):
+                if isinstance(valor_esperado, str):
+                    self.assertEqual(valor, valor_esperado)
+                else:
+                    self.assertAlmostEqual(valor, valor_esperado, places=9)
+
+    def test_operacoes_de_desenho(self):
+        operacoes = avaliar(analisar("""
+            inicio
+            var inteiro: lado = 7 / 2;
+            var texto: cor = "red";
+            definir_cor cor;
+            repita 2 vezes avancar lado * 10; girar_esquerda 90; fim_repita;
+            levantar_caneta; ir_para 1 1; avancar 5; ir_para 50 -50;
+            abaixar_caneta; empurrar_posicao;
+            girar_direita 45; recuar 10;
+            levantar_caneta; restaurar_posicao;
+            circulo 20; cor_de_fundo "black"; definir_espessura 3; limpar_tela;
+            girar_esquerda 30;
+            fim
+        """))
+        self._comparar(operacoes, [
+            ('pencolor', 'red'),
+            # 7 / 2 é 3.5 mesmo entre inteiros, como no código gerado
+            ('goto', 35.0, 0.0), ('goto', 35.0, 35.0),
+            # com a caneta levantada só o destino final importa
+            ('penup',), ('goto', 50, -50), ('pendown',),
+            ('goto', 50 + 10 * 2 ** -0.5, -50 - 10 * 2 ** -0.5),
+            # restaurar volta à posição e ao rumo guardados e abaixa a caneta
+            ('penup',), ('goto', 50, -50), ('pendown',),
+            ('setheading', 180.0), ('circle', 20),
+            ('bgcolor', 'black'), ('pensize', 3), ('clear',),
+            ('setheading', 210.0),
+        ])
+
+    def test_programas_que_ficam_para_a_execucao(self):
+        programas = [
+            "inicio enquanto verdadeiro faca avancar 1; fim_enquanto; fim",
+            "inicio repita 1000000 vezes fim_repita; fim",
+            "inicio var inteiro: x; avancar 1; avancar 10 / x; fim",
+            "inicio se verdadeiro entao var inteiro: k; avancar k; fim_se; fim",
+            "inicio var real: r = 1.0; repita 2000 vezes r = r * 10; fim_repita; avancar r; fim",
+            'inicio var texto: s = "ab"; repita 40 vezes s = s + s; fim_repita; definir_cor s; fim',
+        ]
+        for codigo in programas:
+            self.assertIsNone(avaliar(analisar(codigo)), codigo)
+        self.assertIsNotNone(avaliar(analisar(programas[1]), passos=2000000))
+
+    def test_geracao_pre_calculada(self):
+        arvore = analisar('inicio cor_de_fundo "black"; repita 3 vezes avancar 10; girar_direita 120; fim_repita; fim')
+        normal = GeradorDeCodigo().gerar(arvore)
+        gerado = GeradorDeCodigo().gerar(arvore, pre_calcular=True)
+        self.assertNotIn("for _ in range(3):", gerado)
+        self.assertEqual(gerado.split("\n")[:11], normal.split("\n")[:11])
+        # A tela e a tartaruga recebem exatamente as operações calculadas
+        self.assertEqual(executar(gerado), [('title', 'Resultado'), ('speed', 0)] + avaliar(arvore))
+
+        # Sem como calcular o desenho, o código é o de sempre
+        arvore = analisar("inicio enquanto verdadeiro faca avancar 1; fim_enquanto; fim")
+        self.assertEqual(GeradorDeCodigo().gerar(arvore, pre_calcular=True), GeradorDeCodigo().gerar(arvore))
+
+    def test_divisao_igual_em_todos_os_caminhos(self):
+        # '/' é a divisão real, mesmo entre inteiros ímpares ou negativos
+        codigo = ("inicio var inteiro: a = 7, b = -7; var real: r; r = 7 / 2;"
+                  " avancar a / 2; avancar b / 2; avancar -7 / 2; avancar r; avancar 7 % -2; fim")
+        esperadas = [('goto', 3.5, 0.0), ('goto', 0.0, 0.0), ('goto', -3.5, 0.0), ('goto', 0.0, 0.0), ('goto', -1.0, 0.0)]
+        self._comparar(avaliar(analisar(codigo)), esperadas)
+        # O otimizador junta os deslocamentos, mas a tartaruga termina no mesmo lugar
+        self._comparar(avaliar(otimizar(analisar(codigo)))[-1:], esperadas[-1:])
+        for gerado in (GeradorDeCodigo().gerar(analisar(codigo)),
+                       EmissorPython().gerar(GerenciadorDePassos().executar(GeradorDeIR().gerar(analisar(codigo))))):
+            self.assertEqual(executar(gerado)[2:], [('forward', 3.5), ('forward', -3.5), ('forward', -3.5),
+                                                          ('forward', 3.5), ('forward', -1)], gerado)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+import os
+import unittest
+from src.compilador import CompiladorDePassadaUnica
+from src.gerador import GeradorDeCodigo
+from src.parser import Parser
+from src.semantico import AnalisadorSemantico
+from src.tokenizer import tokenizar
+
+DIRETORIO_EXEMPLOS = os.path.join(os.path.dirname(__file__), '..', 'examples', 'input')
+
+class TestCompiladorDePassadaUnica(unittest.TestCase):
+
+    def _duas_passadas(self, arvore):
+        AnalisadorSemantico().visit(arvore)
+        return GeradorDeCodigo().gerar(arvore)
+
+    def _comparar(self, codigo):
+        """ As duas formas de compilar dão o mesmo código ou o mesmo erro. """
+        arvore = Parser(tokenizar(codigo)).parse()
+        try:
+            esperado = self._duas_passadas(arvore)
+        except (NameError, TypeError) as erro:
+            with self.assertRaises(type(erro)) as contexto:
+                CompiladorDePassadaUnica().gerar(arvore)
+            self.assertEqual(str(contexto.exception), str(erro))
+            return erro
+        self.assertEqual(CompiladorDePassadaUnica().gerar(arvore), esperado)
+        return None
+
+    def test_exemplos(self):
+        for nome in sorted(os.listdir(DIRETORIO_EXEMPLOS)):
+            with open(os.path.join(DIRETORIO_EXEMPLOS, nome), encoding='utf-8') as arquivo:
+                self.assertIsNone(self._comparar(arquivo.read()), nome)
+
+    def test_estruturas_aninhadas(self):
+        codigo = """
+            inicio
+            var inteiro: x = 1, n;
+            var real: r;
+            repita 3 vezes
+                se x < 10 entao
+                    var texto: cor;
+                    avancar -x * 2 + 1; empurrar_posicao; restaurar_posicao;
+                senao
+                    enquanto x > 0 faca x = x - 1; ir_para x r; fim_enquanto;
+                fim_se;
+                r = x / 2;
+                definir_cor "azul"; levantar_caneta;
+            fim_repita;
+            fim
+        """
+        self.assertIsNone(self._comparar(codigo))
+
+    def test_mesmos_erros(self):
+        erros = [
+            "inicio x = 1; fim",
+            "inicio var inteiro: x; var real: x; fim",
+            "inicio var inteiro: x; x = \"a\"; fim",
+            "inicio var inteiro: x; x = y + z; fim",
+            "inicio var inteiro: x; avancar x + verdadeiro; fim",
+            "inicio var texto: x; avancar -x; fim",
+            "inicio var inteiro: x; se x entao avancar 1; fim_se; fim",
+            "inicio var inteiro: x; repita x vezes avancar 1; fim_repita; fim",
+            "inicio enquanto 1 < 2 faca ir_para 1 \"a\"; fim_enquanto; fim",
+        ]
+        for codigo in erros:
+            self.assertIsNotNone(self._comparar(codigo), codigo)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
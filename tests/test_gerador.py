@@ -1,8 +1,13 @@
 import unittest
 import textwrap
-from src.gerador import GeradorDeCodigo
+from auxiliares import analisar, executar
+from src.compilador import CompiladorDePassadaUnica
+from src.gerador import EmissorPython, GeradorDeCodigo, Renderizacao
+from src.ir import GeradorDeIR
 from src.ast_nodes import *
-from src.tokenizer import Token
+from src.tokenizer import Token, tokenizar
+from src.parser import Parser
+from src.semantico import AnalisadorSemantico
 
 class TestGeradorDeCodigo(unittest.TestCase):
 
@@ -134,5 +139,70 @@ class TestGeradorDeCodigo(unittest.TestCase):
 
         self.assertIn("x = ((5 + 3) * 2)", codigo_gerado)
         
+    def test_geracao_profunda_sem_recursao(self):
+        # 3000 estruturas 'repita' encaixadas, cada uma com 'avancar -(-(...x))'
+        profundidade = 3000
+        expr = Variavel(self._criar_token_dummy('ID', 'x'))
+        for _ in range(profundidade):
+            expr = UnaryOp(self._criar_token_dummy('OP_ARITMETICO', '-'), expr)
+        bloco = Bloco([], [ComandoSimples(self._criar_token_dummy('AVANCAR', 'avancar'), expr)])
+        for _ in range(profundidade):
+            vezes = Literal(self._criar_token_dummy('NUMERO_INTEIRO', '2'))
+            bloco = Bloco([], [Repita(vezes, bloco)])
+
+        linhas = self.gerador.gerar(Programa(bloco)).split("\n")
+        inicio = linhas.index("for _ in range(2):")
+        for nivel in range(profundidade):
+            self.assertEqual(linhas[inicio + nivel], "    " * nivel + "for _ in range(2):")
+        argumento = "(-" * profundidade + "x" + ")" * profundidade
+        self.assertEqual(linhas[inicio + profundidade], "    " * profundidade + f"t.forward({argumento})")
+        self.assertEqual(self.gerador.nivel_indentacao, 0)
+
+    def test_geracao_tipada(self):
+        codigo = "inicio var inteiro: x; var real: r; x = x / 2; r = r / 2; avancar +x; fim"
+        arvore = Parser(tokenizar(codigo)).parse()
+        # Sem a análise semântica não há tipos: código genérico
+        generico = GeradorDeCodigo().gerar(arvore)
+        self.assertIn("x = (x / 2)", generico)
+        self.assertIn("t.forward((+x))", generico)
+
+        AnalisadorSemantico().visit(arvore)
+        tipado = self.gerador.gerar(arvore)
+        self.assertIn("x = (x / 2)", tipado)
+        self.assertIn("r = (r / 2)", tipado)
+        self.assertIn("t.forward(x)", tipado)
+
+    def _atualizacoes(self, codigo_python):
+        """ Quantas vezes o código gerado chama `screen.update()`. """
+        return [metodo for metodo, *_ in executar(codigo_python)].count('update')
+
+    def test_renderizacao(self):
+        codigo = ("inicio repita 7 vezes avancar 1; girar_direita 10; fim_repita;"
+                  " empurrar_posicao; ir_para 1 2; restaurar_posicao; fim")
+        renderizacao = Renderizacao(primitivas=3)
+        gerado = self.gerador.gerar(analisar(codigo), renderizacao=renderizacao)
+        linhas = gerado.split("\n")
+        self.assertIn("screen.tracer(0, 0)", linhas)
+        self.assertNotIn("import time", linhas)
+        # Só as primitivas de desenho contam para o quadro
+        corpo = linhas[linhas.index("for _ in range(7):"):]
+        self.assertEqual(corpo[:4], ["for _ in range(7):", "    t.forward(1)", "    _quadro()", "    t.right(10)"])
+        self.assertEqual(corpo[-5:], ["_quadro()", "", "# --- Finalização ---", "screen.update()", "turtle.done()"])
+        self.assertEqual(linhas.count("_quadro()"), 2)
+        # 9 primitivas: um quadro a cada 3, mais o final
+        self.assertEqual(self._atualizacoes(gerado), 4)
+        # O compilador de passada única e a IR geram o mesmo código
+        self.assertEqual(CompiladorDePassadaUnica().gerar(Parser(tokenizar(codigo)).parse(), renderizacao=renderizacao),
+                         gerado)
+        self.assertEqual(EmissorPython().gerar(GeradorDeIR().gerar(analisar(codigo)), renderizacao=renderizacao),
+                         gerado)
+
+        final = GeradorDeCodigo().gerar(analisar(codigo), renderizacao=Renderizacao(so_quadro_final=True))
+        self.assertNotIn("_quadro", final)
+        self.assertEqual(self._atualizacoes(final), 1)
+        por_tempo = GeradorDeCodigo().gerar(analisar(codigo), renderizacao=Renderizacao(0, milissegundos=20))
+        self.assertIn("import time", por_tempo)
+        self.assertIn("    if time.perf_counter() - _ultimo_quadro >= 0.02:", por_tempo)
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
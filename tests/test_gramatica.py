@@ -0,0 +1,31 @@
+import unittest
+from src import gramatica
+
+class TestGramatica(unittest.TestCase):
+
+    def test_first_e_follow(self):
+        self.assertEqual(gramatica.FIRST['tipo'], {'INTEIRO', 'REAL', 'TEXTO', 'LOGICO'})
+        self.assertIn('itens', gramatica.ANULAVEIS)
+        self.assertEqual(gramatica.FOLLOW['senao'], {'FIM_SE'})
+        self.assertEqual(gramatica.FOLLOW['itens'], {'FIM', 'FIM_REPITA', 'SENAO', 'FIM_SE', 'FIM_ENQUANTO'})
+
+    def test_tabela_ll1(self):
+        self.assertEqual(gramatica.TABELA['item']['VAR'], ('declaracao',))
+        for comando in gramatica.COMANDOS_COM_EXPRESSAO + gramatica.COMANDOS_SEM_EXPRESSAO:
+            self.assertIn(comando, gramatica.TABELA['comando'])
+        self.assertEqual(gramatica.TABELA['itens']['FIM_SE'], ())
+
+    def test_conflito_detectado(self):
+        producoes = {
+            'programa': [('INICIO', 'comando', 'FIM')],
+            'comando': [('ID', 'ATRIBUICAO', 'ID'), ('ID', 'PONTO_VIRGULA')],
+        }
+        with self.assertRaisesRegex(ValueError, "comando com 'ID'"):
+            gramatica.construir_tabela(producoes, {})
+
+    def test_nao_terminal_indefinido(self):
+        with self.assertRaisesRegex(ValueError, "'bloco' usado em 'programa'"):
+            gramatica.construir_tabela({'programa': [('INICIO', 'bloco', 'FIM')]}, {})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
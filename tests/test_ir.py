@@ -0,0 +1,86 @@
+import os
+import unittest
+from auxiliares import analisar
+from src.gerador import EmissorPython, GeradorDeCodigo
+from src.ir import *
+from src.otimizador import otimizar
+
+DIRETORIO_EXEMPLOS = os.path.join(os.path.dirname(__file__), '..', 'examples', 'input')
+
+class TestIR(unittest.TestCase):
+
+    def test_emissor_igual_ao_gerador(self):
+        fontes = []
+        for nome in sorted(os.listdir(DIRETORIO_EXEMPLOS)):
+            with open(os.path.join(DIRETORIO_EXEMPLOS, nome), encoding='utf-8') as arquivo:
+                fontes.append(arquivo.read())
+        fontes.append(
+            "inicio var inteiro: x, _r0; var real: r; var texto: c = \"red\";"
+            " x = -(x + 1) * +2; r = x / 2.0 + 7 % 3;"
+            " repita 3 vezes se x > 1 entao var logico: b; b = x != 2; avancar x;"
+            " senao enquanto r < 1.0 faca r = r + 0.5; fim_enquanto; fim_se; fim_repita;"
+            " se falso entao fim_se; empurrar_posicao; ir_para x r; restaurar_posicao;"
+            " definir_cor c; cor_de_fundo \"black\"; levantar_caneta; fim"
+        )
+        for fonte in fontes:
+            for otimizado in (False, True):
+                arvore = analisar(fonte)
+                if otimizado:
+                    arvore = otimizar(arvore)
+                self.assertEqual(EmissorPython().gerar(GeradorDeIR().gerar(arvore)),
+                                 GeradorDeCodigo().gerar(arvore))
+
+    def test_listagem_e_passes(self):
+        programa = GeradorDeIR().gerar(analisar(
+            "inicio var inteiro: x; x = 7 / 2; avancar 2 * 3 + x; se x > 1 entao girar_direita x; fim_se; fim"
+        ))
+        self.assertEqual(programa.listar().split("\n")[:5], [
+            "   0 x:inteiro = DECLARA",
+            "   1 _r0:inteiro = CONST 7",
+            "   2 _r1:inteiro = CONST 2",
+            "   3 _r2:inteiro = DIVISAO _r0 _r1",
+            "   4 x:inteiro = COPIA _r2",
+        ])
+
+        gerenciador = GerenciadorDePassos()
+        programa = gerenciador.executar(programa)
+        # O dobramento troca as contas por constantes e os operandos ficam sem uso
+        self.assertEqual([nome for nome, *_ in gerenciador.relatorio],
+                         ["dobramento de constantes", "remoção de temporários mortos"])
+        self.assertEqual([(antes, depois) for _, _, antes, depois in gerenciador.relatorio], [(15, 15), (15, 11)])
+        self.assertEqual(len(gerenciador.formatar_relatorio().split("\n")), 2)
+        codigo = EmissorPython().gerar(programa)
+        self.assertIn("x = 3.5\nt.forward((6 + x))\nif (x > 1):\n    t.right(x)", codigo)
+
+    def test_divisao_por_zero_fica(self):
+        programa = GerenciadorDePassos().executar(GeradorDeIR().gerar(analisar(
+            "inicio var inteiro: x; x = 1 / 0; x = 2; avancar x; fim"
+        )))
+        self.assertIn(Operacao.DIVISAO, [operacao for operacao, *_ in programa])
+
+    def test_temporario_reusado_na_condicao(self):
+        # enquanto (x + 1) * (x + 1) < 50 faca x = x + 1, com x + 1 calculado uma vez só
+        programa = ProgramaIR()
+        x = programa.variavel('x', 'inteiro')
+        um, soma, produto, menor, limite = (programa.novo_temporario(tipo) for tipo in
+                                            ('inteiro', 'inteiro', 'inteiro', 'logico', 'inteiro'))
+        programa.emitir(Operacao.DECLARA, x)
+        programa.emitir(Operacao.CONST, um, programa.constante(1, '1'))
+        programa.emitir(Operacao.CONST, limite, programa.constante(50, '50'))
+        programa.emitir(Operacao.ENQUANTO)
+        programa.emitir(Operacao.SOMA, soma, x, um)
+        programa.emitir(Operacao.MULTIPLICACAO, produto, soma, soma)
+        programa.emitir(Operacao.MENOR, menor, produto, limite)
+        programa.emitir(Operacao.TESTE, -1, menor)
+        programa.emitir(Operacao.COPIA, x, soma)
+        programa.emitir(Operacao.FIM)
+        codigo = EmissorPython().gerar(programa)
+        # A soma é recalculada a cada volta, dentro do laço
+        self.assertIn("while True:\n    _r1 = (x + 1)\n    if not ((_r1 * _r1) < 50):\n        break\n    x = _r1\n",
+                      codigo)
+        variaveis = {}
+        exec(codigo[codigo.index("x = 0"):codigo.index("# --- Finalização")], variaveis)
+        self.assertEqual(variaveis['x'], 7)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,266 @@
+import os
+import unittest
+from auxiliares import analisar
+from src.ast_nodes import *
+from src.gerador import GeradorDeCodigo
+from src.otimizador import *
+
+DIRETORIO_EXEMPLOS = os.path.join(os.path.dirname(__file__), '..', 'examples', 'input')
+
+class TestOtimizador(unittest.TestCase):
+
+    def _otimizar(self, codigo, passes=()):
+        """ Aplica só os passes dados ou, sem eles, todos (`otimizar`). """
+        arvore = analisar(codigo)
+        if not passes:
+            return otimizar(arvore)
+        for passe in passes:
+            arvore = passe().visit(arvore)
+        return arvore
+
+    def _gerar(self, codigo, *passes):
+        """ Só as linhas do programa, sem o cabeçalho e o rodapé fixos. """
+        gerado = GeradorDeCodigo().gerar(self._otimizar(codigo, passes))
+        inicio = gerado.index("# Inicialização de variáveis")
+        return gerado[inicio:gerado.index("# --- Finalização")].strip().split("\n")[1:]
+
+    def test_dobramento_com_regras_de_tipos(self):
+        arvore = self._otimizar(
+            "inicio var inteiro: i; var real: r; var logico: b;"
+            " i = 7 / 2 - -3; r = 1 + 2.5 * 2; b = 2 * 3 > 5; i = 7 / 0; i = 7 % (2 - 2); fim",
+            (DobramentoDeConstantes,)
+        )
+        atribuicoes = arvore.bloco.comandos
+        # '/' é a divisão real mesmo entre inteiros, como no código gerado
+        self.assertEqual([(a.expressao.token.tipo, a.expressao.valor) for a in atribuicoes[:3]],
+                         [('NUMERO_REAL', '6.5'), ('NUMERO_REAL', '6.0'), ('VERDADEIRO', 'verdadeiro')])
+        # Divisão por zero fica para a execução, mas o divisor é dobrado
+        self.assertIsInstance(atribuicoes[3].expressao, BinOp)
+        self.assertEqual(atribuicoes[4].expressao.dir.valor, '0')
+
+    def test_dobramento_limita_inteiros(self):
+        nomes = "abcdefghijk"
+        linhas = self._gerar(
+            f"inicio var inteiro: {', '.join(nomes)}; a = 1000 * 1000;"
+            + "".join(f" {nome} = {anterior} * {anterior};" for anterior, nome in zip(nomes, nomes[1:]))
+            + " avancar k; fim",
+            DobramentoDeConstantes
+        )
+        # 10^6 elevado a 2^7 ainda tem menos de 4096 bits; o quadrado dele não é dobrado
+        self.assertEqual(linhas[19:21], [f"h = {10 ** 768}", f"i = ({10 ** 768} * {10 ** 768})"])
+        self.assertEqual(linhas[21:], ["j = (i * i)", "k = (j * j)", "t.forward(k)"])
+        # Um literal longo demais para o int() do Python também fica como está
+        literal = "9" * 5000
+        linhas = self._gerar(f"inicio var inteiro: x; x = {literal} + 1; fim", DobramentoDeConstantes)
+        self.assertEqual(linhas[2:], [f"x = ({literal} + 1)"])
+
+    def test_propagacao_e_desvios_mortos(self):
+        with open(os.path.join(DIRETORIO_EXEMPLOS, 'entrada3.txt'), encoding='utf-8') as arquivo:
+            linhas = self._gerar(arquivo.read(), DobramentoDeConstantes)
+        self.assertNotIn("if", "\n".join(linhas))
+        self.assertIn("    t.backward(80)", linhas)
+        self.assertEqual(linhas.count('t.pencolor("blue")'), 1)
+        self.assertEqual(linhas.count('t.pencolor("green")'), 1)
+
+    def test_propagacao_so_de_valores_fixos(self):
+        linhas = self._gerar(
+            "inicio var inteiro: x, y, z; var real: r;"
+            " avancar x; x = 10; avancar x;"
+            " repita 2 vezes y = 5; avancar y; fim_repita;"
+            " z = 1; z = z + 1; avancar z;"
+            " r = 4; avancar r / 8;"
+            " enquanto x < 5 faca avancar 1; fim_enquanto;"
+            " se x > 5 entao avancar 2; fim_se;"
+            " se falso entao avancar 3; fim_se;"
+            " fim",
+            DobramentoDeConstantes
+        )
+        self.assertEqual(linhas, [
+            "x = 0", "y = 0", "z = 0", "r = 0.0", "",
+            # antes da atribuição, x ainda vale o padrão
+            "t.forward(x)", "x = 10", "t.forward(10)",
+            # atribuída dentro de um laço: não é propagada
+            "for _ in range(2):", "    y = 5", "    t.forward(y)",
+            "z = 1", "z = (z + 1)", "t.forward(z)",
+            # r é real: 4 vira 4.0 e a divisão é real
+            "r = 4", "t.forward(0.5)",
+            "t.forward(2)",
+        ])
+
+    def test_movimento_de_invariantes(self):
+        linhas = self._gerar(
+            "inicio var inteiro: x, y, i, _t0; var real: r;"
+            " repita 3 vezes avancar x * y + 1; girar_direita (x * y + 1) / 2; i = i + x * 2; fim_repita;"
+            " enquanto i < x * 10 faca i = i + 1; avancar y - i; y = y + 1; fim_enquanto;"
+            " repita 1 vezes avancar x * y; fim_repita;"
+            " repita 2 vezes avancar 10 / y; avancar 10 / 2; fim_repita;"
+            " fim",
+            DobramentoDeConstantes, MovimentoDeInvariantes
+        )
+        self.assertEqual(linhas[6:], [
+            # a temporária evita o nome _t0, já usado pelo programa
+            "_t1 = ((x * y) + 1)", "_t2 = (((x * y) + 1) / 2)", "_t3 = (x * 2)",
+            "for _ in range(3):", "    t.forward(_t1)", "    t.right(_t2)", "    i = (i + _t3)",
+            # y é atribuída no laço: só x * 10 sai da condição
+            "_t4 = (x * 10)",
+            "while (i < _t4):", "    i = (i + 1)", "    t.forward((y - i))", "    y = (y + 1)",
+            # um laço de uma volta não ganha nada
+            "for _ in range(1):", "    t.forward((x * y))",
+            # a divisão por y pode falhar e fica no laço
+            "for _ in range(2):", "    t.forward((10 / y))", "    t.forward(5.0)",
+        ])
+
+    def test_desenrolamento_de_lacos(self):
+        linhas = self._gerar(
+            "inicio var inteiro: x;"
+            " repita 3 vezes avancar x; girar_direita 90; fim_repita;"
+            " repita 0 vezes avancar x; fim_repita;"
+            # com um número negativo de voltas o corpo também não executa
+            " repita -3 vezes avancar 10; fim_repita; repita -1 vezes recuar x; fim_repita;"
+            " repita -2 vezes repita 50 vezes avancar x; fim_repita; fim_repita;"
+            " repita 1 vezes recuar x; fim_repita;"
+            " repita 36 vezes girar_esquerda 2.5; fim_repita;"
+            " repita 2 vezes repita 4 vezes avancar 5; fim_repita; fim_repita;"
+            " repita 11 vezes x = x + 1; avancar x; girar_direita x; fim_repita;"
+            " fim",
+            DesenrolamentoDeLacos
+        )
+        corpo = ["x = (x + 1)", "t.forward(x)", "t.right(x)"]
+        self.assertEqual(linhas[2:], [
+            "t.forward(x)", "t.right(90)", "t.forward(x)", "t.right(90)", "t.forward(x)", "t.right(90)",
+            "t.backward(x)", "t.left(90.0)",
+            # o laço interno vira um comando só, e o externo também
+            "t.forward(40)",
+            # 11 * 9 nós passam do limite, e o orçamento que sobra dá para
+            # 3 cópias: 3 voltas de 3 cópias, mais as 2 que faltam
+            "for _ in range(3):", *("    " + linha for linha in corpo * 3), *corpo * 2,
+        ])
+
+    def test_desenrolamento_respeita_orcamento(self):
+        codigo = ("inicio var inteiro: x; repita 4 vezes avancar x; fim_repita;"
+                  " repita 4 vezes recuar x; fim_repita; fim")
+        arvore = DesenrolamentoDeLacos(orcamento=6).visit(analisar(codigo))
+        # O primeiro laço gasta 3 * 2 nós; o segundo, nem desenrolado em parte, não cabe
+        self.assertEqual([type(comando) for comando in arvore.bloco.comandos],
+                         [ComandoSimples] * 4 + [Repita])
+
+    def test_eliminacao_de_subexpressoes(self):
+        linhas = self._gerar(
+            "inicio var inteiro: a, b, c;"
+            " avancar (a + b) * (a + b); c = a + b; a = 1 + c;"
+            " avancar a + b; recuar a + b;"
+            " avancar (b - c) * 2; recuar (b - c) * 2 + (b - c);"
+            " fim",
+            EliminacaoDeSubexpressoes
+        )
+        self.assertEqual(linhas[4:], [
+            "_t0 = (a + b)", "t.forward((_t0 * _t0))", "c = _t0",
+            # a mudou: a + b é calculada de novo
+            "a = (1 + c)", "_t1 = (a + b)", "t.forward(_t1)", "t.backward(_t1)",
+            # b - c só é usada fora de (b - c) * 2 uma vez: sem temporária
+            "_t2 = ((b - c) * 2)", "t.forward(_t2)", "t.backward((_t2 + (b - c)))",
+        ])
+
+    def test_eliminacao_de_codigo_morto(self):
+        linhas = self._gerar(
+            "inicio var inteiro: a, b, c, d, n, nunca; var real: r;"
+            " avancar a; b = 1; b = 2; avancar b;"
+            " c = 5; d = c * 2; nunca = b + 1;"
+            " r = 1 / a; n = 3;"
+            " repita 3 vezes se b > 1 entao n = n + 1; fim_se; avancar n; fim_repita;"
+            " enquanto b < 10 faca var inteiro: lixo; lixo = b; b = b + 1; fim_enquanto;"
+            " fim",
+            EliminacaoDeCodigoMorto
+        )
+        self.assertEqual(linhas, [
+            # só `a` é lida antes de receber um valor
+            "a = 0", "",
+            "t.forward(a)", "b = 2", "t.forward(b)",
+            # c e d só alimentam uma à outra; 1 / a pode falhar e fica
+            "r = (1 / a)", "n = 3",
+            "for _ in range(3):", "    if (b > 1):", "        n = (n + 1)", "    t.forward(n)",
+            "while (b < 10):", "    b = (b + 1)",
+        ])
+
+    def test_eliminacao_de_codigo_morto_com_repita_que_nao_executa(self):
+        # range(-1) e range(0) não executam o corpo: x = 3 continua vivo, e o
+        # corpo, que nunca executa, não tem o que manter
+        for vezes in (-1, 0):
+            linhas = self._gerar(
+                f"inicio var inteiro: x; x = 3; repita {vezes} vezes x = 5; fim_repita; avancar x; fim",
+                EliminacaoDeCodigoMorto
+            )
+            self.assertEqual(linhas, ["", "x = 3", f"for _ in range({vezes}):", "    pass", "t.forward(x)"])
+
+    def test_otimizacao_peephole(self):
+        linhas = self._gerar(
+            "inicio var inteiro: x;"
+            " avancar 10; avancar 20; recuar 5; girar_direita 30; girar_esquerda 30;"
+            " avancar 0; girar_esquerda 360; recuar 2.5; recuar 1;"
+            " girar_direita x; girar_esquerda x; girar_direita 1 / x; girar_esquerda 1 / x;"
+            " levantar_caneta; abaixar_caneta; levantar_caneta; avancar 10; recuar 30; avancar x; recuar x;"
+            " avancar 5; ir_para 1 2; ir_para x x;"
+            " repita 2 vezes abaixar_caneta; avancar 1; girar_direita 45; girar_direita 45; fim_repita;"
+            " avancar 3; avancar 4;"
+            " fim",
+            OtimizacaoPeephole
+        )
+        self.assertEqual(linhas[2:], [
+            # a caneta pode estar abaixada: sentidos opostos não se juntam; os
+            # giros se cancelam e os recuos que sobram ficam lado a lado
+            "t.forward(30)", "t.backward(8.5)",
+            # 1 / x pode falhar e fica
+            "t.right((1 / x))", "t.left((1 / x))",
+            # com a caneta levantada só o destino final importa
+            "t.penup()", "t.goto(x, x)",
+            "for _ in range(2):", "    t.pendown()", "    t.forward(1)", "    t.right(90)",
+            # o laço muda a caneta: o estado volta a ser desconhecido
+            "t.forward(7)",
+        ])
+
+    def test_eliminacao_de_estilos_com_repita_que_nao_executa(self):
+        # O corpo de `repita -1 vezes` não executa: a cor ainda é vermelha e o
+        # último definir_cor "blue" fica
+        linhas = self._gerar(
+            'inicio definir_cor "red"; repita -1 vezes definir_cor "blue"; fim_repita;'
+            ' definir_cor "blue"; avancar 1; fim',
+            EliminacaoDeEstilosRedundantes
+        )
+        self.assertEqual(linhas[1:], ['t.pencolor("red")', "for _ in range(-1):", '    t.pencolor("blue")',
+                                      't.pencolor("blue")', "t.forward(1)"])
+
+    def test_eliminacao_de_estilos_redundantes(self):
+        linhas = self._gerar(
+            "inicio var inteiro: x;"
+            " abaixar_caneta; definir_espessura 1; cor_de_fundo \"white\"; definir_cor \"black\";"
+            " se x > 0 entao definir_cor \"red\"; senao definir_cor \"red\"; levantar_caneta; fim_se;"
+            " definir_cor \"red\"; abaixar_caneta; abaixar_caneta;"
+            " repita 3 vezes definir_espessura 2; avancar 1; fim_repita; definir_espessura 2;"
+            " enquanto x < 3 faca definir_cor \"red\"; avancar x; definir_cor \"blue\"; x = x + 1; fim_enquanto;"
+            " definir_espessura x; definir_espessura x;"
+            " empurrar_posicao; levantar_caneta; restaurar_posicao; abaixar_caneta;"
+            " fim",
+            EliminacaoDeEstilosRedundantes
+        )
+        self.assertEqual(linhas[2:], [
+            # a cor inicial não é conhecida; caneta, espessura e fundo são
+            't.pencolor("black")',
+            # os dois caminhos chegam com vermelho, mas com a caneta em estados diferentes
+            "if (x > 0):", '    t.pencolor("red")', "else:", '    t.pencolor("red")', "    t.penup()",
+            "t.pendown()",
+            # a primeira volta começa com a espessura 1; depois do laço ela
+            # é 2, e o definir_espessura 2 seguinte sai
+            "for _ in range(3):", "    t.pensize(2)", "    t.forward(1)",
+            # a cor azul da volta anterior chega ao começo do laço
+            "while (x < 3):", '    t.pencolor("red")', "    t.forward(x)", '    t.pencolor("blue")', "    x = (x + 1)",
+            # só argumentos literais são acompanhados
+            "t.pensize(x)", "t.pensize(x)",
+            # com a pilha vazia, restaurar não abaixa a caneta
+            "pilha_posicao.append({'pos': t.pos(), 'heading': t.heading()})", "t.penup()",
+            *["if pilha_posicao:", "    estado = pilha_posicao.pop()", "    t.penup()",
+              "    t.setpos(estado['pos'])", "    t.setheading(estado['heading'])", "    t.pendown()"],
+            "t.pendown()",
+        ])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,6 +1,6 @@
 import unittest
-from src.tokenizer import Token
-from src.parser import Parser
+from src.tokenizer import Token, gerar_tokens, relexar, tokenizar, tokenizar_em_buffer
+from src.parser import Parser, reanalisar
 from src.ast_nodes import *
 
 class TestParser(unittest.TestCase):
@@ -169,5 +169,221 @@ class TestParser(unittest.TestCase):
         with self.assertRaisesRegex(SyntaxError, "Código encontrado após o 'fim' do programa"):
             parser.parse()
 
+    def test_parser_com_fluxo_de_tokens(self):
+        codigo = """
+        inicio
+            var inteiro: lado = 10;
+            repita 4 vezes
+                avancar lado * 2;
+                girar_direita 90;
+            fim_repita;
+        fim
+        """
+        arvore_lista = Parser(tokenizar(codigo)).parse()
+        arvore_fluxo = Parser(gerar_tokens(codigo)).parse()
+        arvore_buffer = Parser(tokenizar_em_buffer(codigo.encode('utf-8'))).parse()
+        self.assertEqual(arvore_fluxo, arvore_lista)
+        self.assertEqual(arvore_buffer, arvore_lista)
+
+    def _expressao(self, codigo):
+        """ Analisa `y = <codigo>;` e devolve a expressão atribuída. """
+        arvore = Parser(tokenizar(f"inicio y = {codigo}; fim")).parse()
+        return arvore.bloco.comandos[0].expressao
+
+    def test_precedencia_e_associatividade(self):
+        # a - b * c < -d  ==>  (a - (b * c)) < (-d)
+        expr = self._expressao("a - b * c < - d")
+        self.assertEqual(expr.op.valor, '<')
+        self.assertEqual(expr.esq.op.valor, '-')
+        self.assertEqual(expr.esq.dir.op.valor, '*')
+        self.assertIsInstance(expr.dir, UnaryOp)
+        # a - b - c  ==>  (a - b) - c
+        expr = self._expressao("a - b - c")
+        self.assertEqual(expr.dir, Variavel(Token('ID', 'c', 1)))
+        self.assertEqual(expr.esq.op.valor, '-')
+        # (a + b) * c
+        expr = self._expressao("(a + b) * c")
+        self.assertEqual(expr.op.valor, '*')
+        self.assertEqual(expr.esq.op.valor, '+')
+
+    def test_expressoes_profundas_sem_recursao(self):
+        profundidade = 50000
+        expr = self._expressao("- " * profundidade + "x")
+        for _ in range(profundidade):
+            expr = expr.expr
+        self.assertEqual(expr, Variavel(Token('ID', 'x', 1)))
+
+        expr = self._expressao("(" * profundidade + "x" + ")" * profundidade + " + 1")
+        self.assertEqual(expr.esq, Variavel(Token('ID', 'x', 1)))
+
+    def test_blocos_profundos_sem_recursao(self):
+        profundidade = 5000
+        aberturas = ["repita 2 vezes", "se x < 1 entao", "enquanto x < 1 faca"]
+        fechamentos = ["fim_repita;", "fim_se;", "fim_enquanto;"]
+        codigo = "inicio "
+        codigo += " ".join(aberturas[i % 3] for i in range(profundidade))
+        codigo += " avancar 1; "
+        codigo += " ".join(fechamentos[i % 3] for i in reversed(range(profundidade)))
+        codigo += " fim"
+
+        no = Parser(tokenizar(codigo)).parse().bloco.comandos[0]
+        for i in range(profundidade - 1):
+            self.assertIsInstance(no, (Repita, Se, Enquanto)[i % 3])
+            no = (no.bloco_se if i % 3 == 1 else no.bloco).comandos[0]
+        self.assertIsInstance(no, (Repita, Se, Enquanto)[(profundidade - 1) % 3])
+
+    def test_erro_bloco_nao_fechado(self):
+        with self.assertRaisesRegex(SyntaxError, "Esperado 'FIM_SE', mas encontrou 'FIM_REPITA'"):
+            Parser(tokenizar("inicio repita 2 vezes se x < 1 entao avancar 1; fim_repita; fim")).parse()
+
+    def test_erro_parenteses_nao_fechado(self):
+        with self.assertRaisesRegex(SyntaxError, "Esperado '\\)' mas encontrou ';'"):
+            self._expressao("(a + b")
+
+    def test_recuperacao_de_erros(self):
+        codigo = """
+        inicio
+            avancar ;
+            girar_direita 90
+            recuar 5;
+            repita 2 vezes
+                levantar_caneta;
+            fim_se;
+            circulo 10;
+        fim
+        """
+        parser = Parser(tokenizar(codigo), recuperar_erros=True)
+        arvore = parser.parse()
+        mensagens = [str(erro) for erro in parser.erros]
+        self.assertEqual(mensagens, [
+            "Fator inesperado na expressão: ';' na linha 3",
+            "Erro de Sintaxe na linha 5: Esperado 'PONTO_VIRGULA', mas encontrou 'RECUAR'",
+            "Erro de Sintaxe na linha 8: Esperado 'FIM_REPITA', mas encontrou 'FIM_SE'",
+            "Erro de Sintaxe na linha 10: Esperado 'FIM_REPITA', mas encontrou 'FIM'",
+        ])
+        # O 'fim_se' avulso é descartado e o repita, que ficou sem
+        # 'fim_repita', é fechado pelo 'fim' do programa
+        repita, = arvore.bloco.comandos
+        self.assertEqual([c.token.tipo for c in repita.bloco.comandos], ['LEVANTAR_CANETA', 'CIRCULO'])
+
+    def test_recuperacao_para_no_erro_lexico(self):
+        codigo = "inicio\n var inteiro: x = 1;\n avancar x 2;\n avancar x @ 2;\n girar_direita 90;\nfim"
+        parser = Parser(gerar_tokens(codigo), recuperar_erros=True)
+        # O erro léxico não é recuperável: o fluxo de tokens acabou nele
+        with self.assertRaisesRegex(SyntaxError, "Erro Léxico na linha 4: Caractere inválido '@'"):
+            parser.parse()
+        self.assertEqual([str(erro) for erro in parser.erros],
+                         ["Erro de Sintaxe na linha 3: Esperado 'PONTO_VIRGULA', mas encontrou 'NUMERO_INTEIRO'"])
+
+    def test_recuperacao_sem_erros_nao_altera_a_arvore(self):
+        codigo = "inicio var inteiro: x = 1; se x < 2 entao avancar x; senao recuar 1; fim_se; fim"
+        parser = Parser(tokenizar(codigo), recuperar_erros=True)
+        self.assertEqual(parser.parse(), Parser(tokenizar(codigo)).parse())
+        self.assertEqual(parser.erros, [])
+
+    def test_nos_compactos(self):
+        arvore = Parser(tokenizar("inicio var inteiro: x = 2; avancar -x * 3; fim")).parse()
+        declaracao = arvore.bloco.declaracoes[0]
+        atribuicao = arvore.bloco.comandos[0]
+        avancar = arvore.bloco.comandos[1]
+        for node in (arvore, declaracao, declaracao.tipo_no, atribuicao, avancar.expressao, avancar.expressao.esq):
+            self.assertFalse(hasattr(node, '__dict__'), type(node).__name__)
+        # Campos derivados do token continuam disponíveis
+        self.assertEqual(declaracao.tipo_no.valor, 'inteiro')
+        self.assertEqual(atribuicao.var_no.nome, 'x')
+        self.assertEqual(atribuicao.expressao.valor, '2')
+        self.assertIs(avancar.expressao.esq.token, avancar.expressao.esq.op)
+
+    def test_hash_consing(self):
+        codigo = (
+            "inicio\n"
+            "avancar lado * 2 + 1; recuar lado * 2 + 1;\n"
+            "girar_direita lado * 2 + 1;\n"
+            "fim"
+        )
+        fabrica = FabricaDeNos()
+        avancar, recuar, girar = Parser(tokenizar(codigo), fabrica=fabrica).parse().bloco.comandos
+        # Mesma expressão na mesma linha: um único objeto
+        self.assertIs(avancar.expressao, recuar.expressao)
+        self.assertIsNot(avancar.expressao, girar.expressao)
+        self.assertEqual(girar.expressao.esq.esq.token.linha, 3)
+
+        fabrica = FabricaDeNos(ignorar_linhas=True)
+        avancar, recuar, girar = Parser(tokenizar(codigo), fabrica=fabrica).parse().bloco.comandos
+        self.assertIs(avancar.expressao, girar.expressao)
+        # lado, 2, lado * 2, 1 e a soma
+        self.assertEqual(len(fabrica), 5)
+
+        # A árvore é igual à construída sem a fábrica, e o hash é estrutural
+        sem_fabrica = Parser(tokenizar(codigo)).parse().bloco.comandos
+        self.assertEqual(sem_fabrica[0].expressao, recuar.expressao)
+        self.assertEqual(hash(sem_fabrica[2].expressao), hash(girar.expressao))
+        self.assertNotEqual(sem_fabrica[0].expressao, sem_fabrica[0].expressao.esq)
+        self.assertEqual(len({c.expressao for c in sem_fabrica}), 2)
+
+    def test_reanalise_incremental(self):
+        codigo = (
+            "inicio\n"
+            "repita 2 vezes avancar 1; fim_repita;\n"
+            "se x < 1 entao recuar 2; fim_se;\n"
+            "enquanto x < 3 faca girar_direita 90; fim_enquanto;\n"
+            "fim\n"
+        )
+        buffer = tokenizar_em_buffer(codigo)
+        arvore = Parser(buffer).parse()
+        repita, se, enquanto = arvore.bloco.comandos
+        bloco_se = se.bloco_se
+
+        posicao = codigo.index('recuar 2') + len('recuar ')
+        novo = relexar(buffer, posicao, 1, '20 + 5')
+        nova = reanalisar(arvore, novo)
+        esperada = Parser(novo).parse()
+
+        self.assertEqual(nova, esperada)
+        # Só o bloco do 'se' foi reanalisado; o resto é a árvore anterior
+        self.assertIs(nova, arvore)
+        self.assertIs(nova.bloco.comandos[0], repita)
+        self.assertIs(nova.bloco.comandos[1], se)
+        self.assertIs(nova.bloco.comandos[2], enquanto)
+        self.assertIsNot(se.bloco_se, bloco_se)
+        self.assertEqual(enquanto.intervalo, esperada.bloco.comandos[2].intervalo)
+        self.assertEqual(nova.bloco.intervalo, esperada.bloco.intervalo)
+
+    def test_reanalise_que_desloca_linhas(self):
+        codigo = (
+            "inicio\n"
+            "se x < 1 entao recuar 2; fim_se;\n"
+            "enquanto x < 3 faca girar_direita x; fim_enquanto;\n"
+            "avancar x;\n"
+            "fim\n"
+        )
+        buffer = tokenizar_em_buffer(codigo)
+        arvore = Parser(buffer).parse()
+        _, enquanto, _ = arvore.bloco.comandos
+
+        # Uma linha nova dentro do 'se' empurra os comandos seguintes
+        novo = relexar(buffer, codigo.index('fim_se'), 0, 'levantar_caneta;\n')
+        self.assertEqual(novo.deslocamento_linhas, 1)
+        nova = reanalisar(arvore, novo)
+        self.assertEqual(nova, Parser(novo).parse())
+        # O 'enquanto' é o mesmo nó, com as linhas dos tokens atualizadas
+        self.assertIs(nova.bloco.comandos[1], enquanto)
+        self.assertEqual(enquanto.condicao.op.linha, 4)
+        self.assertEqual(enquanto.bloco.comandos[0].expressao.token.linha, 4)
+        self.assertEqual(nova.bloco.comandos[2].token.linha, 5)
+
+    def test_reanalise_que_muda_a_estrutura(self):
+        codigo = "inicio repita 2 vezes avancar 1; fim_repita; recuar 1; fim"
+        buffer = tokenizar_em_buffer(codigo)
+        arvore = Parser(buffer).parse()
+        posicao = codigo.index('fim_repita')
+        # Abre um 'se' dentro do repita, fechado logo antes do 'fim_repita'
+        novo = relexar(buffer, posicao, 0, 'se x < 1 entao levantar_caneta; fim_se; ')
+        self.assertEqual(reanalisar(arvore, novo), Parser(novo).parse())
+        # Uma edição que quebra o programa gera o mesmo erro da análise completa
+        quebrado = relexar(novo, codigo.index('fim_repita'), 0, 'fim_se; ')
+        with self.assertRaisesRegex(SyntaxError, "Esperado 'FIM_REPITA', mas encontrou 'FIM_SE'"):
+            reanalisar(arvore, quebrado)
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -1,7 +1,8 @@
 import unittest
 from src.semantico import AnalisadorSemantico
 from src.ast_nodes import *
-from src.tokenizer import Token
+from src.tokenizer import Token, tokenizar
+from src.parser import Parser
 
 class TestAnalisadorSemantico(unittest.TestCase):
 
@@ -133,5 +134,45 @@ class TestAnalisadorSemantico(unittest.TestCase):
         "mas recebeu 'texto'"):
             self.analisador.visit(arvore)
 
+    def test_analise_profunda_sem_recursao(self):
+        # 'se' encaixados 3000 vezes, o mais interno com 'avancar x + x + ... + x'
+        profundidade = 3000
+        decl = VarDecl(Tipo(self._criar_token_dummy('INTEIRO', 'inteiro')),
+                       [Variavel(self._criar_token_dummy('ID', 'x'))])
+        expr = Variavel(self._criar_token_dummy('ID', 'x'))
+        for _ in range(profundidade):
+            expr = BinOp(expr, self._criar_token_dummy('OP_ARITMETICO', '+'),
+                         Variavel(self._criar_token_dummy('ID', 'x')))
+        comando = ComandoSimples(self._criar_token_dummy('AVANCAR', 'avancar'), expr)
+        bloco = Bloco([], [comando])
+        for _ in range(profundidade):
+            condicao = Literal(self._criar_token_dummy('VERDADEIRO', 'verdadeiro'))
+            bloco = Bloco([], [Se(condicao, bloco)])
+        self.analisador.visit(Programa(Bloco([decl], bloco.comandos)))
+
+        comando.expressao = BinOp(expr, self._criar_token_dummy('OP_ARITMETICO', '+'),
+                                  Literal(self._criar_token_dummy('TEXTO', '"a"')))
+        with self.assertRaisesRegex(TypeError, "Operação com tipos incompatíveis"):
+            AnalisadorSemantico().visit(Programa(Bloco([decl], bloco.comandos)))
+
+    def test_anotacoes_de_tipo_e_simbolo(self):
+        codigo = "inicio var inteiro: x; var real: r; r = x * 2 + r; se x < 3 entao avancar -x; fim_se; fim"
+        arvore = Parser(tokenizar(codigo)).parse()
+        self.analisador.visit(arvore)
+        declaracao_x = arvore.bloco.declaracoes[0].var_nos[0]
+        atribuicao, se = arvore.bloco.comandos
+
+        self.assertEqual(declaracao_x.tipo_inferido, 'inteiro')
+        soma = atribuicao.expressao
+        self.assertEqual((soma.tipo_inferido, soma.esq.tipo_inferido, soma.esq.dir.tipo_inferido),
+                         ('real', 'inteiro', 'inteiro'))
+        self.assertEqual(se.condicao.tipo_inferido, 'logico')
+        # Todas as ocorrências de x apontam para o mesmo símbolo da declaração
+        self.assertIs(soma.esq.esq.simbolo, declaracao_x.simbolo)
+        self.assertIs(se.bloco_se.comandos[0].expressao.expr.simbolo, declaracao_x.simbolo)
+        self.assertEqual(atribuicao.var_no.simbolo.tipo, 'real')
+        # As anotações não mudam a comparação dos nós
+        self.assertEqual(soma, Parser(tokenizar(codigo)).parse().bloco.comandos[0].expressao)
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -1,5 +1,7 @@
+import os
+import tempfile
 import unittest
-from src.tokenizer import tokenizar, Token
+from src.tokenizer import tokenizar, gerar_tokens, tokenizar_em_buffer, relexar, abrir_codigo_fonte, Token
 
 class TestTokenizer(unittest.TestCase):
 
@@ -103,6 +105,26 @@ class TestTokenizer(unittest.TestCase):
         ]
         self.assertEqual(tokens, esperado)
 
+    def test_operadores_relacionais_e_sinais(self):
+        codigo = "x <= -5 >= y != 2.5 == z - 1;"
+        tokens = tokenizar(codigo)
+        esperado = [
+            Token('ID', 'x', 1),
+            Token('OP_RELACIONAL', '<=', 1),
+            Token('NUMERO_INTEIRO', '-5', 1),
+            Token('OP_RELACIONAL', '>=', 1),
+            Token('ID', 'y', 1),
+            Token('OP_RELACIONAL', '!=', 1),
+            Token('NUMERO_REAL', '2.5', 1),
+            Token('OP_RELACIONAL', '==', 1),
+            Token('ID', 'z', 1),
+            Token('OP_ARITMETICO', '-', 1),
+            Token('NUMERO_INTEIRO', '1', 1),
+            Token('PONTO_VIRGULA', ';', 1),
+            Token('EOF', '', 1)
+        ]
+        self.assertEqual(tokens, esperado)
+
     def test_comentarios_espacos_linhas(self):
         codigo = """
         // Primeira linha de comentario
@@ -136,6 +158,114 @@ class TestTokenizer(unittest.TestCase):
             "Erro Léxico na linha 1: Caractere inválido '@' não reconhecido."
         )
 
+    def test_gerar_tokens_preguicoso(self):
+        # O erro léxico só aparece quando o token inválido é consumido
+        fluxo = gerar_tokens("inicio @ fim")
+        self.assertEqual(next(fluxo), Token('INICIO', 'inicio', 1))
+        with self.assertRaises(SyntaxError):
+            next(fluxo)
+
+    def test_fonte_em_bytes(self):
+        codigo = 'inicio\n  var texto: cor = "coração"; // comentário\n  x = -2.5 <= y;\nfim'
+        esperado = tokenizar(codigo)
+        dados = codigo.encode('utf-8')
+        self.assertEqual(tokenizar(dados), esperado)
+        self.assertEqual(tokenizar(memoryview(dados)), esperado)
+
+    def test_fonte_mapeada_em_memoria(self):
+        codigo = 'inicio\n    avancar 10;\nfim\n'
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as arquivo:
+            arquivo.write(codigo)
+        self.addCleanup(os.remove, arquivo.name)
+
+        with abrir_codigo_fonte(arquivo.name) as fonte:
+            tokens = tokenizar(fonte)
+        self.assertEqual(tokens, tokenizar(codigo))
+
+    def test_erro_lexico_em_bytes(self):
+        with self.assertRaises(SyntaxError) as cm:
+            tokenizar('x = 1;\ny = ç;'.encode('utf-8'))
+        self.assertEqual(
+            str(cm.exception),
+            "Erro Léxico na linha 2: Caractere inválido 'ç' não reconhecido."
+        )
+
+    def test_identificadores_nao_ascii_em_str_e_bytes(self):
+        def resultado(funcao, fonte):
+            try:
+                return list(funcao(fonte))
+            except SyntaxError as erro:
+                return str(erro)
+
+        codigos = ['ação = coração + 1;', 'x→y = 1;', 'avancar x y;', 'lado² = 2;', 'x = "seta → aqui";']
+        for codigo in codigos:
+            esperado = resultado(tokenizar, codigo)
+            dados = codigo.encode('utf-8')
+            for fonte in (dados, memoryview(dados)):
+                self.assertEqual(resultado(tokenizar, fonte), esperado, codigo)
+                self.assertEqual(resultado(tokenizar_em_buffer, fonte), esperado, codigo)
+        self.assertEqual(resultado(tokenizar, 'x→y = 1;'), "Erro Léxico na linha 1: Caractere inválido '→' não reconhecido.")
+
+        # Bytes que não são UTF-8 válido num identificador ou num texto são um erro léxico
+        for dados in (b'x = 1;\nlado\xff = 2;', b'x = 1;\nx = "a\xe9b";'):
+            with self.assertRaises(SyntaxError) as cm:
+                tokenizar(dados)
+            self.assertEqual(str(cm.exception), "Erro Léxico na linha 2: Sequência de bytes inválida em UTF-8.")
+
+    def test_digitos_nao_ascii_em_str_e_bytes(self):
+        # Só dígitos ASCII formam números, na str e nos bytes
+        for codigo, invalido in (('x = ٣;', '٣'), ('x = 1٣;', '٣'), ('x = -٣;', '٣'), ('x = 2.٣;', '.')):
+            with self.assertRaises(SyntaxError) as cm:
+                tokenizar(codigo)
+            self.assertEqual(str(cm.exception), f"Erro Léxico na linha 1: Caractere inválido '{invalido}' não reconhecido.")
+            with self.assertRaises(SyntaxError) as cm_bytes:
+                tokenizar(codigo.encode('utf-8'))
+            self.assertEqual(str(cm_bytes.exception), str(cm.exception))
+        # Num identificador, o dígito não ASCII continua valendo nos dois
+        self.assertEqual(tokenizar('x٣ = 1;'.encode('utf-8')), tokenizar('x٣ = 1;'))
+        self.assertEqual(tokenizar('x٣ = 1;')[0], Token('ID', 'x٣', 1))
+
+    def test_token_buffer(self):
+        codigo = 'lado = lado + 5;\ndefinir_cor "red";'
+        buffer = tokenizar_em_buffer(codigo)
+        self.assertEqual(list(buffer), tokenizar(codigo))
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer.tipo(3), 'OP_ARITMETICO')
+        self.assertEqual(buffer.valor(7), '"red"')
+        self.assertEqual(buffer.linha(6), 2)
+        self.assertEqual(buffer[-1], Token('EOF', '', 2))
+        self.assertEqual(buffer.tipos.itemsize, 1)
+
+    def _verificar_relexar(self, codigo, inicio, removidos, inseridos):
+        buffer = tokenizar_em_buffer(codigo)
+        editado = codigo[:inicio] + inseridos + codigo[inicio + removidos:]
+        novo = relexar(buffer, inicio, removidos, inseridos)
+        self.assertEqual(list(novo), tokenizar(editado))
+        return novo
+
+    def test_relexar_edicoes(self):
+        codigo = 'inicio\n    x = 12; // nota\n    avancar x;\n    girar_direita 90;\nfim\n'
+        # Insere uma linha: só ela é varrida, as seguintes são deslocadas
+        novo = self._verificar_relexar(codigo, codigo.index('avancar'), 0, 'recuar 5;\n    ')
+        primeiro, fim_antigo, fim_novo = novo.alteracao
+        self.assertEqual(fim_novo - fim_antigo, 3)
+        self.assertEqual(novo[-2], Token('FIM', 'fim', 6))
+        # Estende um número colado à edição
+        self._verificar_relexar(codigo, codigo.index('12') + 2, 0, '.5')
+        # Edita dentro de um comentário e transforma código em comentário
+        self._verificar_relexar(codigo, codigo.index('nota'), 4, 'outra\n')
+        self._verificar_relexar(codigo, codigo.index('avancar'), 0, '// ')
+        # Remove texto, juntando duas linhas
+        self._verificar_relexar(codigo, codigo.index('\n    girar'), 5, '')
+
+    def test_relexar_em_bytes(self):
+        codigo = 'inicio\n    definir_cor "azul";\n    avancar 10;\nfim'.encode('utf-8')
+        buffer = tokenizar_em_buffer(codigo)
+        inicio = codigo.index(b'azul')
+        novo = relexar(buffer, inicio, 4, 'lilás')
+        self.assertEqual(novo.valor(2), '"lilás"')
+        self.assertEqual(list(novo), tokenizar(codigo[:inicio] + 'lilás'.encode('utf-8') + codigo[inicio + 4:]))
+
     def test_codigo_completo_exemplo(self):
         codigo_exemplo = """
             inicio
@@ -0,0 +1,38 @@
+import unittest
+from src.visitor import Visitor
+from src.ast_nodes import *
+from src.tokenizer import Token
+
+class LiteralTexto(Literal):
+    __slots__ = ()
+
+class Contador(Visitor):
+    def __init__(self):
+        self.visitados = []
+
+    def visit_Literal(self, node):
+        self.visitados.append(node.valor)
+
+    def visit_BinOp(self, node):
+        self.visit(node.esq)
+        self.visit(node.dir)
+
+class TestVisitor(unittest.TestCase):
+
+    def test_despacho_por_classe(self):
+        arvore = BinOp(Literal(Token('NUMERO_INTEIRO', '1', 1)), Token('OP_ARITMETICO', '+', 1),
+                       LiteralTexto(Token('TEXTO', '"a"', 1)))
+        contador = Contador()
+        contador.visit(arvore)
+        self.assertEqual(contador.visitados, ['1', '"a"'])
+        # A subclasse do nó usa o método da classe base, e a escolha fica na
+        # tabela da subclasse do visitor, não na da base
+        self.assertIs(Contador._despacho[LiteralTexto][0], Contador.visit_Literal)
+        self.assertNotIn(LiteralTexto, Visitor._despacho)
+
+    def test_no_sem_metodo(self):
+        with self.assertRaisesRegex(NotImplementedError, "visit_Variavel"):
+            Contador().visit(Variavel(Token('ID', 'x', 1)))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)